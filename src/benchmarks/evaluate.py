@@ -0,0 +1,59 @@
+#
+# evaluate.py - times each equations evaluate_y() against its compiled evaluator.
+#               part of the python sensor silo project.
+#
+# Copyright (c) 2026 Coburn Wightman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+
+import argparse
+import timeit
+
+from sensor_silo import equation
+from sensor_silo import polynomial
+from sensor_silo import thermistor
+
+
+def equations():
+    poly = polynomial.PolynomialEquation()
+    poly.coefficients[1] = -59.16
+    poly.coefficients[0] = 414.12
+    poly.changed()
+
+    return [
+        (equation.IdentityEquation(), 123.4),
+        (poly, 123.4),
+        (thermistor.NtcBetaEquation(), 8200.0),
+        (thermistor.PhorpNtcBetaEquation(), 750.0),
+    ]
+
+
+def per_call(function, value, number):
+    seconds = min(timeit.repeat(lambda: function(value), number=number, repeat=5))
+
+    return seconds / number * 1e9
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='time of evaluate_y against the compiled evaluator')
+    parser.add_argument('--number', type=int, default=200000, help='calls per timing')
+    args = parser.parse_args()
+    number = args.number
+
+    print('{:24} {:>12} {:>12} {:>8}'.format('equation', 'evaluate_y', 'compiled', 'speedup'))
+    for equ, value in equations():
+        assert abs(equ.evaluate_y(value) - equ.evaluator(value)) < 1e-9
+
+        plain = per_call(equ.evaluate_y, value, number)
+        compiled = per_call(equ.evaluator, value, number)
+
+        print('{:24} {:>9.1f} ns {:>9.1f} ns {:>7.2f}x'.format(equ.type, plain, compiled, plain / compiled))
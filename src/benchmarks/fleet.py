@@ -0,0 +1,107 @@
+#
+# fleet.py - builds synthetic sensor fleets for the benchmarks.
+#            part of the python sensor silo project.
+#
+# Copyright (c) 2026 Coburn Wightman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+
+import datetime
+import functools
+
+import sensor_silo as silo
+from sensor_silo import sensor
+from sensor_silo import calibration
+from sensor_silo import polynomial
+from sensor_silo import thermistor
+
+
+def new_sensor(index, channels=4):
+    ''' a calibrated, deployed sensor.  every fourth is a thermistor, the rest pH'''
+    item = sensor.Sensor('s{:05}'.format(index))
+    item.name = 'sensor {}'.format(index)
+    item.location = 'rack {}'.format(index // 32)
+    item.property = 'pH'
+    item.stream_type = 'SimulatedStream'
+    item.address = 'd{}.{}'.format(index // channels, index % channels + 1)
+
+    cal = calibration.Calibration()
+    cal.timestamp = datetime.date.today()
+    cal.interval = datetime.timedelta(days=180)
+
+    if index % 4 == 3:
+        item.kind = 'ntc'
+        cal.procedure_type = 'NtcBetaProcedure'
+        cal.scaled_units = 'Celsius'
+        cal.unit_id = 'celsius'
+        cal.equation = thermistor.PhorpNtcBetaEquation()
+    else:
+        item.kind = 'ph'
+        cal.procedure_type = 'PolynomialProcedure'
+        cal.scaled_units = 'pH'
+        cal.unit_id = 'ph'
+        cal.equation = polynomial.PolynomialEquation()
+        cal.equation.fit([4.0, 7.0, 10.0], [177.0 + index % 7, 0.0, -177.0])
+
+    item.calibration = cal
+
+    return item
+
+
+def build_sensors(count, channels=4):
+    sensors = sensor.Sensors()
+    for index in range(count):
+        item = new_sensor(index, channels)
+        sensors[item.id] = item
+
+    return sensors
+
+
+def build_deploy(count, channels=4, **stream_options):
+    ''' a Deploy connected to a fleet of simulated streams'''
+    project = silo.Deploy()
+    project.sensors = build_sensors(count, channels)
+
+    streams = dict()
+    streams['SimulatedStream'] = functools.partial(silo.SimulatedStream, **stream_options)
+    project.connect(streams)
+
+    return project
+
+
+def build_procedures(streams=None):
+    ''' procedures for the kinds of sensor in a fleet'''
+    if streams is None:
+        streams = dict()
+
+    ph = silo.PolynomialProcedure(streams)
+    ph.kind = 'ph'
+    ph.property = 'pH'
+    ph.scaled_units = 'pH'
+    ph.unit_id = 'ph'
+    ph.stream_type = 'SimulatedStream'
+    ph.stream_address = 'deployed'
+    ph.point_count = 3
+    for name, value in [('sp1', 4.0), ('sp2', 7.0), ('sp3', 10.0)]:
+        ph.parameters[name] = silo.StreamSetpoint(silo.Quantity(name.upper(), 'pH', value))
+
+    ntc = silo.PhorpNtcBetaProcedure(streams)
+    ntc.kind = 'ntc'
+    ntc.property = 'Temperature'
+    ntc.scaled_units = 'Celsius'
+    ntc.unit_id = 'celsius'
+    ntc.stream_type = 'SimulatedStream'
+    ntc.stream_address = 'deployed'
+    ntc.parameters['beta'] = silo.Quantity('Beta', 'K', 3574.6)
+    ntc.parameters['r25'] = silo.Quantity('R25', 'Ohms', 10000)
+
+    return {'ph': ph, 'ntc': ntc}
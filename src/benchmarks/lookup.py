@@ -0,0 +1,50 @@
+#
+# lookup.py - accuracy and speed of the thermistor lookup table by table size.
+#             part of the python sensor silo project.
+#
+# Copyright (c) 2026 Coburn Wightman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+
+import sys
+import timeit
+
+from sensor_silo import thermistor
+
+
+def per_call(function, value, number=100000):
+    seconds = min(timeit.repeat(lambda: function(value), number=number, repeat=5))
+
+    return seconds / number * 1e9
+
+
+def report(equ, value):
+    print(equ.type, 'range', equ.lookup_range())
+    print('{:>8} {:>14} {:>12} {:>12}'.format('points', 'max error degC', 'at raw', 'per call'))
+
+    equ.lookup_points = 0
+    print('{:>8} {:>14} {:>12} {:>9.1f} ns'.format('formula', '-', '-', per_call(equ.evaluator, value)))
+
+    for points in [64, 128, 256, 512, 1024, 4096]:
+        equ.lookup_points = points
+        max_error, y_value = equ.lookup_error()
+
+        print('{:>8} {:>14.5f} {:>12.3f} {:>9.1f} ns'.format(points, max_error, y_value, per_call(equ.evaluator, value)))
+
+    print()
+
+    return
+
+
+if __name__ == '__main__':
+    equ = thermistor.PhorpNtcBetaEquation()
+    report(equ, 750.0)
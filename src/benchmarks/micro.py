@@ -0,0 +1,138 @@
+#
+# micro.py - times the librarys hot primitives in isolation.
+#            part of the python sensor silo project.
+#
+# Copyright (c) 2026 Coburn Wightman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# python micro.py --json baseline.json           save a baseline
+# python micro.py --compare baseline.json        compare against it
+#
+
+import sys
+import json
+import timeit
+import argparse
+import platform
+import tomllib
+
+import fleet
+
+import sensor_silo as silo
+from sensor_silo import sensor
+from sensor_silo import calibration
+from sensor_silo import statistics
+
+
+def per_call(function, repeat=5):
+    ''' best seconds per call of function'''
+    timer = timeit.Timer(function)
+    number, seconds = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number))
+
+    return best / number
+
+
+def cases(sizes):
+    ''' yields (name, function) of each benchmark'''
+    for count in sizes:
+        sensors = fleet.build_sensors(count)
+        text = sensors.pack('sensors')
+        package = tomllib.loads(text)['sensors']
+
+        yield ('sensors.pack[{}]'.format(count), lambda sensors=sensors: sensors.pack('sensors'))
+        yield ('sensors.unpack[{}]'.format(count), lambda package=package: sensor.Sensors(package))
+
+        shell = silo.Shell(fleet.build_procedures())
+        shell.sensors.sensors = sensors
+        yield ('shell.pack[{}]'.format(count), lambda shell=shell: shell.pack())
+
+    # one sensor of each equation type
+    sensors = dict()
+    for item in fleet.build_sensors(4).values():
+        sensors[item.calibration.equation.type] = item
+
+    for name, item in sensors.items():
+        text = item.calibration.pack('calibration')
+        package = tomllib.loads(text)['calibration']
+
+        yield ('calibration.unpack[{}]'.format(name), lambda package=package: calibration.Calibration(package))
+
+    raw_values = {'PolynomialEquation': 88.5, 'PhorpNtcBetaEquation': 750.0}
+    for item in sensors.values():
+        equ = item.calibration.equation
+        value = raw_values[equ.type]
+
+        yield ('evaluate_y[{}]'.format(equ.type), lambda equ=equ, value=value: equ.evaluate_y(value))
+        yield ('evaluator[{}]'.format(equ.type), lambda equ=equ, value=value: equ.evaluator(value))
+
+    stats = statistics.RunningStats()
+    yield ('runningstats.push', lambda: stats.push(1.5))
+
+    block = [1.5 + i / 1000 for i in range(1000)]
+    yield ('runningstats.push_many[1000]', lambda: stats.push_many(block))
+
+    window = statistics.SlidingStats(50)
+    yield ('slidingstats.push', lambda: window.push(1.5))
+
+    ewma = statistics.ExponentialStats(time_constant=50)
+    yield ('exponentialstats.push', lambda: ewma.push(1.5))
+
+    return
+
+
+def compare(results, baseline, threshold):
+    ''' print each result against the baseline.  returns the count of regressions'''
+    regressions = 0
+
+    print('{:40} {:>12} {:>12} {:>8}'.format('benchmark', 'baseline', 'now', 'ratio'))
+    for name, seconds in results.items():
+        if name not in baseline:
+            print('{:40} {:>12} {:>9.3f} us'.format(name, '-', seconds * 1e6))
+            continue
+
+        ratio = seconds / baseline[name]
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = ' REGRESSION'
+            regressions += 1
+
+        print('{:40} {:>9.3f} us {:>9.3f} us {:>7.2f}x{}'.format(name, baseline[name] * 1e6, seconds * 1e6, ratio, flag))
+
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='sensor silo micro benchmarks')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--json', help='write results to this file')
+    parser.add_argument('--compare', help='compare results with this baseline file')
+    parser.add_argument('--threshold', type=float, default=0.10, help='slowdown ratio counted as a regression')
+    args = parser.parse_args()
+
+    results = dict()
+    for name, function in cases(args.sizes):
+        results[name] = per_call(function)
+        if not args.compare:
+            print('{:40} {:>12.3f} us'.format(name, results[name] * 1e6))
+
+    if args.json:
+        report = {'python': platform.python_version(), 'results': results}
+        with open(args.json, 'w') as fp:
+            json.dump(report, fp, indent=2)
+
+    if args.compare:
+        with open(args.compare) as fp:
+            baseline = json.load(fp)['results']
+
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
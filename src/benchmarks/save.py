@@ -0,0 +1,117 @@
+#
+# save.py - time and peak memory of saving a large silo, in full or one edit at a time.
+#           part of the python sensor silo project.
+#
+# Copyright (c) 2026 Coburn Wightman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+
+import io
+import os
+import time
+import tomllib
+import argparse
+import tempfile
+import contextlib
+import tracemalloc
+
+import fleet
+
+import sensor_silo as silo
+from sensor_silo.runtime import ConfigFile
+
+
+def concatenated(shell):
+    ''' the package built by repeated +=, as pack() did before it streamed'''
+    package = ''
+    for chunk in shell.iterpack():
+        package += chunk
+
+    return package
+
+
+def save(shell, filename, mode):
+    config = ConfigFile()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == 'journal':
+            # one sensor edited since the last save, appended to the journal
+            item = next(iter(shell.sensors.sensors.values()))
+            item.location = 'moved {}'.format(time.perf_counter())
+
+            shell.save(filename, config)
+            return
+
+        if mode == 'concat':
+            package = concatenated(shell)
+        elif mode == 'string':
+            package = shell.pack()
+        else:
+            package = shell.iterpack()
+
+        config.save(package, filename)
+
+    return
+
+
+def measure(shell, filename, mode, runs):
+    ''' returns (best seconds, peak bytes) of saving shell'''
+    if mode == 'journal':
+        with contextlib.redirect_stdout(io.StringIO()):
+            shell.save(filename, compact=True)
+
+    best = None
+    for i in range(runs):
+        start = time.perf_counter()
+        save(shell, filename, mode)
+        seconds = time.perf_counter() - start
+
+        if best is None or seconds < best:
+            best = seconds
+
+    tracemalloc.start()
+    save(shell, filename, mode)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return best, peak
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='time and peak memory of Shell save')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--modes', nargs='+', default=['concat', 'string', 'stream', 'journal'], choices=['concat', 'string', 'stream', 'journal'])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--journal-limit', type=int, default=32, help='journal entries before a journal save rewrites the file')
+    args = parser.parse_args()
+
+    print('{:>8} {:>8} {:>10} {:>10} {:>10}'.format('sensors', 'mode', 'save', 'peak', 'file'))
+    with tempfile.TemporaryDirectory() as folder:
+        filename = os.path.join(folder, 'deployment.toml')
+
+        for count in args.sizes:
+            shell = silo.Shell(fleet.build_procedures())
+            shell.sensors.sensors = fleet.build_sensors(count)
+            shell.journal_limit = args.journal_limit
+
+            for mode in args.modes:
+                seconds, peak = measure(shell, filename, mode, args.runs)
+                size = os.path.getsize(filename)
+
+                print('{:>8} {:>8} {:>7.1f} ms {:>7.2f} MB {:>7.2f} MB'.format(count, mode, seconds * 1e3, peak / 1e6, size / 1e6))
+
+            # whatever the mode, the file reads back
+            with open(filename, 'rb') as fp:
+                package = tomllib.load(fp)
+            assert len(package['sensors']) == count
+
+            print()
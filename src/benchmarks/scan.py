@@ -0,0 +1,75 @@
+#
+# scan.py - end to end scan throughput of a simulated deployment.
+#           part of the python sensor silo project.
+#
+# Copyright (c) 2026 Coburn Wightman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+
+import time
+import asyncio
+import argparse
+import tracemalloc
+
+import fleet
+
+
+def run_scans(project, mode, scans):
+    ''' returns seconds per scan, including scaling every reading'''
+    start_time = time.perf_counter()
+
+    for i in range(scans):
+        if mode == 'sync':
+            project.scan()
+        elif mode == 'async':
+            asyncio.run(project.scan_async())
+        elif mode == 'buses':
+            project.scan_buses()
+
+        for sensor in project.deployed:
+            sensor.scaled_value
+
+    return (time.perf_counter() - start_time) / scans
+
+
+def fleet_memory(count, channels):
+    ''' bytes allocated building and connecting a fleet'''
+    tracemalloc.start()
+    project = fleet.build_deploy(count, channels)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    project.stop()
+
+    return current
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='scan throughput of a simulated deployment')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000])
+    parser.add_argument('--mode', choices=['sync', 'async', 'buses'], default='sync')
+    parser.add_argument('--latency', type=float, default=0.0, help='conversion time in seconds')
+    parser.add_argument('--channels', type=int, default=4, help='channels sharing a converter')
+    parser.add_argument('--scans', type=int, default=5)
+    args = parser.parse_args()
+
+    print('mode={}, latency={}s, channels={}'.format(args.mode, args.latency, args.channels))
+    print('{:>8} {:>12} {:>16} {:>12}'.format('sensors', 'scans/s', 'per sensor', 'memory'))
+
+    for count in args.sizes:
+        project = fleet.build_deploy(count, args.channels, conversion_time=args.latency, noise=0.5)
+        seconds = run_scans(project, args.mode, args.scans)
+        project.stop()
+
+        memory = fleet_memory(count, args.channels)
+
+        print('{:>8} {:>12.2f} {:>13.2f} us {:>9.1f} kB'.format(count, 1 / seconds, seconds / count * 1e6, memory / 1024))
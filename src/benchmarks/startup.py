@@ -0,0 +1,129 @@
+#
+# startup.py - time from interpreter start to first reading of a headless deployment.
+#              part of the python sensor silo project.
+#
+# Copyright (c) 2026 Coburn Wightman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+
+import io
+import os
+import sys
+import json
+import argparse
+import tempfile
+import contextlib
+import subprocess
+
+import fleet
+
+import sensor_silo as silo
+
+# modules a headless deployment has no use for, by when they must still be unloaded
+unused_at_import = ['cmd', 'sqlite3', 'threading', 'sensor_silo.store', 'sensor_silo.database', 'sensor_silo.workers']
+unused_at_reading = ['cmd', 'sensor_silo.shell', 'sensor_silo.silo', 'sensor_silo.procedure', 'sensor_silo.sensor_shell', 'sensor_silo.deploy']
+
+# runs in a fresh interpreter for each measurement
+probe = '''
+import sys
+import time
+start = time.perf_counter()
+
+from sensor_silo import Deploy
+from sensor_silo import SimulatedStream
+imported = time.perf_counter()
+unused = [name for name in {unused_at_import!r} if name in sys.modules]
+
+project = Deploy({filename!r})
+loaded = time.perf_counter()
+
+project.connect({{'SimulatedStream': SimulatedStream}})
+connected = time.perf_counter()
+
+project.scan()
+for sensor in project.deployed:
+    sensor.scaled_value
+    break
+scanned = time.perf_counter()
+
+unused += [name for name in {unused_at_reading!r} if name in sys.modules and name not in unused]
+
+import json
+modules = [name for name in sys.modules if name.startswith('sensor_silo')]
+print(json.dumps({{'import': imported - start, 'load': loaded - imported, 'connect': connected - loaded,
+                   'first reading': scanned - connected, 'total': scanned - start, 'modules': len(modules),
+                   'unused': unused}}))
+'''
+
+
+def save_fleet(filename, count, per_node=0, store=False):
+    ''' save a fleet, as a file or a store folder.  per_node, if given,
+        spreads the sensors over deployments of that many, with this node node0.'''
+    shell = silo.Shell(fleet.build_procedures())
+    shell.sensors.sensors = fleet.build_sensors(count)
+
+    if per_node:
+        shell.deploy.deployment.key_name = 'node0'
+        for index, item in enumerate(shell.sensors.sensors.values()):
+            item.deployment = 'node{}'.format(index // per_node)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        if store:
+            shell.save_store(filename)
+        else:
+            shell.save(filename)
+
+    return
+
+
+def measure(folder, filename, runs):
+    ''' best of runs for each phase, in seconds'''
+    # ConfigFile keeps only the base name, so the probe runs in the files folder
+    code = probe.format(filename=filename, unused_at_import=unused_at_import, unused_at_reading=unused_at_reading)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(os.path.abspath(path) for path in sys.path))
+
+    best = dict()
+    for i in range(runs):
+        output = subprocess.run([sys.executable, '-c', code], cwd=folder, env=env, capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+
+        best['unused'] = result.pop('unused')
+        for phase, seconds in result.items():
+            best[phase] = min(best.get(phase, seconds), seconds)
+
+    return best
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='startup time of a headless deployment')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[12, 120, 1200])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--per-node', type=int, default=0, help='sensors deployed per node, 0 for all on one')
+    parser.add_argument('--store', action='store_true', help='a store folder of a file per sensor rather than one file')
+    args = parser.parse_args()
+
+    print('{:>8} {:>10} {:>10} {:>10} {:>14} {:>10} {:>8}'.format('sensors', 'import', 'load', 'connect', 'first reading', 'total', 'modules'))
+    unused = set()
+    with tempfile.TemporaryDirectory() as folder:
+        for count in args.sizes:
+            filename = 'fleet{}'.format(count) if args.store else 'deployment{}.toml'.format(count)
+            save_fleet(os.path.join(folder, filename), count, args.per_node, args.store)
+
+            best = measure(folder, filename, args.runs)
+            print('{:>8} {:>7.1f} ms {:>7.1f} ms {:>7.1f} ms {:>11.1f} ms {:>7.1f} ms {:>8}'.format(
+                count, best['import'] * 1e3, best['load'] * 1e3, best['connect'] * 1e3,
+                best['first reading'] * 1e3, best['total'] * 1e3, best['modules']))
+            unused.update(best['unused'])
+
+    if unused:
+        print('imported without need: {}'.format(', '.join(sorted(unused))))
+        sys.exit(1)
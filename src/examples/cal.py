@@ -17,6 +17,7 @@
 
 import sys
 import time
+import asyncio
 
 import smbus3 as smbus
 import phorp
@@ -24,12 +25,14 @@ import phorp
 import sensor_silo as silo
 
 class PhorpSource(silo.Stream):
-    i2c_bus = None
+    i2c_buses = dict() # one SMBus per bus number, shared by its boards
+    boards = dict() # one PhorpX4 per board on a bus, shared by its channels
+    default_port = 1 # bus of a stream connected outside a deployment
     
     def __init__(self):
         super().__init__(self.__class__.__name__)
         
-        self.bus = self.get_i2c_bus()
+        self.bus = None
         self.channel = None
         self.address = None
 
@@ -39,13 +42,40 @@ class PhorpSource(silo.Stream):
         return
 
     @classmethod
-    def get_i2c_bus(cls):
-        return cls.i2c_bus
+    def get_i2c_bus(cls, port):
+        if port not in cls.i2c_buses:
+            cls.i2c_buses[port] = smbus.SMBus(port)
+
+        return cls.i2c_buses[port]
+
+    @classmethod
+    def close_i2c_buses(cls):
+        for bus in cls.i2c_buses.values():
+            bus.close()
+
+        cls.i2c_buses.clear()
+        cls.boards.clear()
+
+        return
+
+    @classmethod
+    def get_board(cls, port, board_index):
+        key = (port, board_index)
+        if key not in cls.boards:
+            cls.boards[key] = phorp.PhorpX4(cls.get_i2c_bus(port), board_index)
+
+        return cls.boards[key]
     
     def connect(self, address):
         self.address = address
+
+        # a bus worker thread owns each port, so streams on separate ports
+        # never share an SMBus
+        if self.port is None:
+            self.port = self.default_port
+        self.bus = self.get_i2c_bus(self.port)
         
-        board = phorp.PhorpX4(self.bus, self.board_index)
+        board = self.get_board(self.port, self.board_index)
         self.channel = board[self.channel_index]
         
         self.channel.sample_rate = 60
@@ -63,6 +93,27 @@ class PhorpSource(silo.Stream):
 
         return
 
+    def start(self):
+        self.channel.start_conversion()
+
+        return
+
+    def collect(self):
+        self._raw_value = self.channel.get_conversion_volts()
+
+        self.measured_quantity.value = self._raw_value
+
+        return
+
+    @property
+    def conversion_time(self):
+        return self.channel.conversion_time
+
+    @property
+    def device(self):
+        # the four channels of a board share one converter
+        return (self.port, self.board_index)
+
     def validate_address(self, address):
         board_index, channel_index = self.split_address(address)
         
@@ -242,11 +293,10 @@ if __name__ == '__main__':
     if len(sys.argv) > 1:
         config = True
 
-    with smbus.SMBus(1) as bus:
-        streams = dict()
-        PhorpSource.i2c_bus = bus
-        streams[PhorpSource.__name__] = PhorpSource
-    
+    streams = dict()
+    streams[PhorpSource.__name__] = PhorpSource
+
+    try:
         if config == True:
             procedures = dict()
             procedures['do'] = DoProcedure(streams)
@@ -261,17 +311,18 @@ if __name__ == '__main__':
             project = silo.Deploy()
             project.load()
             project.connect(streams)
-            while True:
-                for sensor in project.sensors.values():
-                    if sensor.is_deployed:
-                        sensor.update()
-                        val = round(sensor.scaled_value, 1)
-                        parm = '{} {} {}, '.format(sensor.name, val, sensor.scaled_units)
-                        print(parm, end='')
-                        # sys.stdout.flush()
+
+            def show(sensors):
+                for sensor in sensors:
+                    val = round(sensor.scaled_value, 1)
+                    parm = '{} {} {}, '.format(sensor.name, val, sensor.scaled_units)
+                    print(parm, end='')
+                    # sys.stdout.flush()
 
                 print('')
-                time.sleep(project.sample_period)
 
-                
+            asyncio.run(project.run_async(show))
+    finally:
+        PhorpSource.close_i2c_buses()
+
     exit()
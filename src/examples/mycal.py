@@ -25,12 +25,14 @@ import sensor_silo as silo
 import gs_feedput as gs
 
 class PhorpSource(silo.Stream):
-    i2c_bus = None
+    i2c_buses = dict() # one SMBus per bus number, shared by its boards
+    boards = dict() # one PhorpX4 per board on a bus, shared by its channels
+    default_port = 1 # bus of a stream connected outside a deployment
     
     def __init__(self):
         super().__init__(self.__class__.__name__)
         
-        self.bus = self.get_i2c_bus()
+        self.bus = None
         self.channel = None
         self.address = None
 
@@ -40,13 +42,40 @@ class PhorpSource(silo.Stream):
         return
 
     @classmethod
-    def get_i2c_bus(cls):
-        return cls.i2c_bus
+    def get_i2c_bus(cls, port):
+        if port not in cls.i2c_buses:
+            cls.i2c_buses[port] = smbus.SMBus(port)
+
+        return cls.i2c_buses[port]
+
+    @classmethod
+    def close_i2c_buses(cls):
+        for bus in cls.i2c_buses.values():
+            bus.close()
+
+        cls.i2c_buses.clear()
+        cls.boards.clear()
+
+        return
+
+    @classmethod
+    def get_board(cls, port, board_index):
+        key = (port, board_index)
+        if key not in cls.boards:
+            cls.boards[key] = phorp.PhorpX4(cls.get_i2c_bus(port), board_index)
+
+        return cls.boards[key]
     
     def connect(self, address):
         self.address = address
+
+        # a bus worker thread owns each port, so streams on separate ports
+        # never share an SMBus
+        if self.port is None:
+            self.port = self.default_port
+        self.bus = self.get_i2c_bus(self.port)
         
-        board = phorp.PhorpX4(self.bus, self.board_index)
+        board = self.get_board(self.port, self.board_index)
         self.channel = board[self.channel_index]
         
         self.channel.sample_rate = 60
@@ -64,6 +93,27 @@ class PhorpSource(silo.Stream):
 
         return
 
+    def start(self):
+        self.channel.start_conversion()
+
+        return
+
+    def collect(self):
+        self._raw_value = self.channel.get_conversion_volts()
+
+        self.measured_quantity.value = self._raw_value
+
+        return
+
+    @property
+    def conversion_time(self):
+        return self.channel.conversion_time
+
+    @property
+    def device(self):
+        # the four channels of a board share one converter
+        return (self.port, self.board_index)
+
     def validate_address(self, address):
         board_index, channel_index = self.split_address(address)
         
@@ -241,29 +291,8 @@ class PhProcedure(silo.PolynomialProcedure):
         return
 
 
-class RollingAverage():
-    def __init__(self, filter_constant, initial_value=0):
-        if filter_constant < 1.0:
-            filter_constant = 1.0
-            
-        self.n = filter_constant
-        self.value= initial_value
-
-        return
-
-    def update(self, new_sample):
-        result = self.value
-        
-        result -= self.value / self.n
-        result += new_sample / self.n
-
-        self.value = result
-        
-        return result
-
-    
 class GroveStream(gs.RandomStream):
-    def __init__(self, sensor, filter_constant):
+    def __init__(self, sensor):
         super().__init__(sensor.id, 'FLOAT')
 
         self.sensor = sensor
@@ -273,13 +302,11 @@ class GroveStream(gs.RandomStream):
         self.set_description('fix me')
         self.set_units(sensor.unit_id)
 
-        self.filter = RollingAverage(filter_constant)
-        
         return
 
     def update(self):
-        self.sensor.update()
-        value = self.filter.update(self.sensor.scaled_value)
+        # project.scan() has updated and filtered every sensor
+        value = self.sensor.filtered_value
         
         self.values.clear()
         self.values.append(round(value, 3))
@@ -293,12 +320,11 @@ if __name__ == '__main__':
     if len(sys.argv) > 1:
         config = True
 
-    with smbus.SMBus(1) as bus:
-        sources = dict()
-        PhorpSource.i2c_bus = bus
-        print(PhorpSource.__name__)
-        sources[PhorpSource.__name__] = PhorpSource
-    
+    sources = dict()
+    sources[PhorpSource.__name__] = PhorpSource
+    print(PhorpSource.__name__)
+
+    try:
         if config == True:
             procedures = dict()
             procedures['do'] = DoProcedure(sources)
@@ -325,7 +351,7 @@ if __name__ == '__main__':
             component = gs.Component(project.group_name)
             for sensor in project.sensors.values():
                 if sensor.is_deployed:
-                    component.streams.append(GroveStream(sensor, project.time_constant))
+                    component.streams.append(GroveStream(sensor))
 
             components.append(component)
 
@@ -340,6 +366,7 @@ if __name__ == '__main__':
                 #     #print(parm, end='')
                 #     time.sleep(0.1)
 
+                project.scan()
                 components.update()
                 
                 if last_update + project.stream_period > timestamp:
@@ -348,5 +375,7 @@ if __name__ == '__main__':
                 
                 print('')
                 time.sleep(project.sample_period)
+    finally:
+        PhorpSource.close_i2c_buses()
 
     exit()
@@ -1,18 +1,46 @@
-from .silo import Shell
-from .silo import Deploy
+# public names are imported on first use (PEP 562), so a headless deployment
+# importing Deploy doesn't pay for the shells and procedures it never runs.
 
-from .sensor import Stream
+import importlib
 
-from .procedure import NullProcedure
+_exports = {
+    'Shell': 'silo',
+    'Deploy': 'runtime',
 
-from .setpoint import ConstantSetpoint
-from .setpoint import StreamSetpoint
-from .quantity import Quantity
+    'Stream': 'sensor',
+    'SimulatedStream': 'simulate',
 
-from .equation import Equation
-from .polynomial import PolynomialEquation
-from .polynomial import PolynomialProcedure
-from .thermistor import NtcBetaProcedure
-from .thermistor import PhorpNtcBetaProcedure
+    'NullProcedure': 'procedure',
 
-from .statistics import RunningStats
+    'ConstantSetpoint': 'setpoint',
+    'StreamSetpoint': 'setpoint',
+    'Quantity': 'quantity',
+
+    'Equation': 'equation',
+    'PolynomialEquation': 'polynomial_equation',
+    'PolynomialProcedure': 'polynomial',
+    'NtcBetaProcedure': 'thermistor',
+    'PhorpNtcBetaProcedure': 'thermistor',
+
+    'RunningStats': 'statistics',
+    'SlidingStats': 'statistics',
+    'ExponentialStats': 'statistics',
+    'GatedStats': 'statistics',
+
+    'FilterBank': 'filters',
+}
+
+__all__ = list(_exports)
+
+def __getattr__(name):
+    if name not in _exports:
+        raise AttributeError('module {} has no attribute {}'.format(__name__, name))
+
+    module = importlib.import_module('.{}'.format(_exports[name]), __name__)
+    value = getattr(module, name)
+    globals()[name] = value # later lookups skip __getattr__
+
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -18,8 +18,13 @@
 import datetime
 
 from . import factory
+from . import writer
+from .equation import Equation
 
 class Calibration():
+    revision = 0 # bumped by a change to any attribute
+    epoch = 0    # bumped by a change to any calibration
+
     def __init__(self, package=None):
         self.timestamp = datetime.date(1970, 1, 1)
         self.interval = datetime.timedelta(days=0)
@@ -36,17 +41,54 @@ class Calibration():
 
         return
 
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        self.__dict__['revision'] = self.revision + 1
+        Calibration.epoch += 1
+
+        return
+
+    @property
+    def stamp(self):
+        ''' changes whenever the package of this calibration would'''
+        equation_revision = None
+        if self.equation is not None:
+            equation_revision = self.equation.revision
+
+        return (self.revision, equation_revision)
+
+    @property
+    def equation(self):
+        return self._equation
+
+    @equation.setter
+    def equation(self, equation):
+        self._equation = equation
+        Equation.epoch += 1
+
+        return
+
     @property
     def due_date(self):
-        if self.interval == 0:
+        # a timedelta never equals 0, a zero interval is falsy
+        if not self.interval:
             return 'None Required'
+
+        if self.__dict__.get('_due_revision') != self.revision:
+            # stash in __dict__ so caching isn't itself a change
+            self.__dict__['_due_date'] = self.timestamp + self.interval
+            self.__dict__['_due_revision'] = self.revision
         
-        return self.timestamp + self.interval
+        return self.__dict__['_due_date']
 
     @property
     def is_valid(self):
-        if self.interval == 0:
-            return true
+        if not self.interval:
+            return True
+
+        # an expiry.ExpirySchedule watching this revision keeps the answer for us
+        if self.__dict__.get('scheduled_revision') == self.revision:
+            return not self.__dict__['expired']
         
         return self.due_date > datetime.date.today()
 
@@ -64,11 +106,11 @@ class Calibration():
     def pack(self, prefix):
         package = ''
         package += '[{}]\n'.format(prefix)
-        package += 'procedure_type = "{}"\n'.format(self.procedure_type)
-        package += 'scaled_units = "{}"\n'.format(self.scaled_units)
-        package += 'unit_id = "{}"\n'.format(self.unit_id)
-        package += 'timestamp = "{}"\n'.format(self.timestamp.isoformat())
-        package += 'interval = "{}"\n'.format(self.interval.days)
+        package += 'procedure_type = {}\n'.format(writer.quote(self.procedure_type))
+        package += 'scaled_units = {}\n'.format(writer.quote(self.scaled_units))
+        package += 'unit_id = {}\n'.format(writer.quote(self.unit_id))
+        package += 'timestamp = {}\n'.format(writer.quote(self.timestamp.isoformat()))
+        package += 'interval = {}\n'.format(writer.quote(self.interval.days))
 
         if self.equation:
             package += '\n'
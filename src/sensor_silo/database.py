@@ -0,0 +1,197 @@
+#
+# database.py - a silo kept in an sqlite database.
+#               part of the python sensor silo project.
+#
+# Copyright (c) 2026 Coburn Wightman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+
+import sqlite3
+import contextlib
+import tomllib as tomli
+
+from . import sensor
+from . import store
+from .store import SensorStore
+
+schema = '''
+CREATE TABLE IF NOT EXISTS sensors (
+    key TEXT PRIMARY KEY,
+    id TEXT NOT NULL,
+    kind TEXT,
+    address TEXT,
+    port TEXT,
+    due_date TEXT,
+    deployment TEXT,
+    package TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sensors_kind ON sensors (kind);
+CREATE INDEX IF NOT EXISTS sensors_address ON sensors (lower(address));
+CREATE INDEX IF NOT EXISTS sensors_due_date ON sensors (due_date);
+CREATE INDEX IF NOT EXISTS sensors_deployment ON sensors (deployment);
+
+CREATE TABLE IF NOT EXISTS silo (
+    name TEXT PRIMARY KEY,
+    package TEXT NOT NULL
+);
+'''
+
+columns = ('id', 'kind', 'address', 'port', 'due_date', 'deployment')
+
+
+class SensorDatabase():
+    ''' a silo kept in an sqlite database, with the same methods as a
+        store.SensorStore so StoredSensors, Shell and Deploy use either.
+
+        each sensor is a row holding its toml package, plus the index
+        columns kind, address, due date and deployment for queries.
+
+        close() the database when done with it, or use it as a context manager.'''
+
+    suffixes = store.database_suffixes
+
+    def __init__(self, filename, index=True):
+        self.path = filename
+
+        self.connection = sqlite3.connect(self.path)
+        self.connection.executescript(schema)
+        self.connection.commit()
+
+        self.index = dict() # key: row
+        if index:
+            self.load_index()
+
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+        return False
+
+    def close(self):
+        self.connection.close()
+
+        return
+
+    @contextlib.contextmanager
+    def transaction(self):
+        ''' changes within commit together, or not at all'''
+        with self.connection:
+            yield self
+
+        return
+
+    def load_index(self):
+        cursor = self.connection.execute('SELECT key, {} FROM sensors ORDER BY rowid'.format(', '.join(columns)))
+        self.index = {key: dict(zip(columns, values)) for key, *values in cursor}
+
+        return
+
+    def save_index(self):
+        # index columns are written with each sensor
+        return
+
+    def deployed(self, key_name):
+        ''' keys of the sensors deployed on the deployment of key_name, or on any'''
+        cursor = self.connection.execute(
+            "SELECT key FROM sensors WHERE deployment IN ('', ?) AND lower(address) != 'nd' ORDER BY rowid", (key_name,))
+
+        return [key for key, in cursor]
+
+    def load_deployed(self, key_name):
+        return self.deployed(key_name)
+
+    def find(self, kind=None, address=None, due_before=None):
+        ''' keys of sensors of a kind, at an address, and due for calibration
+            before a date, each by way of an index'''
+        terms = []
+        values = []
+
+        if kind is not None:
+            terms.append('kind = ?')
+            values.append(kind)
+
+        if address is not None:
+            terms.append('lower(address) = ?')
+            values.append(address.lower())
+
+        if due_before is not None:
+            terms.append("due_date != '' AND due_date < ?")
+            values.append(due_before.isoformat())
+
+        query = 'SELECT key FROM sensors'
+        if terms:
+            query += ' WHERE ' + ' AND '.join(terms)
+
+        cursor = self.connection.execute(query + ' ORDER BY rowid', values)
+
+        return [key for key, in cursor]
+
+    def read(self, key):
+        cursor = self.connection.execute('SELECT package FROM sensors WHERE key = ?', (key,))
+        found = cursor.fetchone()
+        if found is None:
+            raise KeyError(key)
+
+        package = tomli.loads(found[0])
+
+        item = sensor.Sensor(package['sensor']['id'])
+        item.unpack(package['sensor'])
+
+        return item
+
+    def write(self, key, item):
+        ''' write the row of a sensor, committed by the enclosing transaction()'''
+        prefix = 'sensor'
+        package = '[{}]\n{}'.format(prefix, item.pack(prefix))
+
+        row = SensorStore.row(item)
+        values = [key] + [row[name] for name in columns] + [package]
+
+        self.connection.execute(
+            'INSERT INTO sensors (key, {0}, package) VALUES (?, {1}, ?) '
+            'ON CONFLICT (key) DO UPDATE SET {2}, package = excluded.package'.format(
+                ', '.join(columns), ', '.join('?' for name in columns),
+                ', '.join('{0} = excluded.{0}'.format(name) for name in columns)),
+            values)
+
+        self.index[key] = row
+
+        return
+
+    def remove(self, key):
+        self.index.pop(key, None)
+        self.connection.execute('DELETE FROM sensors WHERE key = ?', (key,))
+
+        return
+
+    def load_silo(self):
+        ''' the package of procedures and deployment, without sensors'''
+        cursor = self.connection.execute("SELECT package FROM silo WHERE name = 'silo'")
+        found = cursor.fetchone()
+        if found is None:
+            return dict()
+
+        return tomli.loads(found[0])
+
+    def save_silo(self, package):
+        if not isinstance(package, str):
+            package = ''.join(package)
+
+        self.connection.execute(
+            "INSERT INTO silo (name, package) VALUES ('silo', ?) "
+            "ON CONFLICT (name) DO UPDATE SET package = excluded.package", (package,))
+
+        return
@@ -16,25 +16,22 @@
 #
 
 from . import shell
+from . import deployment
+from . import filters
 
 class DeployShell(shell.Shell):
     intro = 'Sensor Configuration.  x to return to previous menu.'
     # prompt = 'sensor: '
 
-    def __init__(self, *kwargs): # sensors
-        super().__init__(*kwargs)
+    settings_type = deployment.Deployment # made when no settings are given
 
-        self.key_name = 'api_key_name'
-        self.folder_name = 'folder_name'
-        self.group_name = 'group_name'
+    def __init__(self, *kwargs, deployment=None): # sensors
+        super().__init__(*kwargs)
 
-        self.update_interval = 60 # minutes
-        self.over_sample_rate = 10 # samples per interval
-        self.filter_in_percent = 10 # %
+        if deployment is None:
+            deployment = self.settings_type()
 
-        # default raspberry pi zero i2c ports
-        self.i2c_qwiic = 1
-        self.i2c_stemma = 0
+        self.deployment = deployment # the settings we edit
         
         # self.silo_sensors = sensors
         # self.sensors = [] # deployed sensors
@@ -66,7 +63,7 @@ class DeployShell(shell.Shell):
 
     def do_key(self, arg):
         ''' Enter name of Grovestreams API Key (typically hostname of deployed system)'''
-        self.key_name = arg.strip().replace(' ', '_')
+        self.deployment.key_name = arg.strip().replace(' ', '_')
         
         self.do_show()
         
@@ -75,7 +72,7 @@ class DeployShell(shell.Shell):
     def do_folder(self, arg):
         ''' Enter Grovestreams Folder Name'''
 
-        self.folder_name = arg.strip().replace(' ', '_')
+        self.deployment.folder_name = arg.strip().replace(' ', '_')
         
         self.do_show()
         
@@ -84,7 +81,7 @@ class DeployShell(shell.Shell):
     def do_group(self, arg):
         ''' Enter Group Name'''
 
-        self.group_name = arg.strip().replace(' ', '_')
+        self.deployment.group_name = arg.strip().replace(' ', '_')
 
         self.do_show()
         
@@ -94,12 +91,12 @@ class DeployShell(shell.Shell):
         ''' Grovestreams update Interval in minutes'''
 
         try:
-            self.update_interval = int(arg)
+            self.deployment.update_interval = int(arg)
         except ValueError:
-            self.update_interval = 60
+            self.deployment.update_interval = 60
 
-        if self.update_interval < 10:
-            self.update_interval = 10
+        if self.deployment.update_interval < 10:
+            self.deployment.update_interval = 10
             
         self.do_show()
         
@@ -109,14 +106,14 @@ class DeployShell(shell.Shell):
         ''' Over Sample Rate, number of sensor samples to filter per Interval (10 is a good number)'''
 
         try:
-            self.over_sample_rate = int(arg)
+            self.deployment.over_sample_rate = int(arg)
         except ValueError:
-            self.over_sample_rate = 10
+            self.deployment.over_sample_rate = 10
         
-        if self.over_sample_rate > 100:
-            self.over_sample_rate = 100
-        elif self.over_sample_rate < 1:
-            self.over_sample_rate = 1
+        if self.deployment.over_sample_rate > 100:
+            self.deployment.over_sample_rate = 100
+        elif self.deployment.over_sample_rate < 1:
+            self.deployment.over_sample_rate = 1
             
         self.do_show()
         
@@ -126,14 +123,26 @@ class DeployShell(shell.Shell):
         ''' Approximate Filter Time Constant, 1 = no filtering, OSR = 1 TC'''
 
         try:
-            self.filter_in_percent = int(arg) # xx not percent
+            self.deployment.filter_in_percent = int(arg) # xx not percent
         except ValueError:
-            self.filter_in_percent = 1
+            self.deployment.filter_in_percent = 1
             
-        if self.filter_in_percent < 0:
-            self.filter_in_percent = 0
-        if self.filter_in_percent > 250:
-            self.filter_in_percent = 250
+        if self.deployment.filter_in_percent < 0:
+            self.deployment.filter_in_percent = 0
+        if self.deployment.filter_in_percent > 250:
+            self.deployment.filter_in_percent = 250
+
+        self.do_show()
+        
+        return False
+    
+    def do_filter_type(self, arg):
+        ''' filter_type <ema|boxcar|median|kalman|none> : Kind of filter applied to each deployed sensor'''
+        kind = arg.strip().lower()
+        if kind in filters.FilterBank.kinds:
+            self.deployment.filter_type = kind
+        else:
+            print(' filter types are {}'.format(', '.join(filters.FilterBank.kinds)))
 
         self.do_show()
         
@@ -143,14 +152,14 @@ class DeployShell(shell.Shell):
         ''' stemma [port number] : Set stemma I2C Port, raspberry pi i2c port number (0-2) for 5 Volt Sensors'''
 
         try:
-            self.i2c_stemma = int(arg)
+            self.deployment.i2c_stemma = int(arg)
         except ValueError:
-            self.i2c_stemma = 0
+            self.deployment.i2c_stemma = 0
         
-        if self.i2c_stemma > 2:
-            self.i2c_stemma = 0
-        elif self.i2c_stemma < 0:
-            self.i2c_stemma = 0
+        if self.deployment.i2c_stemma > 2:
+            self.deployment.i2c_stemma = 0
+        elif self.deployment.i2c_stemma < 0:
+            self.deployment.i2c_stemma = 0
             
         self.do_show()
         
@@ -158,47 +167,22 @@ class DeployShell(shell.Shell):
 
     def do_show(self, arg=None):
         ''' print sensors parameters'''
-        print(' Folder: {}'.format(self.folder_name))
-        print('  Group: {}'.format(self.group_name))
-        print('  Key Name: {}'.format(self.key_name))
+        print(' Folder: {}'.format(self.deployment.folder_name))
+        print('  Group: {}'.format(self.deployment.group_name))
+        print('  Key Name: {}'.format(self.deployment.key_name))
         print('')
-        print('  Interval: {} minutes'.format(self.update_interval))
-        print('  OSR:  {} samples per interval'.format(self.over_sample_rate))
-        print('  Filter TC: {}'.format(self.filter_in_percent))
-        print('  Stemma i2c port: {}'.format(self.i2c_stemma))
+        print('  Interval: {} minutes'.format(self.deployment.update_interval))
+        print('  OSR:  {} samples per interval'.format(self.deployment.over_sample_rate))
+        print('  Filter TC: {}'.format(self.deployment.filter_in_percent))
+        print('  Filter Type: {}'.format(self.deployment.filter_type))
+        print('  Stemma i2c port: {}'.format(self.deployment.i2c_stemma))
         
         return False
 
     def pack(self, prefix):
-        # deploy
-
-        package = ''
-        package += '\n'
-        package += '[{}]\n'.format(prefix)
-        
-        package += 'folder_name = "{}"\n'.format(self.folder_name)
-        package += 'group_name = "{}"\n'.format(self.group_name)
-        package += 'key_name = "{}"\n'.format(self.key_name)
-        
-        package += 'update_interval = {}\n'.format(self.update_interval)
-        package += 'over_sample_rate = {}\n'.format(self.over_sample_rate)
-        package += 'filter_in_percent = {}\n'.format(self.filter_in_percent)
-        package += 'i2c_stemma = {}\n'.format(self.i2c_stemma)
-        package += 'i2c_qwiic = {}\n'.format(self.i2c_qwiic)
-
-        return package
+        return self.deployment.pack(prefix)
 
     def unpack(self, package):
-        # deploy
-        self.folder_name = package.get('folder_name', 'folder')
-        self.group_name = package.get('group_name', 'group')
-        self.key_name = package.get('key_name', 'key')
-        
-        self.update_interval = package.get('update_interval', 60)
-        self.over_sample_rate = package.get('over_sample_rate', 10)        
-        self.filter_in_percent = package.get('filter_in_percent', 0)
-        self.i2c_stemma = package.get('i2c_stemma', 0)
-        self.i2c_qwiic = package.get('i2c_qwiic', 1)
-                
-        return
+        self.deployment.unpack(package)
 
+        return
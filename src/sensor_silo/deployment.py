@@ -0,0 +1,102 @@
+#
+# deployment.py - the runtime settings of a deployment.
+#                 part of the python sensor silo project.
+#
+# Copyright (c) 2026 Coburn Wightman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+
+from . import filters
+from . import writer
+
+
+class Deployment():
+    ''' deployment settings, without any shell.  DeployShell edits one of these.'''
+    __slots__ = ('key_name', 'folder_name', 'group_name',
+                 'update_interval', 'over_sample_rate', 'filter_in_percent', 'filter_type',
+                 'i2c_stemma', 'i2c_qwiic')
+
+    def __init__(self, package=None):
+        self.key_name = 'api_key_name'
+        self.folder_name = 'folder_name'
+        self.group_name = 'group_name'
+
+        self.update_interval = 60 # minutes
+        self.over_sample_rate = 10 # samples per interval
+        self.filter_in_percent = 10 # %
+        self.filter_type = 'ema' # a filters.FilterBank kind
+
+        # default raspberry pi zero i2c ports
+        self.i2c_qwiic = 1
+        self.i2c_stemma = 0
+
+        if package is not None:
+            self.unpack(package)
+
+        return
+
+    def __eq__(self, other):
+        if not isinstance(other, Deployment):
+            return NotImplemented
+
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        settings = ', '.join('{}={!r}'.format(name, getattr(self, name)) for name in self.__slots__)
+        return 'Deployment({})'.format(settings)
+
+    def copy(self):
+        other = Deployment()
+        for name in self.__slots__:
+            setattr(other, name, getattr(self, name))
+
+        return other
+
+    def pack(self, prefix):
+        # deploy
+
+        package = ''
+        package += '\n'
+        package += '[{}]\n'.format(prefix)
+        
+        package += 'folder_name = {}\n'.format(writer.quote(self.folder_name))
+        package += 'group_name = {}\n'.format(writer.quote(self.group_name))
+        package += 'key_name = {}\n'.format(writer.quote(self.key_name))
+        
+        package += 'update_interval = {}\n'.format(self.update_interval)
+        package += 'over_sample_rate = {}\n'.format(self.over_sample_rate)
+        package += 'filter_in_percent = {}\n'.format(self.filter_in_percent)
+        package += 'filter_type = {}\n'.format(writer.quote(self.filter_type))
+        package += 'i2c_stemma = {}\n'.format(self.i2c_stemma)
+        package += 'i2c_qwiic = {}\n'.format(self.i2c_qwiic)
+
+        return package
+
+    def unpack(self, package):
+        # deploy
+        self.folder_name = package.get('folder_name', 'folder')
+        self.group_name = package.get('group_name', 'group')
+        self.key_name = package.get('key_name', 'key')
+        
+        self.update_interval = package.get('update_interval', 60)
+        self.over_sample_rate = package.get('over_sample_rate', 10)        
+        self.filter_in_percent = package.get('filter_in_percent', 0)
+        self.filter_type = package.get('filter_type', 'ema')
+        if self.filter_type not in filters.FilterBank.kinds:
+            # as do_filter_type would have refused it, rather than fail at the first scan
+            print(' unknown filter_type {}, using ema.  filter types are {}'.format(
+                self.filter_type, ', '.join(filters.FilterBank.kinds)))
+            self.filter_type = 'ema'
+        self.i2c_stemma = package.get('i2c_stemma', 0)
+        self.i2c_qwiic = package.get('i2c_qwiic', 1)
+                
+        return
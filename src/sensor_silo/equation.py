@@ -15,8 +15,20 @@
 # GNU Affero General Public License for more details.
 #
 
+import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from . import writer
+
 class Equation():
     ''' an equation base class'''
+    epoch = 0    # bumped by a change to any equation, so fleet caches know to rebuild
+    revision = 0 # bumped by a change to this equation
+
     def __init__(self, package=None):
         self.package_prefix = ''
 
@@ -25,10 +37,23 @@ class Equation():
             
         return
 
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        self.changed()
+
+        return
+
     @property
     def type(self):
         return self.__class__.__name__
 
+    def changed(self):
+        ''' note a change made in place, such as to a coefficient'''
+        self.__dict__['revision'] = self.revision + 1
+        Equation.epoch += 1
+
+        return
+
     def evaluate_y(self, y_value):
         ''' convert a raw y_value to a scaled x_value, typically over-ridden'''
         raise NotImplemented
@@ -36,16 +61,56 @@ class Equation():
     def evaluate_x(self, x_value):
         ''' convert a scaled x_value to a raw y_value, typically over-ridden'''
         raise NotImplemented
+
+    def compile(self):
+        ''' returns a function of a raw y_value equivalent to evaluate_y() with
+            the equations constants worked out ahead of time, typically over-ridden'''
+        return self.evaluate_y
+
+    @property
+    def evaluator(self):
+        ''' the compiled evaluate_y(), recompiled after any change to the equation'''
+        if self.__dict__.get('_compiled_revision') != self.revision:
+            # stash in __dict__ so compiling isn't itself a change
+            self.__dict__['_compiled'] = self.compile()
+            self.__dict__['_compiled_revision'] = self.revision
+
+        return self._compiled
+
+    def evaluate_y_array(self, y_values):
+        ''' convert a block of raw y_values to scaled x_values.
+            returns a numpy array, or an array('d') where numpy is not installed'''
+        if numpy is None:
+            return array.array('d', map(self.evaluate_y, y_values))
+
+        return self.evaluate_y_numpy(numpy.asarray(y_values, dtype=float))
+
+    def evaluate_x_array(self, x_values):
+        ''' convert a block of scaled x_values to raw y_values.
+            returns a numpy array, or an array('d') where numpy is not installed'''
+        if numpy is None:
+            return array.array('d', map(self.evaluate_x, x_values))
+
+        return self.evaluate_x_numpy(numpy.asarray(x_values, dtype=float))
+
+    def evaluate_y_numpy(self, y_values):
+        ''' evaluate_y over a numpy array, typically over-ridden'''
+        return numpy.fromiter(map(self.evaluate_y, y_values), dtype=float, count=len(y_values))
+
+    def evaluate_x_numpy(self, x_values):
+        ''' evaluate_x over a numpy array, typically over-ridden'''
+        return numpy.fromiter(map(self.evaluate_x, x_values), dtype=float, count=len(x_values))
     
     def dump(self):
         print(self.pack('me'))
         return
 
     def pack(self, prefix):
-        self.package_prefix = '{}.{}'.format(prefix, 'equation')
+        # packing is not a change to the equation
+        self.__dict__['package_prefix'] = '{}.{}'.format(prefix, 'equation')
         
         package = '[{}]\n'.format(self.package_prefix)
-        package += 'type = "{}"\n'.format(self.type)
+        package += 'type = {}\n'.format(writer.quote(self.type))
 
         return package
 
@@ -71,5 +136,17 @@ class IdentityEquation(Equation):
         y_value = x_value
         
         return y_value
+
+    def compile(self):
+        def evaluate_y(y_value):
+            return y_value
+
+        return evaluate_y
+
+    def evaluate_y_numpy(self, y_values):
+        return y_values.copy()
+
+    def evaluate_x_numpy(self, x_values):
+        return x_values.copy()
     
     
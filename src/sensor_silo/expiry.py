@@ -0,0 +1,178 @@
+#
+# expiry.py - a schedule of calibration due dates.
+#             part of the python sensor silo project.
+#
+# Copyright (c) 2026 Coburn Wightman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+
+import math
+import time
+import heapq
+import datetime
+import itertools
+
+
+class ExpirySchedule():
+    ''' a heap of the calibration due dates of a group of sensors.
+
+        the schedule marks each calibration it watches valid or expired, so
+        calibration.is_valid needn't look at the calendar, and flips it to
+        expired at midnight of its due date when check() or a timer armed
+        with arm() calls expire().  a calibration changed since it was
+        pushed, as by a recalibration, answers for itself until the schedule
+        comes across it in the heap, or is push()ed again.'''
+
+    def __init__(self, sensors=(), handler=None):
+        self.heap = [] # (due_date, sequence, sensor, revision)
+        self.sequence = itertools.count() # ties go first come first served
+        self.handler = handler # called with each list of sensors expired
+        self.next_time = math.inf # time.time() of the next expiry
+        self.timer = None
+
+        for sensor in sensors:
+            self.push(sensor)
+
+        return
+
+    def __len__(self):
+        return len(self.heap)
+
+    @staticmethod
+    def time_of(due_date):
+        ''' time.time() of the start of due_date, when a calibration expires'''
+        return datetime.datetime.combine(due_date, datetime.time.min).timestamp()
+
+    def push(self, sensor, today=None):
+        ''' watch the calibration of sensor'''
+        if today is None:
+            today = datetime.date.today()
+
+        cal = sensor.calibration
+        if cal is None:
+            return
+
+        due_date = sensor.due_date
+        expired = due_date is not None and due_date <= today
+
+        # stash in __dict__ so scheduling isn't itself a change
+        cal.__dict__['expired'] = expired
+        cal.__dict__['scheduled_revision'] = cal.revision
+
+        if due_date is not None and not expired:
+            heapq.heappush(self.heap, (due_date, next(self.sequence), sensor, cal.revision))
+            self.next_time = min(self.next_time, self.time_of(due_date))
+
+        return
+
+    def is_current(self, entry):
+        due_date, sequence, sensor, revision = entry
+        return sensor.calibration is not None and sensor.calibration.revision == revision
+
+    def next(self):
+        ''' returns (due_date, sensor) of the next calibration to expire, or None'''
+        while self.heap and not self.is_current(self.heap[0]):
+            due_date, sequence, sensor, revision = heapq.heappop(self.heap)
+            self.push(sensor)
+
+        if not self.heap:
+            return None
+
+        due_date, sequence, sensor, revision = self.heap[0]
+
+        return (due_date, sensor)
+
+    def before(self, date):
+        ''' sensors whose calibration expires before date, soonest first.
+            walks only the part of the heap that is due, not all of it.'''
+        found = []
+
+        pending = [0]
+        while pending:
+            i = pending.pop()
+            if i >= len(self.heap) or self.heap[i][0] >= date:
+                continue
+
+            if self.is_current(self.heap[i]):
+                found.append(self.heap[i])
+
+            pending.extend([2*i + 1, 2*i + 2])
+
+        found.sort()
+
+        return [sensor for due_date, sequence, sensor, revision in found]
+
+    def check(self, now=None):
+        ''' expire any calibrations now due.  one comparison until one is,
+            so cheap enough to call every scan.  returns the sensors expired.'''
+        if now is None:
+            now = time.time()
+
+        if now < self.next_time:
+            return []
+
+        return self.expire(datetime.date.fromtimestamp(now))
+
+    def expire(self, today=None):
+        ''' flip calibrations due by today to expired.  returns the sensors expired.'''
+        if today is None:
+            today = datetime.date.today()
+
+        expired = []
+        while self.heap and self.heap[0][0] <= today:
+            entry = heapq.heappop(self.heap)
+            due_date, sequence, sensor, revision = entry
+
+            if self.is_current(entry):
+                sensor.calibration.__dict__['expired'] = True
+                expired.append(sensor)
+            else:
+                # changed since, look again
+                self.push(sensor, today)
+                if sensor.calibration is not None and sensor.calibration.__dict__['expired']:
+                    expired.append(sensor)
+
+        self.next_time = math.inf
+        if self.next() is not None:
+            self.next_time = self.time_of(self.heap[0][0])
+
+        if expired and self.handler is not None:
+            self.handler(expired)
+
+        return expired
+
+    def arm(self, loop):
+        ''' expire calibrations from an asyncio loop timer as they come due'''
+        self.disarm()
+
+        if self.next_time == math.inf:
+            return
+
+        def fire():
+            self.timer = None
+            self.check()
+            self.arm(loop)
+
+            return
+
+        # wake at least hourly, in case the clock is set while we wait
+        delay = min(max(0.0, self.next_time - time.time()), 3600.0)
+        self.timer = loop.call_later(delay, fire)
+
+        return
+
+    def disarm(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+        return
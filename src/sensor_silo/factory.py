@@ -16,24 +16,28 @@
 #
 
 from . import equation
-from . import thermistor
-from . import polynomial
 
 class EquationFactory():
     def __init__(self):
         return
 
     def new(self, package):
+        # equation modules are imported as needed, sparing a deployment
+        # the equations it doesn't use.  they are kept apart from their
+        # procedures, so a deployment never imports the shells.
         equ = None
 
         if package['type'] == 'IdentityEquation':
             equ = equation.IdentityEquation(package)
         elif package['type'] == 'NtcBetaEquation':
-            equ = thermistor.NtcBetaEquation(package)
+            from . import thermistor_equation
+            equ = thermistor_equation.NtcBetaEquation(package)
         elif package['type'] == 'PhorpNtcBetaEquation':
-            equ = thermistor.PhorpNtcBetaEquation(package)
+            from . import thermistor_equation
+            equ = thermistor_equation.PhorpNtcBetaEquation(package)
         elif package['type'] == 'PolynomialEquation':
-            equ = polynomial.PolynomialEquation(package)
+            from . import polynomial_equation
+            equ = polynomial_equation.PolynomialEquation(package)
         else:
             print('EquationFactory() unrecognized equation type: {}'.format(package['type']))
             
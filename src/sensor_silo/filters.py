@@ -0,0 +1,255 @@
+#
+# filters.py - smoothing filters for a fleet of deployed sensors.
+#              part of the python sensor silo project.
+#
+# Copyright (c) 2026 Coburn Wightman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+
+import math
+import array
+
+from .equation import numpy
+
+
+class FilterBank():
+    ''' one filter per sensor, the state of all of them held in columns so
+        a scan of the whole fleet is filtered in a few array operations.
+
+        kinds are
+          ema:    exponential moving average, weight 1/time_constant
+          boxcar: mean of the last time_constant samples
+          median: median of the last time_constant samples
+          kalman: scalar kalman filter of a random walk, the process noise
+                  set so it settles to the gain of an ema of time_constant
+          none:   values pass through
+
+        rows are in the order of keys.  a nan value, as from an uncalibrated
+        or failed sensor, leaves its row untouched, so a window holds a rows
+        last samples rather than those of the last scans.'''
+
+    kinds = ('ema', 'boxcar', 'median', 'kalman', 'none')
+
+    def __init__(self, keys, kind='ema', time_constant=1, measurement_variance=1.0):
+        if kind not in self.kinds:
+            raise ValueError('filter kind is one of {}'.format(', '.join(self.kinds)))
+
+        self.keys = list(keys)
+        self.rows = {key: row for row, key in enumerate(self.keys)}
+        self.kind = kind
+        self.time_constant = max(time_constant, 1)
+
+        # samples in a boxcar or median window
+        self.window = max(int(round(self.time_constant)), 1)
+
+        # steady state kalman gain k = 1/time_constant needs q/r = k*k/(1-k)
+        gain = 1.0 / self.time_constant
+        self.measurement_variance = measurement_variance
+        self.process_variance = measurement_variance * gain * gain / (1.0 - gain) if gain < 1 else math.inf
+
+        # a kalman gain of one is no filtering, and inf/inf in the update
+        self.passes = kind == 'none' or (kind == 'kalman' and gain >= 1)
+
+        rows = len(self.keys)
+        self.values = array.array('d', [math.nan]) * rows    # filter outputs, nan until primed
+        self.variances = array.array('d', [math.nan]) * rows # kalman error variance
+        self.sums = array.array('d', [0.0]) * rows           # boxcar sum of window
+        self.counts = array.array('l', [0]) * rows           # samples in window
+        self.ring = array.array('d', [math.nan]) * (rows * self.window) # window x rows
+        self.positions = array.array('l', [0]) * rows        # slot of each rows oldest sample
+
+        if numpy is not None:
+            self.to_numpy()
+
+        return
+
+    def __len__(self):
+        return len(self.keys)
+
+    def to_numpy(self):
+        ''' swap the columns for numpy arrays'''
+        for name in ['values', 'variances', 'sums', 'counts', 'ring', 'positions']:
+            column = getattr(self, name)
+            setattr(self, name, numpy.asarray(column, dtype=column.typecode))
+
+        self.ring = self.ring.reshape(self.window, len(self.keys))
+
+        return
+
+    def update(self, values):
+        ''' filter one sample per row.  returns the filtered values, a numpy
+            array or array('d') shared with the bank, so copy to keep them.'''
+        if numpy is None:
+            return self.update_python(values)
+
+        x = numpy.asarray(values, dtype=float)
+        valid = ~numpy.isnan(x)
+
+        if self.passes:
+            self.values[valid] = x[valid]
+            return self.values
+
+        primed = valid & ~numpy.isnan(self.values)
+
+        if self.kind == 'ema':
+            self.values[primed] += (x[primed] - self.values[primed]) / self.time_constant
+
+        elif self.kind == 'kalman':
+            variance = self.variances[primed] + self.process_variance
+            gain = variance / (variance + self.measurement_variance)
+            self.values[primed] += gain * (x[primed] - self.values[primed])
+            self.variances[primed] = (1.0 - gain) * variance
+
+        elif self.kind in ['boxcar', 'median']:
+            rows = numpy.flatnonzero(valid)
+            slots = self.positions[rows]
+
+            old = self.ring[slots, rows]
+            kept = ~numpy.isnan(old)
+
+            self.sums[rows] += x[rows] - numpy.where(kept, old, 0.0)
+            self.counts[rows] += 1 - kept
+            self.ring[slots, rows] = x[rows]
+
+            self.positions[rows] = (slots + 1) % self.window
+
+            # once per pass, so rounding in the sums can't accumulate
+            wrapped = rows[self.positions[rows] == 0]
+            self.sums[wrapped] = numpy.nansum(self.ring[:, wrapped], axis=0)
+
+            if self.kind == 'boxcar':
+                self.values[valid] = self.sums[valid] / self.counts[valid]
+            else:
+                self.values[valid] = numpy.nanmedian(self.ring[:, valid], axis=0)
+
+        # a row's first value is taken as is
+        first = valid & ~primed
+        self.values[first] = x[first]
+        self.variances[first] = self.measurement_variance
+
+        return self.values
+
+    def update_python(self, values):
+        rows = len(self.keys)
+        ring = self.ring
+
+        for row, x in enumerate(values):
+            if math.isnan(x):
+                continue
+
+            value = self.values[row]
+            primed = not math.isnan(value) and not self.passes
+
+            if self.kind == 'ema' and primed:
+                value += (x - value) / self.time_constant
+
+            elif self.kind == 'kalman' and primed:
+                variance = self.variances[row] + self.process_variance
+                gain = variance / (variance + self.measurement_variance)
+                value += gain * (x - value)
+                self.variances[row] = (1.0 - gain) * variance
+
+            elif self.kind in ['boxcar', 'median']:
+                slot = self.positions[row]
+                old = ring[slot * rows + row]
+                if math.isnan(old):
+                    self.counts[row] += 1
+                    old = 0.0
+
+                self.sums[row] += x - old
+                ring[slot * rows + row] = x
+
+                self.positions[row] = (slot + 1) % self.window
+                if self.positions[row] == 0:
+                    self.sums[row] = math.fsum(y for y in ring[row::rows] if not math.isnan(y))
+
+                if self.kind == 'boxcar':
+                    value = self.sums[row] / self.counts[row]
+                else:
+                    window = sorted(y for y in ring[row::rows] if not math.isnan(y))
+                    middle = len(window) // 2
+                    value = window[middle] if len(window) % 2 else (window[middle - 1] + window[middle]) / 2
+
+            else:
+                value = x
+                self.variances[row] = self.measurement_variance
+
+            self.values[row] = value
+
+        return self.values
+
+    def value(self, key):
+        ''' the filtered value of key, nan until it has a sample'''
+        return float(self.values[self.rows[key]])
+
+    def state(self, key):
+        ''' the filter state of key, for inspection'''
+        row = self.rows[key]
+        state = {'kind': self.kind, 'time_constant': self.time_constant, 'value': float(self.values[row])}
+
+        if self.kind == 'kalman':
+            state['variance'] = float(self.variances[row])
+            state['gain'] = state['variance'] / (state['variance'] + self.measurement_variance)
+        elif self.kind in ['boxcar', 'median']:
+            state['count'] = int(self.counts[row])
+            state['window'] = [float(y) for y in self.window_values(row)]
+
+        return state
+
+    def window_values(self, row):
+        ''' the window of row, oldest first'''
+        rows = len(self.keys)
+        ring = self.ring.ravel() if numpy is not None else self.ring
+        window = [ring[((self.positions[row] + i) % self.window) * rows + row] for i in range(self.window)]
+
+        return [y for y in window if not math.isnan(y)]
+
+    def reset(self, key=None):
+        ''' forget the history of key, or of every sensor, so the next
+            sample starts the filter afresh'''
+        rows = range(len(self.keys)) if key is None else [self.rows[key]]
+        size = len(self.keys)
+        ring = self.ring.ravel() if numpy is not None else self.ring
+
+        for row in rows:
+            self.values[row] = math.nan
+            self.variances[row] = math.nan
+            self.sums[row] = 0.0
+            self.counts[row] = 0
+            self.positions[row] = 0
+
+            for i in range(self.window):
+                ring[i * size + row] = math.nan
+
+        return
+
+
+class SensorFilter():
+    ''' a sensors view of its row of a FilterBank, attached by deploy'''
+    def __init__(self, bank, key):
+        self.bank = bank
+        self.key = key
+
+        return
+
+    @property
+    def value(self):
+        return self.bank.value(self.key)
+
+    @property
+    def state(self):
+        return self.bank.state(self.key)
+
+    def reset(self):
+        self.bank.reset(self.key)
+
+        return
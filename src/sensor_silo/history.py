@@ -0,0 +1,97 @@
+#
+# history.py - a fixed capacity record of a sensors recent samples.
+#              part of the python sensor silo project.
+#
+# Copyright (c) 2026 Coburn Wightman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+
+import array
+
+
+class History():
+    ''' a ring buffer of timestamp, raw and scaled values.
+
+        storage is allocated once.  every sample is written twice, at its
+        slot and at slot + capacity, so the most recent k samples are always
+        contiguous and latest() can hand out memoryviews without copying.
+        numpy users can wrap a view with numpy.frombuffer().'''
+
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError('history capacity must be at least 1')
+
+        self.capacity = capacity
+
+        size = 2 * capacity
+        self.timestamps = array.array('d', bytes(8 * size))
+        self.raw_values = array.array('d', bytes(8 * size))
+        self.scaled_values = array.array('d', bytes(8 * size))
+
+        self.head = 0  # slot of the next sample
+        self.count = 0 # samples held, up to capacity
+
+        return
+
+    def __len__(self):
+        return self.count
+
+    def __str__(self):
+        return 'n={}, capacity={}'.format(self.count, self.capacity)
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+
+        return
+
+    def push(self, timestamp, raw_value, scaled_value):
+        lower = self.head
+        upper = lower + self.capacity
+
+        self.timestamps[lower] = self.timestamps[upper] = timestamp
+        self.raw_values[lower] = self.raw_values[upper] = raw_value
+        self.scaled_values[lower] = self.scaled_values[upper] = scaled_value
+
+        self.head += 1
+        if self.head == self.capacity:
+            self.head = 0
+
+        if self.count < self.capacity:
+            self.count += 1
+
+        return
+
+    def latest(self, k=None):
+        ''' returns (timestamps, raw_values, scaled_values) memoryviews of the
+            most recent k samples, oldest first.  all samples if k is None.
+            views share storage with the history, so copy them before the
+            next push if they need to outlive it.'''
+        if k is None or k > self.count:
+            k = self.count
+
+        end = self.head + self.capacity
+        start = end - k
+
+        return (memoryview(self.timestamps)[start:end],
+                memoryview(self.raw_values)[start:end],
+                memoryview(self.scaled_values)[start:end])
+
+    @property
+    def last(self):
+        ''' the most recent (timestamp, raw_value, scaled_value)'''
+        if self.count == 0:
+            return None
+
+        index = self.head + self.capacity - 1
+
+        return (self.timestamps[index], self.raw_values[index], self.scaled_values[index])
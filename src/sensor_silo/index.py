@@ -0,0 +1,152 @@
+#
+# index.py - the keys of a group of sensors, in order and by address, kind and due date.
+#            part of the python sensor silo project.
+#
+# Copyright (c) 2026 Coburn Wightman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+
+import bisect
+
+
+class SensorIndex():
+    ''' the keys of a group of sensors in order, with positions and lookups
+        by address, kind and calibration due date.
+
+        rows are (key, kind, address, port, deployment, due_date) with
+        due_date a datetime.date or None if none is required.  update() and
+        remove() keep it current a sensor at a time.'''
+
+    def __init__(self, rows):
+        self.keys = []
+        self.positions = dict() # key: position in keys
+        self.by_address = dict() # lower case address: [keys]
+        self.by_kind = dict() # kind: [keys]
+        self.placement = dict() # key: (port, deployment)
+        self.entries = dict() # key: (kind, lower case address, due_date)
+
+        due = []
+        for key, kind, address, port, deployment, due_date in rows:
+            self.positions[key] = len(self.keys)
+            self.keys.append(key)
+
+            self.by_kind.setdefault(kind, []).append(key)
+            self.by_address.setdefault(address.lower(), []).append(key)
+            self.placement[key] = (port, deployment)
+            self.entries[key] = (kind, address.lower(), due_date)
+
+            if due_date is not None:
+                due.append((due_date, self.positions[key]))
+
+        due.sort()
+        self.due_dates = [due_date for due_date, position in due]
+        self.due_keys = [self.keys[position] for due_date, position in due]
+
+        return
+
+    def update(self, key, kind, address, port, deployment, due_date):
+        ''' add a sensor after the others, or change the entries of one in place'''
+        if key in self.positions:
+            self.forget(key)
+        else:
+            self.positions[key] = len(self.keys)
+            self.keys.append(key)
+
+        # lookups list keys in position order
+        position = self.positions.get
+        bisect.insort(self.by_kind.setdefault(kind, []), key, key=position)
+        bisect.insort(self.by_address.setdefault(address.lower(), []), key, key=position)
+        self.placement[key] = (port, deployment)
+        self.entries[key] = (kind, address.lower(), due_date)
+
+        if due_date is not None:
+            i = bisect.bisect_right(self.due_dates, due_date)
+            self.due_dates.insert(i, due_date)
+            self.due_keys.insert(i, key)
+
+        return
+
+    def remove(self, key):
+        ''' drop a sensor, moving those after it up a position'''
+        self.forget(key)
+
+        position = self.positions.pop(key)
+        del self.keys[position]
+        for later in self.keys[position:]:
+            self.positions[later] -= 1
+
+        return
+
+    def forget(self, key):
+        ''' drop the lookup entries of key, leaving its position'''
+        kind, address, due_date = self.entries.pop(key)
+        del self.placement[key]
+
+        for lookup, term in [(self.by_kind, kind), (self.by_address, address)]:
+            keys = lookup[term]
+            keys.remove(key)
+            if not keys:
+                del lookup[term]
+
+        if due_date is not None:
+            i = bisect.bisect_left(self.due_dates, due_date)
+            i += self.due_keys[i:].index(key)
+            del self.due_dates[i]
+            del self.due_keys[i]
+
+        return
+
+    def __len__(self):
+        return len(self.keys)
+
+    def key_at(self, position):
+        return self.keys[position]
+
+    def position(self, key):
+        ''' position of key, None if not present'''
+        return self.positions.get(key)
+
+    def find_address(self, address):
+        return list(self.by_address.get(address.lower(), []))
+
+    def find_kind(self, kind):
+        return list(self.by_kind.get(kind, []))
+
+    def due_before(self, date):
+        ''' keys of sensors due for calibration before date, soonest first'''
+        return self.due_keys[:bisect.bisect_left(self.due_dates, date)]
+
+    def duplicate_addresses(self):
+        ''' returns {address: [keys]} of deployed sensors that share an address
+            on the same port of the same deployment, or of any deployment'''
+        duplicates = dict()
+
+        for address, keys in self.by_address.items():
+            if address == 'nd' or len(keys) < 2:
+                continue
+
+            clashes = set()
+            for i, key in enumerate(keys):
+                port, deployment = self.placement[key]
+
+                for other in keys[i+1:]:
+                    other_port, other_deployment = self.placement[other]
+                    if port != other_port:
+                        continue
+
+                    if deployment == other_deployment or '' in (deployment, other_deployment):
+                        clashes.update([key, other])
+
+            if clashes:
+                duplicates[address] = [key for key in keys if key in clashes]
+
+        return duplicates
@@ -0,0 +1,108 @@
+#
+# lookup.py - a tabulated function evaluated by linear interpolation.
+#             part of the python sensor silo project.
+#
+# Copyright (c) 2026 Coburn Wightman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+
+import array
+
+from .equation import numpy
+
+
+class LookupTable():
+    ''' function tabulated at evenly spaced points from y_min to y_max.
+        values between points are interpolated, values outside the table
+        are handed to the function itself, as is nan.'''
+
+    def __init__(self, function, y_min, y_max, points):
+        if points < 2:
+            raise ValueError('a lookup table needs at least 2 points')
+
+        self.function = function
+        self.y_min = y_min
+        self.y_max = y_max
+        self.points = points
+        self.step = (y_max - y_min) / (points - 1)
+
+        self.values = array.array('d', [function(self.y_at(i)) for i in range(points)])
+
+        return
+
+    def __str__(self):
+        return 'points={}, range={}..{}, step={}'.format(self.points, self.y_min, self.y_max, self.step)
+
+    def __call__(self, y_value):
+        position = (y_value - self.y_min) / self.step
+
+        # written so nan, which compares false, also goes to the function
+        if not 0 <= position < self.points - 1:
+            return self.function(y_value)
+
+        index = int(position)
+        lower = self.values[index]
+        return lower + (self.values[index + 1] - lower) * (position - index)
+
+    def y_at(self, index):
+        return self.y_min + index * self.step
+
+    def compile(self, function=None):
+        ''' returns a closure over the table.  function, if given, is a faster
+            equivalent of the tabulated function for values outside the table.'''
+        if function is None:
+            function = self.function
+
+        values = self.values
+        y_min = self.y_min
+        reciprocal_step = 1.0 / self.step
+        last = self.points - 1
+
+        def evaluate(y_value):
+            position = (y_value - y_min) * reciprocal_step
+
+            if not 0 <= position < last:
+                return function(y_value)
+
+            index = int(position)
+            lower = values[index]
+            return lower + (values[index + 1] - lower) * (position - index)
+
+        return evaluate
+
+    def evaluate_numpy(self, y_values, function):
+        ''' interpolate a numpy array, using function for values outside the table'''
+        grid = self.y_min + self.step * numpy.arange(self.points)
+        inside = (y_values >= self.y_min) & (y_values < grid[-1])
+
+        result = numpy.interp(y_values, grid, numpy.asarray(self.values))
+        if not inside.all():
+            outside = ~inside
+            result[outside] = function(y_values[outside])
+
+        return result
+
+    def error(self, samples_per_step=16):
+        ''' returns (max_error, y_value) the largest difference from the function
+            found when sampling between table points, and where it was found'''
+        max_error = 0.0
+        max_y = self.y_min
+
+        count = (self.points - 1) * samples_per_step
+        for i in range(count):
+            y_value = self.y_min + (self.y_max - self.y_min) * i / count
+            error = abs(self(y_value) - self.function(y_value))
+            if error > max_error:
+                max_error = error
+                max_y = y_value
+
+        return (max_error, max_y)
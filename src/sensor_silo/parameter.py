@@ -16,6 +16,7 @@
 #
 
 from . import shell
+from . import writer
 
 class Parameter():
     def __init__(self):
@@ -81,8 +82,8 @@ class ParameterShell(shell.Shell):
         package = ''
         package += '[{}]\n'.format(prefix)
         
-        package += 'name = "{}"\n'.format(self.name)
-        package += 'scaled_units = "{}"\n'.format(self.scaled_units)
+        package += 'name = {}\n'.format(writer.quote(self.name))
+        package += 'scaled_units = {}\n'.format(writer.quote(self.scaled_units))
         package += 'scaled_value = {}\n'.format(self.scaled_value)
 
         return package
@@ -107,4 +108,45 @@ class xConstantQuantity(ParameterShell):
     def clone(self):
         return(Constant(self.name, self.scaled_units, self.scaled_value))
 
+
+class QuantityShell(shell.Shell):
+    intro = 'Parameter Configuration'
+    prompt = 'quantity: '
+
+    def __init__(self, quantity, *kwargs):
+        super().__init__(*kwargs)
+
+        self.quantity = quantity
+        self.title = 'empty title'
+
+        return
+
+    @property
+    def intro(self):
+        return self.title
+
+    @property
+    def prompt(self):
+        return self.prompt
     
+    def do_show(self, arg=None):
+        ''' print present values'''
+        print(' Calibration Point')
+        print('  Name:   {}'.format(self.quantity.name))
+        print('  Units:   {}'.format(self.quantity.units))
+        print('  Value:   {} {}'.format(self.quantity.value, self.quantity.units))
+            
+        return False
+    
+    def do_value(self, arg):
+        ''' the first (lowest pH) in a two or three point calibration'''
+        self.quantity.value = float(arg)
+
+        self.do_show()
+        
+        return False
+
+    def dump(self):
+        str = '{}'.format(self.quantity)
+
+        return str
@@ -1,5 +1,5 @@
 #
-# polynomial.py - a specialized equation to scale a sensors raw value.
+# polynomial.py - a procedure to calibrate a polynomial equation.
 #                 part of the python sensor silo project.
 #
 # Copyright (c) 2026 Coburn Wightman
@@ -21,6 +21,7 @@ from . import procedure
 from . import setpoint as sp
 from . import equation
 from . import quantity
+from .polynomial_equation import PolynomialEquation
 
 
 class PolynomialProcedure(procedure.ProcedureShell):
@@ -28,6 +29,7 @@ class PolynomialProcedure(procedure.ProcedureShell):
         super().__init__(streams, *kwargs)
 
         self.point_count = 2 # spread_count?
+        self.degree = 1 # of the polynomial fit through the setpoints
         
         return
 
@@ -43,20 +45,43 @@ class PolynomialProcedure(procedure.ProcedureShell):
     def sp3(self):
         return self.parameters['sp3']
         
-    # def do_spread(self, arg):
-    #     ''' spread <n> Calibration point count, 2 or 3'''
+    def do_spread(self, arg):
+        ''' spread <n> Calibration point count, at most the setpoints the procedure has'''
+        counts = list(range(2, len(self.parameters) + 1))
         
-    #     try:
-    #         if int(arg) > len(self.parameters): # not in [2,3]:
-    #             print(' possible point count is {}'.format([2,3]))
-    #         else:
-    #             self.point_count = int(arg)
-    #     except:
-    #         print(' possible choices are 2 or 3')
+        try:
+            count = int(arg)
+        except ValueError:
+            count = 0
+
+        if count not in counts:
+            print(' possible point counts are {}'.format(counts))
+        else:
+            self.point_count = count
+            if self.degree >= count:
+                self.degree = count - 1
+                print(' degree lowered to {}'.format(self.degree))
             
-    #     self.do_show()
+        self.do_show()
         
-    #     return False
+        return False
+
+    def do_degree(self, arg):
+        ''' degree <n> Degree of the polynomial fit, at most one less than the point count'''
+        
+        try:
+            degree = int(arg)
+        except:
+            degree = 0
+
+        if degree < 1 or degree >= self.point_count:
+            print(' possible degrees are {}'.format(list(range(1, self.point_count))))
+        else:
+            self.degree = degree
+
+        self.do_show()
+        
+        return False
 
     def do_sp1(self, arg):
         ''' sp1 <n> The first (lowest value) in a two or three point calibration'''
@@ -94,13 +119,81 @@ class PolynomialProcedure(procedure.ProcedureShell):
         
         return False
         
+    @property
+    def stream_setpoints(self):
+        return [parameter for parameter in self.parameters.values() if isinstance(parameter, sp.StreamSetpoint)]
+
+    def do_settle(self, arg):
+        ''' settle <sd> <slope> [timeout] A setpoint is stable when the standard deviation of its
+            window is at most sd and its drift at most slope per second, in measured units x 1000.
+            one that isn't stable after timeout seconds asks whether to repeat.'''
+        try:
+            values = [float(value) for value in arg.split()]
+            if len(values) not in [2, 3] or min(values) <= 0:
+                raise ValueError
+        except ValueError:
+            print(' settle <sd> <slope> [timeout], each greater than zero')
+            values = []
+
+        for setpoint in self.stream_setpoints:
+            if values:
+                setpoint.stable_sd = values[0]
+                setpoint.stable_slope = values[1]
+            if len(values) == 3:
+                setpoint.timeout = values[2]
+
+        self.do_show()
+        
+        return False
+
+    def do_advance(self, arg):
+        ''' advance <auto|manual> Start the next setpoint as soon as one is stable, or ask first'''
+        mode = arg.strip().lower()
+        if mode not in ['auto', 'manual']:
+            print(' advance is auto or manual')
+        else:
+            for setpoint in self.stream_setpoints:
+                setpoint.auto_advance = mode == 'auto'
+
+        self.do_show()
+        
+        return False
+
+    def do_reject(self, arg):
+        ''' reject <threshold> [mad|z] Leave out samples more than threshold deviations from the
+            recent median (mad), or from the window mean (z).  0 keeps every sample.'''
+        terms = arg.split()
+        try:
+            threshold = float(terms[0])
+            method = terms[1].lower() if len(terms) > 1 else None
+            if threshold < 0 or method not in [None] + list(sp.rs.GatedStats.methods):
+                raise ValueError
+        except (ValueError, IndexError):
+            print(' reject <threshold> [{}], a threshold of 0 keeps every sample'.format('|'.join(sp.rs.GatedStats.methods)))
+            threshold = None
+
+        for setpoint in self.stream_setpoints:
+            if threshold is not None:
+                setpoint.reject_threshold = threshold
+                setpoint.reject_method = method or setpoint.reject_method
+
+        self.do_show()
+        
+        return False
+
     def show(self):
         print('  Units:  {}'.format(self.scaled_units))
         print('  Spread: {} point'.format(self.point_count))
+        print('  Degree: {}'.format(self.degree))
+        if self.stream_setpoints:
+            setpoint = self.stream_setpoints[0]
+            print('  Settle: sd {}, slope {}/s, timeout {}s (measured units x 1000)'.format(setpoint.stable_sd, setpoint.stable_slope, setpoint.timeout))
+            print('  Advance: {}'.format('auto' if setpoint.auto_advance else 'manual'))
+            print('  Reject: {}'.format('{} {}'.format(setpoint.reject_threshold, setpoint.reject_method) if setpoint.reject_threshold else 'off'))
         print('   {}'.format(self.sp1.target_quantity))
         print('   {}'.format(self.sp2.target_quantity))
         if self.point_count == 3:
-            print('   SP3:   {} {}'.format(self.sp3.target_quantity))
+            print('   {}'.format(self.sp3.target_quantity))
 
         return
 
@@ -109,6 +202,7 @@ class PolynomialProcedure(procedure.ProcedureShell):
 
         if sensor.calibration.equation is None:
             sensor.calibration.equation = PolynomialEquation()
+            sensor.calibration.equation.degree = self.degree
         
         # copy parameters of interest
         sensor.calibration.parameters = dict()
@@ -131,17 +225,28 @@ class PolynomialProcedure(procedure.ProcedureShell):
 
         return ok
 
+    def evaluate_group(self, sensors):
+        print(' running {} point calibration on sensors {}'.format(self.point_count, ', '.join(sensor.id for sensor in sensors)))
+
+        # each sensor holds its own clone of every setpoint, the first leads
+        for name in sensors[0].calibration.parameters.keys():
+            setpoints = [sensor.calibration.parameters[name] for sensor in sensors]
+            if not setpoints[0].run_group(sensors, setpoints):
+                return False
+
+        return True
+
     def save(self, sensor):
-        p1 = sensor.calibration.parameters['sp1']
-        p2 = sensor.calibration.parameters['sp2']
+        setpoints = list(sensor.calibration.parameters.values())
         
-        ok = sensor.calibration.equation.generate(p1, p2)            
+        ok = sensor.calibration.equation.fit_setpoints(setpoints)
 
         return ok
 
     def pack(self, prefix):
         package = super().pack(prefix)
         package += 'point_count = {}\n'.format(self.point_count)
+        package += 'degree = {}\n'.format(self.degree)
 
         my_prefix = '{}.{}'.format(prefix, 'parameters')
         for name, parameter in self.parameters.items():
@@ -154,6 +259,7 @@ class PolynomialProcedure(procedure.ProcedureShell):
     def unpack(self, package):
         super().unpack(package)
         self.point_count = package['point_count']
+        self.degree = package.get('degree', 1)
 
         # need a parameter factory and move to Procedure
         if 'parameters' in package:
@@ -163,77 +269,3 @@ class PolynomialProcedure(procedure.ProcedureShell):
                 self.parameters[setpoint.name] = setpoint
             
         return
-    
-class PolynomialEquation(equation.Equation):
-    def __init__(self, package=None):
-        super().__init__()
-        
-        self.degree = 1
-        self.coefficients = dict()
-        self.coefficients[0] = 0.0
-        self.coefficients[1] = 1.0
-
-        if package:
-            self.unpack(package)
-
-        return
-
-    def __len__(self):
-        return len(self.coefficients)
-
-    def generate(self, p1, p2):
-        is_valid = False
-        try:
-            dx = p2.target_quantity.value - p1.target_quantity.value
-            dy = p2.measured_quantity.value - p1.measured_quantity.value
-            self.coefficients[1] = dy / dx
-            self.coefficients[0] = p1.measured_quantity.value - self.coefficients[1] * p1.target_quantity.value
-            
-            is_valid = True
-        except ZeroDivisionError:
-            self.coefficients[1] = 0.00001
-            self.coefficients[0] = 0.0
-
-        return is_valid
-    
-    def evaluate_x(self, x_value):
-        y = self.coefficients[1] * x_value + self.coefficients[0]
-        
-        return y
-
-    def evaluate_y(self, y_value):
-        slope = self.coefficients[1]
-        if slope == 0:
-            slope = 0.00001
-
-        x = (y_value - self.coefficients[0]) / slope
-        
-        return x
-    
-    # def dump(self):
-    #     for key, value in self.coefficients.items():
-    #         print(key, round(value, 3))
-
-    #     return
-    
-    def pack(self, prefix):
-        package = super().pack(prefix)
-
-        package += 'degree = {}\n'.format(self.degree)
-
-        package += '[{}.{}]\n'.format(self.package_prefix, 'coefficients')
-        for key, value in self.coefficients.items():
-            package += '{} = {}\n'.format(key, value)
-
-        return package
-
-    def unpack(self, package):
-        super().unpack(package)
-        
-        self.degree = package['degree']
-        
-        for name, value in package['coefficients'].items():
-            self.coefficients[int(name)] = value
-        
-        return
-
@@ -0,0 +1,318 @@
+#
+# polynomial_equation.py - a polynomial equation to scale a sensors raw value.
+#                          part of the python sensor silo project.
+#
+# Copyright (c) 2026 Coburn Wightman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+
+import bisect
+
+from . import equation
+from .equation import numpy
+
+
+def horner(terms, x):
+    ''' evaluate a polynomial, constant term first, at x'''
+    result = 0.0
+    for term in reversed(terms):
+        result = result * x + term
+
+    return result
+
+def derivative(terms):
+    ''' the terms of a polynomials derivative'''
+    return tuple(i * term for i, term in enumerate(terms))[1:]
+
+def least_squares(x_values, y_values, degree):
+    ''' terms of the least squares polynomial through the points by way of
+        the normal equations.  None if the points can't determine one.'''
+    size = degree + 1
+
+    # augmented normal matrix [sum(x^(i+j)) | sum(y*x^i)]
+    powers = [0.0] * (2 * degree + 1)
+    moments = [0.0] * size
+    for x, y in zip(x_values, y_values):
+        power = 1.0
+        for k in range(2 * degree + 1):
+            powers[k] += power
+            if k < size:
+                moments[k] += y * power
+            power *= x
+
+    matrix = [[powers[i + j] for j in range(size)] + [moments[i]] for i in range(size)]
+
+    # gaussian elimination with partial pivoting
+    for col in range(size):
+        pivot = max(range(col, size), key=lambda row: abs(matrix[row][col]))
+        if abs(matrix[pivot][col]) < 1e-12:
+            return None
+        matrix[col], matrix[pivot] = matrix[pivot], matrix[col]
+
+        for row in range(col + 1, size):
+            factor = matrix[row][col] / matrix[col][col]
+            for k in range(col, size + 1):
+                matrix[row][k] -= factor * matrix[col][k]
+
+    terms = [0.0] * size
+    for row in reversed(range(size)):
+        total = matrix[row][size] - sum(matrix[row][k] * terms[k] for k in range(row + 1, size))
+        terms[row] = total / matrix[row][row]
+
+    return terms
+
+def newton(terms, slope_terms, y_value, x, iterations=16):
+    ''' solve horner(terms, x) = y_value for x, starting from x'''
+    for i in range(iterations):
+        slope = horner(slope_terms, x)
+        if slope == 0:
+            break
+
+        step = (horner(terms, x) - y_value) / slope
+        x -= step
+        if abs(step) <= 1e-12 * (1.0 + abs(x)):
+            break
+
+    return x
+
+class PolynomialEquation(equation.Equation):
+    ''' y = c0 + c1*x + c2*x^2 ... of the scaled x_value and the raw y_value.
+        evaluate_x() is the polynomial, evaluate_y() its inverse.'''
+    def __init__(self, package=None):
+        super().__init__()
+        
+        self.degree = 1
+        self.coefficients = dict()
+        self.coefficients[0] = 0.0
+        self.coefficients[1] = 1.0
+
+        # calibrated range of x, seeds the inverse of higher degrees
+        self.x_min = None
+        self.x_max = None
+        self.inverse_points = 64
+
+        if package:
+            self.unpack(package)
+
+        return
+
+    def __len__(self):
+        return len(self.coefficients)
+
+    @property
+    def terms(self):
+        ''' the coefficients, constant term first'''
+        return tuple(self.coefficients.get(i, 0.0) for i in range(self.degree + 1))
+
+    @property
+    def is_linear(self):
+        if self.degree < 2:
+            return True
+
+        return all(self.coefficients.get(i, 0.0) == 0 for i in range(2, self.degree + 1))
+
+    @property
+    def inverse_table(self):
+        ''' (y_values, x_values) of the polynomial across the calibrated range,
+            ordered by y, to seed evaluate_y().  None if the range is unknown.'''
+        if self.x_min is None or self.x_max is None or self.x_min == self.x_max:
+            return None
+
+        if self.__dict__.get('_inverse_revision') != self.revision:
+            # stash in __dict__ so building the table isn't itself a change
+            step = (self.x_max - self.x_min) / (self.inverse_points - 1)
+            x_values = [self.x_min + i * step for i in range(self.inverse_points)]
+            points = sorted((horner(self.terms, x), x) for x in x_values)
+
+            self.__dict__['_inverse'] = ([y for y, x in points], [x for y, x in points])
+            self.__dict__['_inverse_revision'] = self.revision
+
+        return self._inverse
+
+    def generate(self, p1, p2):
+        is_valid = False
+        try:
+            dx = p2.target_quantity.value - p1.target_quantity.value
+            dy = p2.measured_quantity.value - p1.measured_quantity.value
+            self.coefficients[1] = dy / dx
+            self.coefficients[0] = p1.measured_quantity.value - self.coefficients[1] * p1.target_quantity.value
+            
+            is_valid = True
+        except ZeroDivisionError:
+            self.coefficients[1] = 0.00001
+            self.coefficients[0] = 0.0
+
+        self.changed()
+
+        return is_valid
+
+    def fit_setpoints(self, setpoints):
+        ''' least squares fit through the target and measured values of setpoints'''
+        x_values = [setpoint.target_quantity.value for setpoint in setpoints]
+        y_values = [setpoint.measured_quantity.value for setpoint in setpoints]
+
+        return self.fit(x_values, y_values)
+
+    def fit(self, x_values, y_values):
+        ''' least squares fit of our degree to the points, or as near to our degree
+            as the number of points allows.  the points may be every sample taken
+            rather than just setpoint means.  returns False, with the coefficients
+            reset as generate() does, if the points can't determine a fit.'''
+        count = len(x_values)
+        if count < 2 or min(x_values) == max(x_values):
+            return self.fit_failed()
+
+        degree = min(self.degree, count - 1)
+
+        if numpy is not None:
+            x_array = numpy.asarray(x_values, dtype=float)
+            y_array = numpy.asarray(y_values, dtype=float)
+            terms = [float(term) for term in numpy.polynomial.polynomial.polyfit(x_array, y_array, degree)]
+        else:
+            terms = least_squares(x_values, y_values, degree)
+            if terms is None:
+                return self.fit_failed()
+
+        coefficients = dict()
+        for i in range(self.degree + 1):
+            coefficients[i] = terms[i] if i < len(terms) else 0.0
+
+        self.coefficients = coefficients
+        self.x_min = float(min(x_values))
+        self.x_max = float(max(x_values))
+
+        return True
+
+    def fit_failed(self):
+        ''' drop the previous fit, so it isn't used as though it were current'''
+        coefficients = {i: 0.0 for i in range(self.degree + 1)}
+        coefficients[1] = 0.00001
+        self.coefficients = coefficients
+
+        return False
+    
+    def evaluate_x(self, x_value):
+        return horner(self.terms, x_value)
+
+    def evaluate_y(self, y_value):
+        if self.is_linear:
+            slope = self.coefficients[1]
+            if slope == 0:
+                slope = 0.00001
+
+            x = (y_value - self.coefficients[0]) / slope
+
+            return x
+
+        return newton(self.terms, derivative(self.terms), y_value, self.seed(y_value))
+
+    def seed(self, y_value):
+        ''' a first guess at evaluate_y() from the inverse table, or the linear terms'''
+        table = self.inverse_table
+        if table is None:
+            slope = self.coefficients[1] or 0.00001
+            return (y_value - self.coefficients[0]) / slope
+
+        y_values, x_values = table
+        index = bisect.bisect_left(y_values, y_value)
+        if index == len(y_values):
+            index -= 1
+        elif index > 0 and y_value - y_values[index - 1] < y_values[index] - y_value:
+            index -= 1
+
+        return x_values[index]
+
+    def compile(self):
+        if not self.is_linear:
+            terms = self.terms
+            slope_terms = derivative(terms)
+            seed = self.seed
+
+            def evaluate_y(y_value):
+                return newton(terms, slope_terms, y_value, seed(y_value))
+
+            return evaluate_y
+
+        offset = self.coefficients[0]
+        slope = self.coefficients[1]
+        if slope == 0:
+            slope = 0.00001
+
+        reciprocal_slope = 1.0 / slope
+
+        def evaluate_y(y_value):
+            return (y_value - offset) * reciprocal_slope
+
+        return evaluate_y
+
+    def evaluate_x_numpy(self, x_values):
+        return horner(self.terms, x_values)
+
+    def evaluate_y_numpy(self, y_values):
+        if self.is_linear:
+            slope = self.coefficients[1]
+            if slope == 0:
+                slope = 0.00001
+
+            return (y_values - self.coefficients[0]) / slope
+
+        terms = self.terms
+        slope_terms = derivative(terms)
+
+        table = self.inverse_table
+        if table is None:
+            slope = self.coefficients[1] or 0.00001
+            x = (y_values - self.coefficients[0]) / slope
+        else:
+            x = numpy.interp(y_values, table[0], table[1])
+
+        for i in range(16):
+            slope = horner(slope_terms, x)
+            with numpy.errstate(divide='ignore', invalid='ignore'):
+                step = numpy.where(slope == 0, 0.0, (horner(terms, x) - y_values) / slope)
+            x = x - step
+
+        return x
+    
+    # def dump(self):
+    #     for key, value in self.coefficients.items():
+    #         print(key, round(value, 3))
+
+    #     return
+    
+    def pack(self, prefix):
+        package = super().pack(prefix)
+
+        package += 'degree = {}\n'.format(self.degree)
+        if self.x_min is not None and self.x_max is not None:
+            package += 'x_min = {}\n'.format(self.x_min)
+            package += 'x_max = {}\n'.format(self.x_max)
+
+        package += '[{}.{}]\n'.format(self.package_prefix, 'coefficients')
+        for key, value in self.coefficients.items():
+            package += '{} = {}\n'.format(key, value)
+
+        return package
+
+    def unpack(self, package):
+        super().unpack(package)
+        
+        self.degree = package['degree']
+        self.x_min = package.get('x_min')
+        self.x_max = package.get('x_max')
+        
+        for name, value in package['coefficients'].items():
+            self.coefficients[int(name)] = value
+
+        self.changed()
+        
+        return
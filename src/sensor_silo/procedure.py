@@ -19,6 +19,7 @@ import datetime
 
 from . import shell
 from . import equation
+from . import writer
 
 class ProcedureShell(shell.Shell):
     intro = 'Generic Procedure Configuration'
@@ -38,6 +39,20 @@ class ProcedureShell(shell.Shell):
         self.unit_id = None
         self.interval = datetime.timedelta(days=180)
 
+        self.saved_package = None # our package when last saved
+
+        return
+
+    @property
+    def is_dirty(self):
+        ''' true if our package differs from the one last saved.  procedures
+            are few and their parameters are edited in place by sub shells,
+            so compare packages rather than track each attribute.'''
+        return self.pack('procedure') != self.saved_package
+
+    def mark_saved(self):
+        self.saved_package = self.pack('procedure')
+
         return
 
     @property
@@ -145,20 +160,49 @@ class ProcedureShell(shell.Shell):
         
         if not self.evaluate(sensor):
             print(' sensor calibration canceled.')
-        else:
-            sensor.calibration.timestamp = datetime.date(1970, 1, 1)
-            if self.save(sensor):
-                sensor.calibration.timestamp = datetime.date.today()
-            else:
-                print(' sensor calibration failed.  calibration invalidated.')
+        elif not self.apply(sensor):
+            print(' sensor calibration failed.  calibration invalidated.')
                
         # sensor.calibration.show()
 
         return
 
+    def run_group(self, sensors):
+        ''' runs a calibration procedure on a group of preped sensors of our
+            kind in one session, then saves each sensors calibration on its own'''
+
+        if not self.evaluate_group(sensors):
+            print(' sensor calibration canceled.')
+            return
+
+        for sensor in sensors:
+            if not self.apply(sensor):
+                print(' sensor {} calibration failed.  calibration invalidated.'.format(sensor.id))
+
+        return
+
+    def apply(self, sensor):
+        ''' save an evaluated calibration, invalidating it if save fails'''
+        sensor.calibration.timestamp = datetime.date(1970, 1, 1)
+        if not self.save(sensor):
+            return False
+
+        sensor.calibration.timestamp = datetime.date.today()
+
+        return True
+
     def evaluate(self, sensor):
         ''' specialized evaluation of sensor calibration constants'''
         raise NotImplemented
+
+    def evaluate_group(self, sensors):
+        ''' evaluation of a group of sensors.  one after another unless
+            specialized to measure them together'''
+        for sensor in sensors:
+            if not self.evaluate(sensor):
+                return False
+
+        return True
     
     def save(self, sensor): # xx poor name choice for function that calculates the factors/coeffcients
         ''' specialized save/use of sensor calibration constants'''
@@ -167,12 +211,12 @@ class ProcedureShell(shell.Shell):
     def pack(self, prefix):
         # Procedure
         package = ''
-        package += 'type = "{}"\n'.format(self.type)
-        package += 'kind = "{}"\n'.format(self.kind)
-        package += 'scaled_units = "{}"\n'.format(self.scaled_units)
-        package += 'unit_id = "{}"\n'.format(self.unit_id)
-        package += 'stream_type = "{}"\n'.format(self.stream_type)
-        package += 'stream_address = "{}"\n'.format(self.stream_address)
+        package += 'type = {}\n'.format(writer.quote(self.type))
+        package += 'kind = {}\n'.format(writer.quote(self.kind))
+        package += 'scaled_units = {}\n'.format(writer.quote(self.scaled_units))
+        package += 'unit_id = {}\n'.format(writer.quote(self.unit_id))
+        package += 'stream_type = {}\n'.format(writer.quote(self.stream_type))
+        package += 'stream_address = {}\n'.format(writer.quote(self.stream_address))
         package += 'interval = {}\n'.format(self.interval.days)
         
         return package
@@ -291,15 +335,28 @@ class Procedures(shell.Shell):
         return False
 
     def pack(self, prefix):
-        package = ''
-        
-        for key, procedure in self.procedures.items():
-            my_prefix = '{}.{}'.format(prefix, key)
-            package += '\n'
-            package += '[{}]\n'.format(my_prefix)
-            package += procedure.pack(my_prefix)
+        return ''.join(self.iterpack(prefix))
+
+    def iterpack(self, prefix, keys=None):
+        if keys is None:
+            keys = self.procedures.keys()
+
+        for key in keys:
+            procedure = self.procedures[key]
+            my_prefix = '{}.{}'.format(prefix, writer.key(key))
+            yield '\n[{}]\n{}'.format(my_prefix, procedure.pack(my_prefix))
             
-        return package
+        return
+
+    def changes(self):
+        ''' returns keys of procedures changed since mark_saved()'''
+        return [key for key, procedure in self.procedures.items() if procedure.is_dirty]
+
+    def mark_saved(self):
+        for procedure in self.procedures.values():
+            procedure.mark_saved()
+
+        return
 
     def unpack(self, package):
         for key, template in package.items():
@@ -15,7 +15,7 @@
 # GNU Affero General Public License for more details.
 #
 
-from . import shell
+from . import writer
 
 class Quantity(): # Parameter?
     def __init__(self, name='name', units='units', value=None, prefix=None, package=None):
@@ -88,12 +88,12 @@ class Quantity(): # Parameter?
         # Constant parameter
         package = ''
         package += '[{}]\n'.format(prefix)
-        package += 'type = "{}"\n'.format(self.type)
+        package += 'type = {}\n'.format(writer.quote(self.type))
         
-        package += 'name = "{}"\n'.format(self._name)
+        package += 'name = {}\n'.format(writer.quote(self._name))
         package += 'value = {}\n'.format(self._value)
-        package += 'units = "{}"\n'.format(self._units)
-        package += 'prefix = "{}"\n'.format(self._prefix)
+        package += 'units = {}\n'.format(writer.quote(self._units))
+        package += 'prefix = {}\n'.format(writer.quote(self._prefix))
 
         return package
 
@@ -105,47 +105,3 @@ class Quantity(): # Parameter?
         self._prefix = package['prefix']
 
         return
-
-    
-class QuantityShell(shell.Shell):
-    intro = 'Parameter Configuration'
-    prompt = 'quantity: '
-
-    def __init__(self, quantity, *kwargs):
-        super().__init__(*kwargs)
-
-        self.quantity = quantity
-        self.title = 'empty title'
-
-        return
-
-    @property
-    def intro(self):
-        return self.title
-
-    @property
-    def prompt(self):
-        return self.prompt
-    
-    def do_show(self, arg=None):
-        ''' print present values'''
-        print(' Calibration Point')
-        print('  Name:   {}'.format(self.quantity.name))
-        print('  Units:   {}'.format(self.quantity.units))
-        print('  Value:   {} {}'.format(self.quantity.value, self.quantity.units))
-            
-        return False
-    
-    def do_value(self, arg):
-        ''' the first (lowest pH) in a two or three point calibration'''
-        self.quantity.value = float(arg)
-
-        self.do_show()
-        
-        return False
-
-    def dump(self):
-        str = '{}'.format(self.quantity)
-
-        return str
-
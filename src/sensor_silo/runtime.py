@@ -0,0 +1,422 @@
+#
+# runtime.py - the deployed, headless side of the library.
+#              part of the python sensor silo project.
+#
+# Copyright (c) 2026 Coburn Wightman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+
+import os
+import re
+import math
+import time
+
+import tomllib as tomli
+
+from . import sensor
+from .deployment import Deployment
+from . import scheduler
+from . import expiry
+from . import filters
+from . import writer
+
+
+class Deploy():
+    def __init__(self, filename=None, history_depth=0):
+        self.deployment = Deployment()
+        self.sensors = None
+        self.scheduler = None
+        self.workers = None
+        self.expiry = None # expiry.ExpirySchedule of the deployed sensors
+        self.filters = None # filters.FilterBank, a row per sensor
+
+        # samples of history kept per deployed sensor, 0 for none
+        self.history_depth = history_depth
+
+        if filename is not None:
+            self.load(filename)
+            
+        return
+
+    @property
+    def key_name(self):
+        return self.deployment.key_name
+
+    @property
+    def folder_name(self):
+        return self.deployment.folder_name
+
+    @property
+    def group_name(self):
+        return self.deployment.group_name
+
+    @property
+    def stream_period(self):
+        return self.deployment.update_interval*60
+
+    @property
+    def sample_period(self):
+        return self.stream_period / self.over_sample_rate
+
+    @property
+    def over_sample_rate(self):
+        return self.deployment.over_sample_rate
+
+    @property
+    def time_constant(self):
+        tc = self.deployment.filter_in_percent / 100
+        if tc < 1:
+            tc = 1
+            
+        return tc
+
+    @property
+    def filter_type(self):
+        return self.deployment.filter_type
+
+    @property
+    def i2c_stemma(self):
+        return self.deployment.i2c_stemma
+
+    @property
+    def i2c_qwiic(self):
+        return self.deployment.i2c_qwiic
+
+    def port_number(self, sensor):
+        ''' the i2c bus number of the port a sensor is deployed on'''
+        if sensor.port == 'stemma':
+            return self.i2c_stemma
+
+        return self.i2c_qwiic
+    
+    def load(self, filename=None):
+        if filename is not None and not filename.endswith('.toml'):
+            from . import store # only store users pay for the import
+
+            if store.is_store(filename):
+                self.load_store(filename)
+                return
+
+        config = ConfigFile()
+        filename = config.get_filename(filename)
+        package = config.load(filename)
+        self.unpack(package)
+
+        return
+    
+    def connect(self, streams):
+        # xx build an iterator
+        for sensor in self.sensors.values():
+            if not sensor.is_deployed:
+                # print(' deploy.connect(): NO DEPLOYED ADDRESS')
+                pass
+            else:
+                stream = streams[sensor.stream_type]() # create a new hardware stream instance
+                stream.port = self.port_number(sensor) # the bus its worker thread owns
+                sensor.connect(stream)
+
+                if self.history_depth > 0:
+                    from . import history
+                    sensor.history = history.History(self.history_depth)
+
+        self.scheduler = scheduler.ConversionScheduler(self.deployed)
+
+        # bus worker threads are started by the first scan_buses()
+        self.stop()
+        self.workers = None
+
+        self.expiry = expiry.ExpirySchedule(self.deployed, self.expired)
+
+        # rows follow the calibration table, so a scan scales and filters in step
+        self.filters = filters.FilterBank(self.sensors.keys(), self.filter_type, self.time_constant)
+        for key, item in self.sensors.items():
+            item.filter = filters.SensorFilter(self.filters, key) if item.is_deployed else None
+
+        return
+
+    def expired(self, sensors):
+        ''' called as deployed calibrations expire'''
+        for sensor in sensors:
+            print(' deploy: calibration of {} expired {}'.format(sensor.id, sensor.due_date))
+
+        return
+
+    def stop(self):
+        ''' stop the bus worker threads'''
+        if self.workers is not None and self.workers.started:
+            self.workers.stop()
+
+        return
+
+    @property
+    def deployed(self):
+        ''' iterate over the deployed and connected sensors'''
+        for sensor in self.sensors.values():
+            if sensor.is_deployed and sensor.stream is not None:
+                yield sensor
+
+    def record(self):
+        ''' append each deployed sensors reading to its history'''
+        timestamp = time.time()
+        for sensor in self.deployed:
+            if sensor.history is not None:
+                sensor.record(timestamp)
+
+        return
+
+    def filter(self):
+        ''' scale the latest reading of every deployed sensor and step each
+            sensors filter, all in one pass.  returns the filtered values in
+            key order, nan for a sensor not deployed.'''
+        raw_values = [item.raw_value if item.filter is not None else math.nan for item in self.sensors.values()]
+
+        return self.filters.update(self.sensors.scale(raw_values))
+
+    def scan(self):
+        ''' update every deployed sensor once, keeping each device converting'''
+        self.scheduler.scan()
+        self.record()
+        self.filter()
+        self.expiry.check()
+
+        return
+
+    def scan_buses(self):
+        ''' update every deployed sensor once with a worker thread per i2c bus.
+            returns a workers.Scan snapshot of the readings and bus timing.'''
+        self.expiry.check()
+
+        if self.workers is None:
+            self.workers = self.bus_workers()
+
+        scan = self.workers.scan()
+        self.filter()
+
+        return scan
+
+    def bus_workers(self):
+        ''' a workers.BusWorkers of the deployed sensors grouped by i2c bus'''
+        from . import workers # only bus scanning pays for threading
+
+        buses = dict()
+        for sensor in self.deployed:
+            buses.setdefault(self.port_number(sensor), []).append(sensor)
+
+        return workers.BusWorkers(buses)
+
+    async def scan_async(self):
+        ''' update every deployed sensor once.  sensors on separate devices
+            convert concurrently, sensors sharing a device take turns.'''
+        await self.scheduler.scan_async()
+        self.record()
+        self.filter()
+
+        return
+
+    async def run_async(self, handler=None, scans=None):
+        ''' scan every sample_period, passing the deployed sensors to handler
+            after each scan.  runs forever if scans is None.'''
+        import asyncio # only async users pay for the import
+
+        loop = asyncio.get_running_loop()
+
+        # calibrations expire by timer rather than by checking each scan
+        self.expiry.check()
+        self.expiry.arm(loop)
+
+        count = 0
+        next_scan = loop.time()
+        try:
+            while scans is None or count < scans:
+                await self.scan_async()
+                if handler is not None:
+                    handler(list(self.deployed))
+
+                count += 1
+                next_scan += self.sample_period
+                pause_time = next_scan - loop.time()
+                if pause_time < 0:
+                    pause_time = 0
+                    next_scan = loop.time()
+
+                await asyncio.sleep(pause_time)
+        finally:
+            self.expiry.disarm()
+
+        return
+
+    def load_store(self, folder):
+        ''' load a store folder or database, reading only the sensors deployed on us'''
+        from . import store
+
+        with store.open_store(folder, index=False) as sensor_store:
+            self.unpack(sensor_store.load_silo())
+
+            self.sensors = sensor.Sensors()
+            for key in sensor_store.load_deployed(self.key_name):
+                self.sensors[key] = sensor_store.read(key)
+
+        self.check_addresses()
+
+        return
+
+    def unpack(self, package):
+        if 'deployment' in package:
+            self.deployment.unpack(package['deployment'])
+
+        if 'sensors' in package:
+            self.sensors = sensor.Sensors(package['sensors'])
+
+            # sensors deployed on another deployment are not ours
+            for key, item in list(self.sensors.items()):
+                if item.is_deployed and not item.is_deployed_on(self.key_name):
+                    del self.sensors[key]
+
+            self.check_addresses()
+
+        return
+
+    def check_addresses(self):
+        ''' warn of deployed sensors sharing an address'''
+        for address, keys in self.sensors.index.duplicate_addresses().items():
+            print(' deploy: duplicate address {}: {}'.format(address, ', '.join(keys)))
+
+        return
+
+
+class ConfigFile():
+    ''' the silo file, plus a journal of the sections changed since it was
+        last written in full.  load() replays the journal over the file.
+
+        an incremental save only appends an entry to the journal, synced to
+        disk; the file is rewritten, and the journal dropped, only when the
+        shell compacts.  an entry torn by a crash while appending is skipped.'''
+    def __init__(self):
+        self.suffix = '.toml'
+        self.filename = 'deployment{}'.format(self.suffix)
+        self.journal_length = 0 # entries replayed by the last load
+
+        return
+
+    def journal_name(self, filename):
+        return '{}.journal{}'.format(filename[:-len(self.suffix)], self.suffix)
+
+    def load(self, filename=None):
+        if filename is None:
+            filename = self.filename
+            
+        package = ''
+        with open(filename, 'rb') as fp:
+            package = tomli.load(fp)
+            print(' calibration data loaded from {}.'.format(filename))
+
+        self.journal_length = 0
+        journal_name = self.journal_name(filename)
+        if os.path.exists(journal_name):
+            journal = self.load_journal(journal_name)
+
+            self.replay(package, journal)
+            print(' {} journal entries replayed from {}.'.format(self.journal_length, journal_name))
+
+        return package
+
+    def load_journal(self, journal_name):
+        ''' the entries of a journal, less a last entry cut short'''
+        with open(journal_name, 'r') as fp:
+            text = fp.read()
+
+        try:
+            return tomli.loads(text).get('journal', dict())
+        except tomli.TOMLDecodeError:
+            headers = list(re.finditer(r'^\[journal\.\d+\]$', text, re.MULTILINE))
+            if not headers:
+                raise
+
+        # only the last entry may be torn, an earlier error is real damage
+        journal = tomli.loads(text[:headers[-1].start()]).get('journal', dict())
+        print(' skipped a partial journal entry at the end of {}.'.format(journal_name))
+
+        return journal
+
+    def replay(self, package, journal):
+        ''' apply journal entries, in order, to package'''
+        for number in sorted(journal, key=int):
+            entry = journal[number]
+
+            sensors = package.setdefault('sensors', dict())
+            for key in entry.get('removed_sensors', []):
+                sensors.pop(key, None)
+
+            for section in ['procedures', 'sensors']:
+                package.setdefault(section, dict()).update(entry.get(section, dict()))
+
+            if 'deployment' in entry:
+                package['deployment'] = entry['deployment']
+
+            self.journal_length += 1
+
+        return
+
+    def save(self, package, filename=None):
+        ''' package is a string or an iterable of strings, such as Shell.iterpack().
+            the file is written in full, so any journal is dropped.'''
+        if filename is None:
+            filename = self.filename
+
+        writer.write_file(filename, package)
+        print(' calibration data saved to {}.'.format(filename))
+
+        journal_name = self.journal_name(filename)
+        if os.path.exists(journal_name):
+            os.remove(journal_name)
+            
+        self.filename = filename
+
+        return
+
+    def append(self, entry, filename=None):
+        ''' append a journal entry, a string or iterable of strings such as
+            Shell.iterjournal(), to the journal of filename'''
+        if filename is None:
+            filename = self.filename
+
+        if not isinstance(entry, str):
+            entry = ''.join(entry)
+
+        # one write of the whole entry, on disk before we return
+        journal_name = self.journal_name(filename)
+        with open(journal_name, 'a') as fp:
+            fp.write(entry)
+            fp.flush()
+            os.fsync(fp.fileno())
+
+        self.filename = filename
+
+        return
+
+    def get_filename(self, filename=None):
+        new_name = filename
+        if new_name is None:
+            new_name = input('enter filename without suffix ({}): '.format(self.filename))
+
+        # https://stackoverflow.com/a/7406369
+        keepcharacters = ('.','_')
+        new_name = ''.join(c for c in new_name if c.isalnum() or c in keepcharacters).rstrip()
+
+        filename = self.filename
+        if len(new_name) > 0:
+            filename = new_name
+
+        if not filename.endswith(self.suffix):
+            filename = filename + self.suffix
+
+        return filename
@@ -0,0 +1,178 @@
+#
+# scheduler.py - pipelines sensor conversions across the converters of a deployment.
+#                part of the python sensor silo project.
+#
+# Copyright (c) 2026 Coburn Wightman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+
+import time
+import heapq
+import collections
+
+
+class ConversionStats():
+    ''' conversion count and elapsed time of a device or a scan'''
+    def __init__(self):
+        self.conversions = 0
+        self.elapsed = 0.0
+
+        return
+
+    def __str__(self):
+        return 'n={}, elapsed={}s, rate={}/s'.format(self.conversions, round(self.elapsed, 3), round(self.rate, 1))
+
+    @property
+    def rate(self):
+        ''' conversions per second'''
+        return self.conversions / self.elapsed if self.elapsed > 0 else 0.0
+
+    def clear(self):
+        self.conversions = 0
+        self.elapsed = 0.0
+
+        return
+
+
+class ConversionScheduler():
+    ''' groups sensors by the device behind their stream and keeps every
+        device converting.  channels of a device convert one after another,
+        devices convert alongside each other.'''
+    def __init__(self, sensors=None):
+        self.devices = dict() # device key: list of sensors in conversion order
+        self.stats = dict()   # device key: ConversionStats, accumulated over all scans
+
+        self.scan_count = 0
+        self.last_scan = ConversionStats()
+        self._device_time = dict()
+
+        if sensors is not None:
+            self.build(sensors)
+
+        return
+
+    def __len__(self):
+        return sum(len(sensors) for sensors in self.devices.values())
+
+    @property
+    def synopsis(self):
+        lines = ['scan {}: {}'.format(self.scan_count, self.last_scan)]
+        for key, stats in self.stats.items():
+            lines.append('  device {}: {}'.format(key, stats))
+
+        return '\n'.join(lines)
+
+    def device_key(self, sensor):
+        key = sensor.stream.device
+        if key is None:
+            # a converter all its own
+            key = id(sensor.stream)
+
+        return key
+
+    def build(self, sensors):
+        self.devices = collections.defaultdict(list)
+        for sensor in sensors:
+            self.devices[self.device_key(sensor)].append(sensor)
+
+        for sensors in self.devices.values():
+            sensors.sort(key=lambda sensor: str(sensor.address).lower())
+
+        self.devices = dict(self.devices)
+        self.stats = {key: ConversionStats() for key in self.devices}
+
+        return
+
+    def clear(self):
+        self.scan_count = 0
+        self.last_scan.clear()
+        for stats in self.stats.values():
+            stats.clear()
+
+        return
+
+    def scan(self):
+        ''' convert every sensor once.  a device starts its next channel as soon
+            as the last is collected, and the device due first is collected first.'''
+        start_time = time.monotonic()
+        self.last_scan.clear()
+
+        queues = {key: collections.deque(sensors) for key, sensors in self.devices.items()}
+        pending = [] # heap of (ready_time, sequence, key, sensor)
+        sequence = 0
+
+        for key, queue in queues.items():
+            sequence = self._start(key, queue.popleft(), pending, sequence)
+
+        while pending:
+            ready_time, _, key, sensor = heapq.heappop(pending)
+
+            pause_time = ready_time - time.monotonic()
+            if pause_time > 0:
+                time.sleep(pause_time)
+
+            sensor.stream.collect()
+            self._count(key, start_time)
+
+            if queues[key]:
+                sequence = self._start(key, queues[key].popleft(), pending, sequence)
+
+        self._finish(start_time)
+
+        return
+
+    async def scan_async(self):
+        ''' convert every sensor once, devices as concurrent tasks'''
+        import asyncio # only async users pay for the import
+
+        start_time = time.monotonic()
+        self.last_scan.clear()
+
+        async def convert(key, sensors):
+            for sensor in sensors:
+                await sensor.aupdate()
+                self._count(key, start_time)
+
+            return
+
+        await asyncio.gather(*[convert(key, sensors) for key, sensors in self.devices.items()])
+
+        self._finish(start_time)
+
+        return
+
+    def _start(self, key, sensor, pending, sequence):
+        sensor.stream.start()
+        ready_time = time.monotonic() + sensor.stream.conversion_time
+        heapq.heappush(pending, (ready_time, sequence, key, sensor))
+
+        return sequence + 1
+
+    def _count(self, key, start_time):
+        stats = self.stats[key]
+        stats.conversions += 1
+        self.last_scan.conversions += 1
+
+        # device time is charged up to its latest collection
+        self._device_time[key] = time.monotonic() - start_time
+
+        return
+
+    def _finish(self, start_time):
+        for key, elapsed in self._device_time.items():
+            self.stats[key].elapsed += elapsed
+
+        self._device_time.clear()
+        self.last_scan.elapsed = time.monotonic() - start_time
+        self.scan_count += 1
+
+        return
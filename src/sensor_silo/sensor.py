@@ -15,15 +15,22 @@
 # GNU Affero General Public License for more details.
 #
 
+import math
+import time
+import datetime
 import collections
 
-from . import shell
 from . import calibration
+from . import table
+from . import index
+from . import writer
+from .equation import Equation
 
 # lets move to a source/sink nomenclature
 class Stream():
     def __init__(self, type):
         self.type = type
+        self.port = None # i2c bus number, set by Deploy.connect() before connect()
 
         return
 
@@ -35,6 +42,42 @@ class Stream():
         ''' complete a conversion'''
         raise NotImplemented
     
+    @property
+    def device(self):
+        ''' key of the converter behind this stream.  streams sharing a device
+            key share a converter and must take turns.  None if not shared.
+            streams on separate ports are scanned by separate threads, so a
+            key should include the port.'''
+        return None
+
+    @property
+    def conversion_time(self):
+        ''' seconds between start() and collect(), 0 if start() does it all'''
+        return 0
+
+    def start(self):
+        ''' begin a conversion.  streams that can't split a conversion
+            into start and collect complete it here with update()'''
+        self.update()
+        return
+
+    def collect(self):
+        ''' finish a conversion begun by start()'''
+        return
+
+    async def aupdate(self):
+        ''' complete a conversion, awaiting the conversion time'''
+        import asyncio # only async users pay for the import
+
+        self.start()
+
+        if self.conversion_time > 0:
+            await asyncio.sleep(self.conversion_time)
+
+        self.collect()
+
+        return
+
     @property
     def raw_value(self):
         ''' returns a float'''
@@ -47,6 +90,10 @@ class Stream():
     
     
 class Sensor():
+    packed = ('id', 'kind', 'name', 'location', 'property', 'stream_type', 'address', 'port', 'deployment', 'calibration')
+    revision = 0 # bumped by a change to a packed value
+    epoch = 0    # bumped by a change to any sensor, so indexes know to rebuild
+
     def __init__(self, sensor_id):
         self.id = sensor_id.strip().lower()
         
@@ -56,14 +103,48 @@ class Sensor():
         self.stream = None
         self.calibration = None # calibration.Calibration()
         self.use_deployed_address = False
+        self.history = None # history.History(), attached by deploy
+        self.filter = None # filters.SensorFilter(), attached by deploy
         
         # deployed sensor values
         self.name = ''
         self.location = ''
         self.address = 'ND'
+        self.port = 'qwiic' # qwiic or stemma i2c port
+        self.deployment = '' # key name of the deployment it is on, '' for any
+
+        return
 
+    def __setattr__(self, name, value):
+        changed = name in self.packed and getattr(self, name, None) != value
+        super().__setattr__(name, value)
+
+        if changed:
+            self.__dict__['revision'] = self.revision + 1
+            Sensor.epoch += 1
+        
         return
 
+    @property
+    def due_date(self):
+        ''' date the calibration is due, None if none is required'''
+        if self.calibration is None:
+            return None
+
+        due_date = self.calibration.due_date
+        if not isinstance(due_date, datetime.date):
+            return None
+
+        return due_date
+
+    @property
+    def stamp(self):
+        ''' changes whenever the package of this sensor would'''
+        if self.calibration is None:
+            return (self.revision,)
+
+        return (self.revision,) + self.calibration.stamp
+
     # @property
     # def type(self):
     #     return self.__class__.__name__
@@ -100,9 +181,27 @@ class Sensor():
 
         return
     
+    def matches(self, kind=None, address=None, due_before=None):
+        ''' true if of kind, at address and due for calibration before the
+            date due_before, each only if given'''
+        if kind is not None and self.kind != kind:
+            return False
+
+        if address is not None and self.address.lower() != address.lower():
+            return False
+
+        if due_before is not None and (self.due_date is None or self.due_date >= due_before):
+            return False
+
+        return True
+
     @property
     def is_deployed(self):
         return self.address.lower() != 'nd'
+
+    def is_deployed_on(self, key_name):
+        ''' true if deployed, either on the deployment of key_name or on any'''
+        return self.is_deployed and self.deployment in ('', key_name)
     
     @property
     def raw_value(self):
@@ -116,6 +215,14 @@ class Sensor():
     def scaled_value(self):
         return self.evaluate(self.raw_value)
 
+    @property
+    def filtered_value(self):
+        ''' the scaled value through the deployments filter, as of the last scan'''
+        if self.filter is None:
+            return self.scaled_value
+
+        return self.filter.value
+
     @property
     def scaled_units(self):
         return self.calibration.scaled_units
@@ -125,25 +232,47 @@ class Sensor():
         return self.calibration.unit_id
 
     def evaluate(self, raw_value):
-        return self.calibration.equation.evaluate_y(raw_value)
+        return self.calibration.equation.evaluator(raw_value)
 
     def update(self):
         self.stream.update()
 
         return
+
+    async def aupdate(self):
+        await self.stream.aupdate()
+
+        return
+
+    def record(self, timestamp=None):
+        ''' append the present reading to the sensors history'''
+        if timestamp is None:
+            timestamp = time.time()
+
+        raw_value = self.raw_value
+
+        scaled_value = math.nan
+        if self.calibration is not None and self.calibration.equation is not None:
+            scaled_value = self.evaluate(raw_value)
+
+        self.history.push(timestamp, raw_value, scaled_value)
+
+        return
     
     def pack(self, prefix):
         # sensor
         package = ''
-        package += 'id = "{}"\n'.format(self.id)
-        package += 'kind = "{}"\n'.format(self.kind)
+        package += 'id = {}\n'.format(writer.quote(self.id))
+        package += 'kind = {}\n'.format(writer.quote(self.kind))
 
-        package += 'name = "{}"\n'.format(self.name)
-        package += 'location = "{}"\n'.format(self.location)
-        package += 'property = "{}"\n'.format(self.property)
+        package += 'name = {}\n'.format(writer.quote(self.name))
+        package += 'location = {}\n'.format(writer.quote(self.location))
+        package += 'property = {}\n'.format(writer.quote(self.property))
 
-        package += 'stream_type = "{}"\n'.format(self.stream_type)
-        package += 'address = "{}"\n'.format(self.address)
+        package += 'stream_type = {}\n'.format(writer.quote(self.stream_type))
+        package += 'address = {}\n'.format(writer.quote(self.address))
+        package += 'port = {}\n'.format(writer.quote(self.port))
+        package += 'deployment = {}\n'.format(writer.quote(self.deployment))
         
         if self.calibration.is_valid:
             my_prefix = '{}.{}'.format(prefix, 'calibration')
@@ -163,6 +292,8 @@ class Sensor():
         
         self.stream_type = package.get('stream_type')
         self.address = package.get('address', 'ND')
+        self.port = package.get('port', 'qwiic')
+        self.deployment = package.get('deployment', '')
 
         if 'calibration' in package:
             self.calibration = calibration.Calibration(package['calibration'])
@@ -170,424 +301,181 @@ class Sensor():
         return
 
 
-class SensorShell(shell.Shell):
-    intro = 'Sensor Configuration.  x to return to previous menu.'
-    # prompt = 'sensor: '
-
-    def __init__(self, sensor, procedure, *kwargs):
-        super().__init__(*kwargs)
-
-        self.sensor = sensor
-        self.procedure = procedure
-        
-        return
-
-    @property
-    def kind(self):
-        return self.sensor.kind
-    
-    @property
-    def id(self):
-        return self.sensor.id
-    
-    @property
-    def prompt(self):
-        
-        item = '{}.{}'.format(self.sensor.stream.address, self.sensor.id)
-        if self.sensor.calibration.is_valid:
-            item = self.green(item)
-        else:
-            item =  self.red(item)
-            
-        prompt = '{} ({}): '.format(self.cyan('edit sensor'), item)
-            
-        return prompt
-
-    def preloop(self):
-        self.do_show()
-
-        return False
-    
-    def emptyline(self):
-        self.do_show()
-        
-        return False
-    
-    def do_x(self, arg):
-        ''' exit to previous menu'''
-        return True
-    
-    def do_show(self, arg=None):
-        ''' print sensors parameters'''
-        print(' ID:   {}'.format(self.id))
-        print('  Kind: {}'.format(self.sensor.kind))
-        print('  Property: {}'.format(self.sensor.property))
-        print('  Name: {}'.format(self.sensor.name))
-        print('  Location: {}'.format(self.sensor.location))
-
-        print('  Stream Type:  {}'.format(self.sensor.stream.type))
-        print('  Deployed Address: {}'.format(self.sensor.address))
-        print('  calibration due:  {}'.format(self.sensor.calibration.due_date))
-        
-        return False
-
-    def do_address(self, arg=None):
-        ''' address <addr> enter deployed pHorp address of sensor, or ND for Not Deployed'''
-
-        err_str = self.sensor.stream.validate_address(arg)
-        if not err_str:
-            self.sensor.address = arg.strip().upper() #self.sensor.stream.address
-            self.sensor.reconnect()
-        
-        self.do_show()
-        
-        if err_str:
-            print(self.red(err_str))
-        
-        return False
-
-    def do_name(self, arg):
-        ''' name <name> enter deployed name of sensor'''
-        name =  arg.strip()
-        
-        if len(name) > 0:
-            self.sensor.name = name
-
-        self.do_show()
-
-        return False
-
-    def do_location(self, arg):
-        ''' location <location> enter deployed location of sensor'''
-        location = arg.strip()
-        
-        if len(location) > 0:
-            self.sensor.location = location
+class Sensors(collections.UserDict):
+    def __init__(self, package=None):
+        super().__init__()
+        ### self.data contains our dict()
 
-        self.do_show()
+        self.revision = 0 # bumped when a sensor is added or removed
+        self._table = None
+        self._table_stamp = None
+        self._index = None
+        self._index_epoch = None
+        self._index_stamps = dict() # key: index_stamp() of the sensor as indexed
 
-        return False
-    
-    def do_dump(self, arg):
-        ''' dump sensor's coefficients and stats'''
-        self.dump()
-        
-        return False
+        self.saved = dict() # key: sensor stamp when last saved
+        self.removed = set() # saved keys since deleted
 
-    def do_cal(self, arg):
-        ''' acquire sensor calibration data'''
-        self.procedure.run(self.sensor)
+        if package is not None:
+            self.unpack(package)
             
         return
 
-    def do_meas(self, arg):
-        ''' meas <mV> Evaluates mV in engineering units, sensor value if blank.'''
-        if len(arg.strip()) == 0:
-            self.meas(None)
-        else:
-            self.eval(arg)
-        
-        return False
-
-    def do_qual(self, arg):
-        ''' evaluate sensor quality '''
-        self.procedure.quality(self.sensor)
-        
-        return False
-    
-    def dump(self):
-        print(self.sensor.pack(self.sensor.id))
+    def __setitem__(self, key, sensor):
+        super().__setitem__(key, sensor)
+        self.revision += 1
+        self.saved.pop(key, None) # a new sensor, whatever its stamp
+        self.index_sensor(key, sensor)
 
         return
 
-    def meas(self, arg):
-        ''' sensor measurement in engineering units'''
-        addr = self.sensor.stream.address
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.revision += 1
 
-        if not addr:
-            print('NO ADDRESS')
-            return
-        
-        self.sensor.update()
+        if self.saved.pop(key, None) is not None:
+            self.removed.add(key)
 
-        raw = '{} {}'.format(round(self.sensor.raw_value, 3), self.sensor.raw_units)
-        if self.sensor.calibration.is_valid:
-            scaled = '{} {}'.format(round(self.sensor.scaled_value, 3), self.sensor.scaled_units)
-            print('{}: {}, {}'.format(addr, raw, scaled))
-        else:
-            print('uncalibrated {}: {}'.format(addr, raw))
-            
-        return
-    
-    def eval(self, arg):
-        ''' evaluate a simulated sensor measurement'''
-        if not arg:
-            print( 'enter a value in {}.'.format(self.sensor.raw_units))
-            return
-
-        try:
-            raw_value = float(arg)
-        except:
-            raw_value = 0
-
-        raw = '{} {}'.format(round(raw_value, 3), self.sensor.raw_units)
-        if self.sensor.calibration.is_valid:
-            scaled = '{} {}'.format(round(self.sensor.evaluate(raw_value), 3), self.sensor.scaled_units)
-            print(' {}: {}'.format(raw, scaled))
-        else:
-            print(' uncalibrated: {}'.format(raw))
-
-        return False        
-    
-
-class Sensors(collections.UserDict):
-    def __init__(self, package=None):
-        super().__init__()
-        ### self.data contains our dict()
+        self.unindex(key)
 
-        if package is not None:
-            self.unpack(package)
-            
         return
 
-    def pack(self, prefix):
-        # Sensors
-        package = ''
+    def changes(self):
+        ''' returns (changed keys, removed keys) since mark_saved()'''
+        saved = self.saved
+        changed = [key for key, sensor in self.data.items() if saved.get(key) != sensor.stamp]
 
-        for key, sensor in self.data.items():
-            sensor_prefix = '{}.{}'.format(prefix, key)
-            package += '\n'
-            package += '[{}]\n'.format(sensor_prefix)
-            package += sensor.pack(sensor_prefix)
-            
-        return package
+        return changed, sorted(self.removed)
 
-    def unpack(self, package):
-        for sensor_key, template in package.items():
-            if sensor_key in self.keys():
-                print(' Error: sensor already exists. ignoring.')
-            else:
-                sensor = Sensor(template['id'])
-                sensor.unpack(template)
-                self.data[sensor_key] = sensor
-                
-        return
-
-    
-class SensorsShell(shell.Shell):
-    intro = 'Sensor Database, x to return to previous menu...'
+    def mark_saved(self, keys=None):
+        ''' record the sensors of keys, or all sensors, and any removals as saved'''
+        if keys is None:
+            self.saved = {key: sensor.stamp for key, sensor in self.data.items()}
+        else:
+            for key in keys:
+                self.saved[key] = self.data[key].stamp
 
-    def __init__(self, procedures, *kwargs):
-        super().__init__(*kwargs)
-        
-        self.procedures = procedures
-        
-        self.sensors = Sensors()
-        self.sensor_index = 0
+        self.removed.clear()
 
         return
 
     @property
-    def first_index(self):
-        return 0
-    
-    @property
-    def last_index(self):
-        return len(self.sensors) - 1
-    
-    @property
-    def sensor(self):
-        if self.sensor_index > self.last_index:
-            self.sensor_index = self.last_index
+    def calibration_table(self):
+        ''' a columnar table of our equations.  rebuilt when a sensor is added
+            or removed, otherwise a change to an equation rewrites only its row.'''
+        # a sensor may also swap its calibration, equation and all
+        stamp = (Equation.epoch, Sensor.epoch, self.revision)
+        if self._table is None or self._table_stamp[2] != self.revision:
+            self._table = table.CalibrationTable(self)
+        elif self._table_stamp != stamp and not self._table.refresh(self):
+            self._table = table.CalibrationTable(self)
 
-        # create a list of sensor keys then select key by index
-        key = list(self.sensors)[self.sensor_index]
-        
-        return self.sensors[key]
+        self._table_stamp = stamp
 
-    @property
-    def procedure(self):
-        procedure = self.procedures[self.sensor.kind]
+        return self._table
 
-        return procedure
+    def scale(self, raw_values):
+        ''' scale a raw value for each sensor, in key order, in one pass'''
+        return self.calibration_table.scale(raw_values)
 
     @property
-    def kinds(self):
-        # return a list of known sensor kinds
-        return list(self.procedures.keys())
-    
-    @property
-    def prompt(self):
-        if len(self.sensors) == 0:
-            sensor_id = 'empty'
-        else:
-            sensor_id = '{}'.format(self.sensor.id)
-            if self.sensor.calibration.is_valid:
-                sensor_id = self.green(sensor_id)
-            else:
-                sensor_id= self.red(sensor_id)
-
-        return '{}[{}]: '.format(self.cyan('db'), sensor_id)
-
-    def to_key(self, id):
-        id = id.strip().lower().replace(' ', '_')
-        
-        return id
-
-    def emptyline(self):
-        self.do_list(None)
-        
-        return False
-    
-    def do_x(self, arg):
-        ''' exit to previous menu'''
-        return True
+    def index(self):
+        ''' an index.SensorIndex of our keys, built on first use.  sensors
+            added or removed update it as they go, a sensor changed in place
+            is caught by its stamp.'''
+        epoch = (Sensor.epoch, calibration.Calibration.epoch)
+
+        if self._index is None:
+            self._index = index.SensorIndex(self.index_rows())
+            self._index_stamps = {key: self.index_stamp(sensor) for key, sensor in self.data.items()}
+        elif self._index_epoch != epoch:
+            for key, sensor in self.data.items():
+                if self._index_stamps.get(key) != self.index_stamp(sensor):
+                    self.index_sensor(key, sensor)
+
+        self._index_epoch = epoch
+
+        return self._index
+
+    @staticmethod
+    def index_stamp(sensor):
+        ''' changes when any indexed value of sensor may have'''
+        if sensor.calibration is None:
+            return (sensor.revision,)
+
+        return (sensor.revision, sensor.calibration.revision)
+
+    def index_sensor(self, key, sensor):
+        ''' bring the index entries of key up to date, if there is an index'''
+        if self._index is not None:
+            self._index.update(*self.index_row(key, sensor))
+            self._index_stamps[key] = self.index_stamp(sensor)
 
-    def do_new(self, sensor_id=''):
-        ''' new <id>. Create a new sensor instance'''
-        sensor_id = sensor_id.strip()
-        
-        if len(sensor_id) == 0:
-            print(' missing sensor id.')
-            return
-
-        sensor_key = self.to_key(sensor_id)
-        if sensor_key in self.sensors.keys():
-            print(' sensor already exists.')
-            return
-               
-        sensor_kind = input(' Enter sensor kind {}: '.format(self.kinds)).strip()
-        if len(sensor_kind) == 0:
-            print(' missing sensor kind.  known kinds are {}.'.format(self.kinds))
-            return
-        
-        if sensor_kind.lower() not in self.kinds:
-            print(' known kinds are {}. sensor not created.'.format(self.kinds))
-            return
+        return
 
-        sensor = self.new_sensor(sensor_kind, sensor_key)
+    def unindex(self, key):
+        if self._index is not None:
+            self._index.remove(key)
+            self._index_stamps.pop(key, None)
 
-        self.do_edit('')
-        
         return
 
-    def new_sensor(self, sensor_kind, sensor_id):
-        print(' creating new {} sensor {}'.format(sensor_kind, sensor_id))
+    def find(self, kind=None, address=None, due_before=None):
+        ''' keys of sensors of a kind, at an address, and due for calibration
+            before a date, by way of the index and in key order'''
+        index = self.index
 
-        sensor = Sensor(sensor_id)
-        
-        self.sensors[sensor_id] = sensor
-        self.sensor_index = self.last_index
+        found = []
+        if kind is not None:
+            found.append(index.find_kind(kind))
+        if address is not None:
+            found.append(index.find_address(address))
+        if due_before is not None:
+            found.append(index.due_before(due_before))
 
-        self.procedures[sensor_kind].prep(sensor)
+        if not found:
+            return list(index.keys)
 
-        return sensor
-        
-    def do_edit(self, arg):
-        ''' edit <sensor_id> Edits sensor_id if present, otherwise selected sensor'''
+        keys = set(found[0]).intersection(*found[1:])
 
-        item_id = None
-        if len(arg) > 0:
-            item_id = arg.strip().lower()
+        return sorted(keys, key=index.position)
 
-        if item_id:
-            items = list(self.sensors.keys())
-            
-            index = None
-            try:
-                index = items.index(item_id)
-            except ValueError:
-                pass
-
-            if index is None:
-                self.do_list(None)
-                print('sensor {} not found'.format(item_id))
-            else:
-                self.sensor_index = index
-                SensorShell(self.sensor, self.procedure).cmdloop()
-        else:
-            SensorShell(self.sensor, self.procedure).cmdloop()
+    def index_rows(self):
+        for key, sensor in self.data.items():
+            yield self.index_row(key, sensor)
 
         return
-    
-    def do_del(self, arg=None):
-        ''' delete sensor. del<ret> selected sensor, del <sensor_id> '''
-        if arg:
-            sensor_key = self.to_key(arg)
-        else:
-            sensor_key = self.to_key(self.sensor.id)
-
-        if sensor_key not in self.sensors.keys():
-            print( ' sensor not found.')
-            return
-        
-        yn = input(' delete sensor {} (y/n)? '.format(self.sensors[sensor_key].id))
-        if yn == 'y':
-            del self.sensors[sensor_key]
-            print( ' sensor deleted.')
-        else:
-            print( ' delete canceled.')
 
-        return
-            
-    def do_list(self, arg):
-        ''' list available sensors '''
+    @staticmethod
+    def index_row(key, sensor):
+        return (key, sensor.kind, sensor.address, sensor.port, sensor.deployment, sensor.due_date)
 
-        if len(self.sensors) == 0:
-            print(' No sensors in list.  "new" to add a sensor.')
-            return
-        
-        print('   ID\tKind\tAddr\t  Expires\tName\tLocation')
-        i = 0
-        
-        for sensor in self.sensors.values():
-            carret = ' '
-            if i == self.sensor_index:
-                carret = '*'
-
-            i += 1               
-
-            id = self.red(sensor.id)
-            if sensor.calibration.is_valid:
-                id = self.green(sensor.id)
-
-            kind = sensor.kind
-            name = sensor.name
-            addr = sensor.address
-            location = sensor.location
-            due_date = sensor.calibration.due_date
+    def pack(self, prefix):
+        # Sensors
+        return ''.join(self.iterpack(prefix))
+
+    def iterpack(self, prefix, keys=None):
+        ''' yields the package a sensor at a time, so a large silo is never
+            held in memory as one string.  keys limits it to those sensors.'''
+        if keys is None:
+            keys = self.keys()
+
+        for key in keys:
+            sensor = self[key]
+            sensor_prefix = '{}.{}'.format(prefix, writer.key(key))
+            yield '\n[{}]\n{}'.format(sensor_prefix, sensor.pack(sensor_prefix))
             
-            print(' {} {}\t{}\t{}\t{}\t{}\t{}'.format(carret, id, kind, addr, due_date, name, location ))
-        
-        return
-
-    def do_prev(self, arg):
-        ''' move to previous sensor in list'''
-        self.sensor_index -= 1
-        if self.sensor_index < self.first_index:
-            self.sensor_index = self.first_index
-
         return
-    
-    def do_next(self, arg):
-        ''' move to next sensor in list'''
-        self.sensor_index += 1
-        if self.sensor_index > self.last_index:
-            self.sensor_index = self.last_index
 
-        return
-    
-    def pack(self, prefix):
-        package = self.sensors.pack(prefix)
-        
-        return package
-    
     def unpack(self, package):
-        self.sensors.unpack(package)
-
-        for sensor in self.sensors.values():
-            # deploy.prep(sensor)
-            proc = self.procedures[sensor.kind]
-            proc.prep(sensor)
-
+        for sensor_key, template in package.items():
+            if sensor_key in self.keys():
+                print(' Error: sensor already exists. ignoring.')
+            else:
+                sensor = Sensor(template['id'])
+                sensor.unpack(template)
+                self.data[sensor_key] = sensor
+                self.revision += 1
+                self.index_sensor(sensor_key, sensor)
+                
         return
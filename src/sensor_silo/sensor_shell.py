@@ -0,0 +1,529 @@
+#
+# sensor_shell.py - shells to edit a sensor and the sensor database.
+#                   part of the python sensor silo project.
+#
+# Copyright (c) 2026 Coburn Wightman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+
+import datetime
+
+from . import shell
+from .sensor import Sensor
+from .sensor import Sensors
+
+
+class SensorShell(shell.Shell):
+    intro = 'Sensor Configuration.  x to return to previous menu.'
+    # prompt = 'sensor: '
+
+    def __init__(self, sensor, procedure, *kwargs):
+        super().__init__(*kwargs)
+
+        self.sensor = sensor
+        self.procedure = procedure
+        
+        return
+
+    @property
+    def kind(self):
+        return self.sensor.kind
+    
+    @property
+    def id(self):
+        return self.sensor.id
+    
+    @property
+    def prompt(self):
+        
+        item = '{}.{}'.format(self.sensor.stream.address, self.sensor.id)
+        if self.sensor.calibration.is_valid:
+            item = self.green(item)
+        else:
+            item =  self.red(item)
+            
+        prompt = '{} ({}): '.format(self.cyan('edit sensor'), item)
+            
+        return prompt
+
+    def preloop(self):
+        self.do_show()
+
+        return False
+    
+    def emptyline(self):
+        self.do_show()
+        
+        return False
+    
+    def do_x(self, arg):
+        ''' exit to previous menu'''
+        return True
+    
+    def do_show(self, arg=None):
+        ''' print sensors parameters'''
+        print(' ID:   {}'.format(self.id))
+        print('  Kind: {}'.format(self.sensor.kind))
+        print('  Property: {}'.format(self.sensor.property))
+        print('  Name: {}'.format(self.sensor.name))
+        print('  Location: {}'.format(self.sensor.location))
+
+        print('  Stream Type:  {}'.format(self.sensor.stream.type))
+        print('  Deployed Address: {}'.format(self.sensor.address))
+        print('  Deployed Port: {}'.format(self.sensor.port))
+        print('  Deployment: {}'.format(self.sensor.deployment or 'any'))
+        print('  calibration due:  {}'.format(self.sensor.calibration.due_date))
+        
+        return False
+
+    def do_address(self, arg=None):
+        ''' address <addr> enter deployed pHorp address of sensor, or ND for Not Deployed'''
+
+        err_str = self.sensor.stream.validate_address(arg)
+        if not err_str:
+            self.sensor.address = arg.strip().upper() #self.sensor.stream.address
+            self.sensor.reconnect()
+        
+        self.do_show()
+        
+        if err_str:
+            print(self.red(err_str))
+        
+        return False
+
+    def do_port(self, arg):
+        ''' port <qwiic|stemma> enter deployed i2c port of sensor'''
+        port = arg.strip().lower()
+
+        if port in ['qwiic', 'stemma']:
+            self.sensor.port = port
+
+        self.do_show()
+
+        if port not in ['qwiic', 'stemma']:
+            print(self.red(' port is qwiic or stemma'))
+
+        return False
+
+    def do_deployment(self, arg):
+        ''' deployment <key name> enter key name of the deployment the sensor is on, or any'''
+        key_name = arg.strip().replace(' ', '_')
+
+        if key_name.lower() == 'any':
+            key_name = ''
+
+        self.sensor.deployment = key_name
+
+        self.do_show()
+
+        return False
+
+    def do_name(self, arg):
+        ''' name <name> enter deployed name of sensor'''
+        name =  arg.strip()
+        
+        if len(name) > 0:
+            self.sensor.name = name
+
+        self.do_show()
+
+        return False
+
+    def do_location(self, arg):
+        ''' location <location> enter deployed location of sensor'''
+        location = arg.strip()
+        
+        if len(location) > 0:
+            self.sensor.location = location
+
+        self.do_show()
+
+        return False
+    
+    def do_dump(self, arg):
+        ''' dump sensor's coefficients and stats'''
+        self.dump()
+        
+        return False
+
+    def do_cal(self, arg):
+        ''' acquire sensor calibration data'''
+        self.procedure.run(self.sensor)
+            
+        return
+
+    def do_meas(self, arg):
+        ''' meas <mV> Evaluates mV in engineering units, sensor value if blank.'''
+        if len(arg.strip()) == 0:
+            self.meas(None)
+        else:
+            self.eval(arg)
+        
+        return False
+
+    def do_qual(self, arg):
+        ''' evaluate sensor quality '''
+        self.procedure.quality(self.sensor)
+        
+        return False
+    
+    def dump(self):
+        print(self.sensor.pack(self.sensor.id))
+
+        return
+
+    def meas(self, arg):
+        ''' sensor measurement in engineering units'''
+        addr = self.sensor.stream.address
+
+        if not addr:
+            print('NO ADDRESS')
+            return
+        
+        self.sensor.update()
+
+        raw = '{} {}'.format(round(self.sensor.raw_value, 3), self.sensor.raw_units)
+        if self.sensor.calibration.is_valid:
+            scaled = '{} {}'.format(round(self.sensor.scaled_value, 3), self.sensor.scaled_units)
+            print('{}: {}, {}'.format(addr, raw, scaled))
+        else:
+            print('uncalibrated {}: {}'.format(addr, raw))
+            
+        return
+    
+    def eval(self, arg):
+        ''' evaluate a simulated sensor measurement'''
+        if not arg:
+            print( 'enter a value in {}.'.format(self.sensor.raw_units))
+            return
+
+        try:
+            raw_value = float(arg)
+        except:
+            raw_value = 0
+
+        raw = '{} {}'.format(round(raw_value, 3), self.sensor.raw_units)
+        if self.sensor.calibration.is_valid:
+            scaled = '{} {}'.format(round(self.sensor.evaluate(raw_value), 3), self.sensor.scaled_units)
+            print(' {}: {}'.format(raw, scaled))
+        else:
+            print(' uncalibrated: {}'.format(raw))
+
+        return False
+
+
+class SensorsShell(shell.Shell):
+    intro = 'Sensor Database, x to return to previous menu...'
+
+    def __init__(self, procedures, *kwargs):
+        super().__init__(*kwargs)
+        
+        self.procedures = procedures
+        
+        self.sensors = Sensors()
+        self.sensor_index = 0
+
+        return
+
+    @property
+    def first_index(self):
+        return 0
+    
+    @property
+    def last_index(self):
+        return len(self.sensors) - 1
+    
+    @property
+    def sensor(self):
+        if self.sensor_index > self.last_index:
+            self.sensor_index = self.last_index
+
+        key = self.sensors.index.key_at(self.sensor_index)
+        
+        return self.sensors[key]
+
+    @property
+    def procedure(self):
+        procedure = self.procedures[self.sensor.kind]
+
+        return procedure
+
+    @property
+    def kinds(self):
+        # return a list of known sensor kinds
+        return list(self.procedures.keys())
+    
+    @property
+    def prompt(self):
+        if len(self.sensors) == 0:
+            sensor_id = 'empty'
+        else:
+            sensor_id = '{}'.format(self.sensor.id)
+            if self.sensor.calibration.is_valid:
+                sensor_id = self.green(sensor_id)
+            else:
+                sensor_id= self.red(sensor_id)
+
+        return '{}[{}]: '.format(self.cyan('db'), sensor_id)
+
+    def to_key(self, id):
+        id = id.strip().lower().replace(' ', '_')
+        
+        return id
+
+    def emptyline(self):
+        self.do_list(None)
+        
+        return False
+    
+    def do_x(self, arg):
+        ''' exit to previous menu'''
+        return True
+
+    def do_new(self, sensor_id=''):
+        ''' new <id>. Create a new sensor instance'''
+        sensor_id = sensor_id.strip()
+        
+        if len(sensor_id) == 0:
+            print(' missing sensor id.')
+            return
+
+        sensor_key = self.to_key(sensor_id)
+        if sensor_key in self.sensors.keys():
+            print(' sensor already exists.')
+            return
+               
+        sensor_kind = input(' Enter sensor kind {}: '.format(self.kinds)).strip()
+        if len(sensor_kind) == 0:
+            print(' missing sensor kind.  known kinds are {}.'.format(self.kinds))
+            return
+        
+        if sensor_kind.lower() not in self.kinds:
+            print(' known kinds are {}. sensor not created.'.format(self.kinds))
+            return
+
+        sensor = self.new_sensor(sensor_kind, sensor_key)
+
+        self.do_edit('')
+        
+        return
+
+    def new_sensor(self, sensor_kind, sensor_id):
+        print(' creating new {} sensor {}'.format(sensor_kind, sensor_id))
+
+        sensor = Sensor(sensor_id)
+        
+        self.sensors[sensor_id] = sensor
+        self.sensor_index = self.last_index
+
+        self.procedures[sensor_kind].prep(sensor)
+
+        return sensor
+        
+    def do_edit(self, arg):
+        ''' edit <sensor_id> Edits sensor_id if present, otherwise selected sensor'''
+
+        item_id = None
+        if len(arg) > 0:
+            item_id = arg.strip().lower()
+
+        if item_id:
+            index = self.sensors.index.position(item_id)
+
+            if index is None:
+                self.do_list(None)
+                print('sensor {} not found'.format(item_id))
+            else:
+                self.sensor_index = index
+                SensorShell(self.sensor, self.procedure).cmdloop()
+        else:
+            SensorShell(self.sensor, self.procedure).cmdloop()
+
+        return
+    
+    def do_find(self, arg):
+        ''' find <address|kind> select the next sensor at an address or of a kind'''
+        term = arg.strip()
+        
+        keys = self.sensors.find(address=term) or self.sensors.find(kind=term.lower())
+        if not keys:
+            print(' no sensor at address or of kind {}.'.format(term))
+            return
+
+        # cycle through the matches, starting after the selected sensor
+        positions = sorted(self.sensors.index.position(key) for key in keys)
+        later = [position for position in positions if position > self.sensor_index]
+        self.sensor_index = later[0] if later else positions[0]
+
+        if len(keys) > 1:
+            print(' {} sensors found, {} selected.'.format(len(keys), self.sensor.id))
+
+        return
+
+    def do_cal(self, arg):
+        ''' cal <kind|id id ...> calibrate deployed sensors of a kind, or those listed, together'''
+        terms = arg.split()
+        if not terms:
+            print(' cal <kind> or cal <id> <id> ...')
+            return
+
+        if len(terms) == 1 and terms[0].lower() in self.kinds:
+            keys = self.sensors.find(kind=terms[0].lower())
+        else:
+            keys = [self.to_key(term) for term in terms]
+
+        missing = [key for key in keys if key not in self.sensors]
+        if missing:
+            print(' sensors not found: {}'.format(', '.join(missing)))
+            return
+
+        group = [self.sensors[key] for key in keys]
+        kinds = set(sensor.kind for sensor in group)
+        if len(kinds) != 1:
+            print(' sensors calibrated together must be of one kind, not {}.'.format(', '.join(sorted(kinds))))
+            return
+
+        procedure = self.procedures[group[0].kind]
+        if len(group) > 1 and procedure.stream_address != 'deployed':
+            print(' procedure address is {}: every sensor would read it.  set it to deployed first.'.format(procedure.stream_address))
+            return
+
+        undeployed = [sensor.id for sensor in group if not sensor.is_deployed]
+        if undeployed:
+            print(' skipping sensors not deployed: {}'.format(', '.join(undeployed)))
+            group = [sensor for sensor in group if sensor.is_deployed]
+
+        if group:
+            procedure.run_group(group)
+
+        return
+
+    def do_del(self, arg=None):
+        ''' delete sensor. del<ret> selected sensor, del <sensor_id> '''
+        if arg:
+            sensor_key = self.to_key(arg)
+        else:
+            sensor_key = self.to_key(self.sensor.id)
+
+        if sensor_key not in self.sensors.keys():
+            print( ' sensor not found.')
+            return
+        
+        yn = input(' delete sensor {} (y/n)? '.format(self.sensors[sensor_key].id))
+        if yn == 'y':
+            del self.sensors[sensor_key]
+            print( ' sensor deleted.')
+        else:
+            print( ' delete canceled.')
+
+        return
+            
+    def do_list(self, arg):
+        ''' list [kind|address|due [days]] list sensors, or those of a kind, at an address,
+            or due for calibration within days'''
+
+        if len(self.sensors) == 0:
+            print(' No sensors in list.  "new" to add a sensor.')
+            return
+
+        keys = self.list_keys(arg)
+        if keys is None:
+            return
+        
+        print('   ID\tKind\tAddr\t  Expires\tName\tLocation')
+        
+        for key in keys:
+            sensor = self.sensors[key]
+
+            carret = ' '
+            if self.sensors.index.position(key) == self.sensor_index:
+                carret = '*'
+
+            id = self.red(sensor.id)
+            if sensor.calibration.is_valid:
+                id = self.green(sensor.id)
+
+            kind = sensor.kind
+            name = sensor.name
+            addr = sensor.address
+            location = sensor.location
+            due_date = sensor.calibration.due_date
+            
+            print(' {} {}\t{}\t{}\t{}\t{}\t{}'.format(carret, id, kind, addr, due_date, name, location ))
+        
+        return
+
+    def do_prev(self, arg):
+        ''' move to previous sensor in list'''
+        self.sensor_index -= 1
+        if self.sensor_index < self.first_index:
+            self.sensor_index = self.first_index
+
+        return
+    
+    def do_next(self, arg):
+        ''' move to next sensor in list'''
+        self.sensor_index += 1
+        if self.sensor_index > self.last_index:
+            self.sensor_index = self.last_index
+
+        return
+    
+    def pack(self, prefix):
+        package = self.sensors.pack(prefix)
+        
+        return package
+
+    def iterpack(self, prefix, keys=None):
+        return self.sensors.iterpack(prefix, keys)
+    
+    def unpack(self, package):
+        self.sensors.unpack(package)
+
+        for sensor in self.sensors.values():
+            self.prep(sensor)
+
+        self.check_addresses()
+
+        return
+
+    def list_keys(self, arg):
+        ''' keys of the sensors a list command asks for, None if there is no telling'''
+        terms = (arg or '').split()
+        if not terms:
+            return list(self.sensors.keys())
+
+        if terms[0].lower() == 'due':
+            try:
+                days = int(terms[1]) if len(terms) > 1 else 0
+            except ValueError:
+                print(' list due [days]')
+                return None
+
+            return self.sensors.find(due_before=datetime.date.today() + datetime.timedelta(days=days + 1))
+
+        term = terms[0]
+        return self.sensors.find(address=term) or self.sensors.find(kind=term.lower())
+
+    def check_addresses(self):
+        ''' warn of deployed sensors sharing an address'''
+        for address, keys in self.sensors.index.duplicate_addresses().items():
+            print(self.red(' duplicate address {}: {}'.format(address, ', '.join(keys))))
+
+        return
+
+    def prep(self, sensor):
+        # deploy.prep(sensor)
+        proc = self.procedures[sensor.kind]
+        proc.prep(sensor)
+
+        return
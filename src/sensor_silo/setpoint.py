@@ -17,10 +17,13 @@
 
 import sys
 import time
+import threading
 
 from . import shell
 from . import statistics as rs
 from . import quantity
+from . import writer
+from . import scheduler
 
 class SetpointFactory():
     def __init__(self, package):
@@ -55,19 +58,33 @@ class Setpoint(shell.Shell):
 
         package = ''
         package += '[{}]\n'.format(prefix)        
-        package += 'type = "{}"\n'.format(self.type)
+        package += 'type = {}\n'.format(writer.quote(self.type))
+        package += self.pack_settings()
         
         my_prefix= '{}.{}'.format(prefix, 'target_quantity')
         package += '{}'.format(self.target_quantity.pack(my_prefix))
 
         return package
 
+    def pack_settings(self):
+        ''' keys of a specialized setpoint, ahead of the target_quantity table'''
+        return ''
+
     def unpack(self, package):
         # calibration setpoint
         self.target_quantity.unpack(package['target_quantity'])
         
         return
 
+    def run_group(self, sensors, setpoints):
+        ''' run setpoints, one per sensor, of the same target.  setpoints
+            that can measure a group at once override this to do so.'''
+        for sensor, setpoint in zip(sensors, setpoints):
+            if not setpoint.run(sensor):
+                return False
+
+        return True
+
 class ConstantSetpoint(Setpoint):
     def __init__(self, target_quantity=None, measured_quantity=None):
         super().__init__(target_quantity, measured_quantity)
@@ -98,7 +115,93 @@ class ConstantSetpoint(Setpoint):
 
 #         return
 
+class Sampler(threading.Thread):
+    ''' samples a group of sensors every period seconds until stopped, each
+        into the stats of its own setpoint.  the group converts together
+        through a ConversionScheduler, so sensors on separate converters
+        sample alongside each other.  sample times are kept on the monotonic
+        clock from the first sample, so a slow conversion delays one sample
+        without shifting the rest.  stable is set whenever every setpoint
+        is_stable() after a sample.'''
+    def __init__(self, sensors, setpoints, period):
+        super().__init__(name='sampler-{}'.format(sensors[0].id), daemon=True)
+
+        self.sensors = list(sensors)
+        self.setpoints = list(setpoints)
+        self.period = period
+        self.scheduler = scheduler.ConversionScheduler(self.sensors)
+
+        self.lock = threading.Lock() # held while stats change
+        self.stable = threading.Event()
+        self.stopping = threading.Event()
+
+        self.latest = [None] * len(self.sensors)
+        self.stable_count = 0
+        self.late = 0 # samples that started after their time
+        self.error = None
+
+        return
+
+    def run(self):
+        sample_time = time.monotonic()
+
+        while not self.stopping.is_set():
+            try:
+                self.scheduler.scan()
+            except Exception as e:
+                self.error = e
+                self.stable.set() # wake the waiting shell
+                break
+
+            with self.lock:
+                self.stable_count = 0
+                for i, (sensor, setpoint) in enumerate(zip(self.sensors, self.setpoints)):
+                    setpoint.stats.push(sensor.stream.measured_quantity.value * 1000) #fix sensor
+                    self.latest[i] = sensor.raw_value
+
+                    if setpoint.is_stable(setpoint.stats):
+                        self.stable_count += 1
+
+                if self.stable_count == len(self.setpoints):
+                    self.stable.set()
+                else:
+                    self.stable.clear()
+
+            sample_time += self.period
+            pause_time = sample_time - time.monotonic()
+            if pause_time < 0:
+                # overran, start again from now rather than catch up
+                self.late += 1
+                sample_time -= pause_time
+                pause_time = 0
+
+            self.stopping.wait(pause_time)
+
+        return
+
+    def stop(self):
+        self.stopping.set()
+        self.join()
+
+        return
+
+
 class StreamSetpoint(Setpoint):
+    ''' a setpoint measured from the sensors stream.  samples are taken on
+        a background thread into a window of the last number_of_samples, and
+        the setpoint ends once that window is stable: a standard deviation of
+        at most stable_sd and a drift of at most stable_slope units per second.
+        with auto_advance the next setpoint starts without a keypress.
+        a setpoint that hasnt settled within timeout seconds asks what to do,
+        and a keypress while sampling accepts the window as it stands.
+
+        samples are the streams measured value times 1000 (#fix sensor), so
+        stable_sd is in those units and stable_slope in those units per second.
+
+        samples more than reject_threshold robust deviations from the recent
+        median, as an i2c glitch or a bubble, are counted and left out of the
+        window (reject_method 'mad', or 'z' for the z score of the window).
+        a reject_threshold of 0 keeps every sample.'''
     def __init__(self, target_quantity=None, measured_quantity=None):
         super().__init__(target_quantity, measured_quantity)
         
@@ -107,8 +210,16 @@ class StreamSetpoint(Setpoint):
         self.sample_period = 0.1
         self.update_period = 1
         self.number_of_samples = 50
+
+        self.stable_sd = 0.1     # measured units x 1000
+        self.stable_slope = 0.01 # measured units x 1000 per second
+        self.timeout = 120       # seconds
+        self.auto_advance = True
+
+        self.reject_threshold = 4.0
+        self.reject_method = 'mad'
         
-        self.stats = rs.RunningStats()
+        self.stats = rs.SlidingStats(self.number_of_samples)
         
         return
 
@@ -128,6 +239,15 @@ class StreamSetpoint(Setpoint):
     def standard_deviation(self):
         return round(self.stats.standard_deviation(), 3)
 
+    @property
+    def slope(self):
+        ''' drift of the window in units per second'''
+        return round(self.stats.slope() / self.sample_period, 3)
+
+    # settings packed with the setpoint and carried by clone()
+    settings = ('sample_period', 'number_of_samples', 'stable_sd', 'stable_slope', 'timeout', 'auto_advance',
+                'reject_threshold', 'reject_method')
+
     def clone(self):
         scaled = self.target_quantity.clone()
         
@@ -135,19 +255,119 @@ class StreamSetpoint(Setpoint):
         if self.measured_quantity:
             raw = self.measured_quantity.clone()
             
-        return(StreamSetpoint(scaled, raw))
+        other = StreamSetpoint(scaled, raw)
+        for name in self.settings:
+            setattr(other, name, getattr(self, name))
+
+        return other
+
+    def pack_settings(self):
+        package = ''
+        for name in self.settings:
+            value = getattr(self, name)
+            if isinstance(value, bool):
+                value = 'true' if value else 'false'
+            elif isinstance(value, str):
+                value = writer.quote(value)
+
+            package += '{} = {}\n'.format(name, value)
+
+        return package
+
+    def unpack(self, package):
+        super().unpack(package)
+
+        for name in self.settings:
+            setattr(self, name, package.get(name, getattr(self, name)))
+
+        return
 
     def dump(self):
         str = '{}: n={}, mean={}, var={}, sd={}'.format(self.target_quantity, self.n, self.mean, self.variance, self.standard_deviation)
 
         return str
 
+    def is_stable(self, stats):
+        ''' true when a full window has settled'''
+        if stats.n < self.number_of_samples:
+            return False
+
+        if stats.standard_deviation() > self.stable_sd:
+            return False
+
+        return abs(stats.slope() / self.sample_period) <= self.stable_slope
+
+    def reset(self):
+        ''' a new empty window of number_of_samples, gated if rejecting'''
+        self.stats = rs.SlidingStats(self.number_of_samples)
+
+        if self.reject_threshold:
+            self.stats = rs.GatedStats(self.stats, self.reject_threshold, self.reject_method)
+
+        return
+
+    def acquire(self, sensors, setpoints, report=None):
+        ''' sample sensors, each into the setpoint alongside it, until all are
+            stable, a key is pressed or timeout seconds pass.  our sample_period
+            and timeout apply to the group.  report(sampler) is called every
+            update_period.  returns 'stable', 'accepted' or 'timeout'.'''
+        for setpoint in setpoints:
+            setpoint.reset()
+
+        sampler = Sampler(sensors, setpoints, self.sample_period)
+        sampler.start()
+
+        status = 'timeout'
+        start_time = time.monotonic()
+        report_time = start_time + self.update_period
+        try:
+            with shell.KeyPoll() as keys:
+                while time.monotonic() - start_time < self.timeout:
+                    if sampler.stable.is_set():
+                        status = 'stable'
+                        break
+
+                    if keys.poll(0.05) is not None and self.n > 0:
+                        status = 'accepted'
+                        break
+
+                    if report is not None and time.monotonic() >= report_time:
+                        report_time += self.update_period
+                        with sampler.lock:
+                            report(sampler)
+        finally:
+            sampler.stop()
+
+        if sampler.error is not None:
+            raise sampler.error
+
+        if status == 'timeout' and sampler.stable.is_set():
+            status = 'stable'
+
+        return status
+
+    def progress(self, sampler):
+        if len(sampler.sensors) > 1:
+            print('{}/{}'.format(sampler.stable_count, len(sampler.sensors)), end=', ')
+        elif sampler.latest[0] is not None:
+            print(round(sampler.latest[0], 3), end=', ')
+
+        sys.stdout.flush()
+
+        return
+
     # evaluate?
     def run(self, sensor):
         # setpoint run
-        self.measured_quantity = sensor.stream.measured_quantity.clone()
+        return self.run_group([sensor], [self])
+
+    def run_group(self, sensors, setpoints):
+        ''' measure every sensor of a group in the same solution at once,
+            sensors[i] into setpoints[i].  we lead the group'''
+        for sensor, setpoint in zip(sensors, setpoints):
+            setpoint.measured_quantity = sensor.stream.measured_quantity.clone()
         
-        prompt = '  ready {} Calibration Solution. press <space> to begin, <x> to cancel'.format(self.target_quantity)
+        prompt = '  ready {} Calibration Solution. press <space> to begin, <x> to cancel.  while sampling any key accepts'.format(self.target_quantity)
         print(prompt)
         key = self.get_char()
         
@@ -157,40 +377,36 @@ class StreamSetpoint(Setpoint):
 
         while True:
             print('   ({}): '.format(self.target_quantity), end='')
-            self.stats.clear()
-            
-            sample_time = time.time()
-            update_time = sample_time
-            for i in range(self.number_of_samples):
-                sensor.update()
-                self.stats.push(sensor.stream.measured_quantity.value * 1000) #fix sensor
-            
-                now = time.time()
-                if now > update_time:
-                    print(round(sensor.raw_value, 3), end=', ')
-                    sys.stdout.flush()
-                    update_time += self.update_period
-
-                sample_time += self.sample_period
-                pause_time = sample_time - now
-                if pause_time < 0:
-                    pause_time = 0
-                    sample_time = now
-                
-                time.sleep(pause_time)
+
+            try:
+                status = self.acquire(sensors, setpoints, self.progress)
+            except KeyboardInterrupt:
+                print()
+                print('run canceled')
+                return False
 
             print()
-            print('     {}'.format(self.stats.synopsis))
+            for sensor, setpoint in zip(sensors, setpoints):
+                if len(sensors) > 1:
+                    print('     {}: {}, slope={}/s'.format(sensor.id, setpoint.stats.synopsis, setpoint.slope))
+                else:
+                    print('     {}, slope={}/s'.format(setpoint.stats.synopsis, setpoint.slope))
 
-            prompt = '  {} Calibration Buffer. <space> to repeat, <enter> to advance'.format(self.target_quantity)
+            if status == 'accepted' or (status == 'stable' and self.auto_advance):
+                print('  {} Calibration Buffer {}.'.format(self.target_quantity, status))
+                break
+
+            if status == 'timeout':
+                status = 'not stable after {}s'.format(self.timeout)
+            prompt = '  {} Calibration Buffer {}. <space> to repeat, <enter> to advance'.format(self.target_quantity, status)
             print(prompt) #, end=''
             # sys.stdout.flush()
             key = self.get_char()
         
             if key != ' ':
-                self.measured_quantity.value = self.stats.mean()
                 break
+
+        for setpoint in setpoints:
+            setpoint.measured_quantity.value = setpoint.stats.mean()
             
         return True
-
-    
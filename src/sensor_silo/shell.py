@@ -16,6 +16,14 @@
 #
 
 import cmd
+import sys
+import time
+import select
+
+try:
+    import msvcrt # windows
+except ImportError:
+    msvcrt = None
 
 def getChar():
     # https://stackoverflow.com/a/36974338
@@ -39,6 +47,56 @@ def getChar():
 
         return answer
 
+class KeyPoll():
+    ''' check for a keypress without waiting on it.  while entered the
+        terminal hands over keys as they are typed rather than by line.
+        poll() is always None when input is not a terminal.'''
+    def __init__(self):
+        self.settings = None
+        self.interactive = sys.stdin is not None and sys.stdin.isatty()
+
+        return
+
+    def __enter__(self):
+        if self.interactive and msvcrt is None:
+            import tty, termios
+
+            fd = sys.stdin.fileno()
+            self.settings = termios.tcgetattr(fd)
+            tty.setcbreak(fd)
+
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.settings is not None:
+            import termios
+
+            termios.tcsetattr(sys.stdin.fileno(), termios.TCSADRAIN, self.settings)
+            self.settings = None
+
+        return False
+
+    def poll(self, timeout):
+        ''' a key pressed within timeout seconds, else None'''
+        if not self.interactive:
+            time.sleep(timeout)
+            return None
+
+        if msvcrt is not None:
+            deadline = time.monotonic() + timeout
+            while not msvcrt.kbhit():
+                if time.monotonic() >= deadline:
+                    return None
+                time.sleep(0.02)
+
+            return msvcrt.getwch()
+
+        ready, _, _ = select.select([sys.stdin], [], [], timeout)
+        if not ready:
+            return None
+
+        return sys.stdin.read(1)
+
 class Shell(cmd.Cmd):
     intro = 'Shell Base Class.'
     prompt = 'shell: '
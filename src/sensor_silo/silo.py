@@ -17,144 +17,21 @@
 
 import sys
 import datetime
-
-import tomllib as tomli
+import itertools
 
 from . import shell
 from . import procedure
 from . import sensor
+from . import sensor_shell
 from . import deploy
+from . import writer
+from .runtime import Deploy
+from .runtime import ConfigFile
+from .store import StoredSensors
+from .store import open_store
+from .store import is_store
 
 
-class Deploy():
-    def __init__(self, filename=None):
-        self.deployment = deploy.DeployShell()
-        self.sensors = None
-
-        if filename is not None:
-            self.load(filename)
-            
-        return
-
-    @property
-    def key_name(self):
-        return self.deployment.key_name
-
-    @property
-    def folder_name(self):
-        return self.deployment.folder_name
-
-    @property
-    def group_name(self):
-        return self.deployment.group_name
-
-    @property
-    def stream_period(self):
-        return self.deployment.update_interval*60
-
-    @property
-    def sample_period(self):
-        return self.stream_period / self.over_sample_rate
-
-    @property
-    def over_sample_rate(self):
-        return self.deployment.over_sample_rate
-
-    @property
-    def time_constant(self):
-        tc = self.deployment.filter_in_percent / 100
-        if tc < 1:
-            tc = 1
-            
-        return tc
-
-    @property
-    def i2c_stemma(self):
-        return self.deployment.i2c_stemma
-
-    @property
-    def i2c_qwiic(self):
-        return self.deployment.i2c_qwiic
-    
-    def load(self, filename=None):
-        config = ConfigFile()
-        filename = config.get_filename(filename)
-        package = config.load(filename)
-        self.unpack(package)
-
-        return
-    
-    def connect(self, streams):
-        # xx build an iterator
-        for sensor in self.sensors.values():
-            if not sensor.is_deployed:
-                # print(' deploy.connect(): NO DEPLOYED ADDRESS')
-                pass
-            else:
-                stream = streams[sensor.stream_type]() # create a new hardware stream instance
-                sensor.connect(stream)
-
-        return
-
-    def unpack(self, package):
-        if 'sensors' in package:
-            self.sensors = sensor.Sensors(package['sensors'])
-
-        if 'deployment' in package:
-            self.deployment.unpack(package['deployment'])
-
-        return
-
-
-class ConfigFile():
-    def __init__(self):
-        self.suffix = '.toml'
-        self.filename = 'deployment{}'.format(self.suffix)
-
-        return
-
-    def load(self, filename=None):
-        if filename is None:
-            filename = self.filename
-            
-        package = ''
-        with open(filename, 'rb') as fp:
-            package = tomli.load(fp)
-            print(' calibration data loaded from {}.'.format(filename))
-
-        return package
-
-    def save(self, package, filename=None):
-        if filename is None:
-            filename = self.filename
-
-        with open(filename, 'w') as fp:
-            fp.write(package)
-            print(' calibration data saved to {}.'.format(filename))
-            
-        self.filename = filename
-
-        return
-
-    def get_filename(self, filename=None):
-        new_name = filename
-        if new_name is None:
-            new_name = input('enter filename without suffix ({}): '.format(self.filename))
-
-        # https://stackoverflow.com/a/7406369
-        keepcharacters = ('.','_')
-        new_name = ''.join(c for c in new_name if c.isalnum() or c in keepcharacters).rstrip()
-
-        filename = self.filename
-        if len(new_name) > 0:
-            filename = new_name
-
-        if not filename.endswith(self.suffix):
-            filename = filename + self.suffix
-
-        return filename
-    
-    
 class Shell(shell.Shell):
     intro = 'Welcome to the Sensor Silo. ? for help.'
     prompt = 'silo: '
@@ -163,9 +40,16 @@ class Shell(shell.Shell):
         super().__init__(*kwargs)
 
         self.procedures = procedure.Procedures(procedures)
-        self.sensors = sensor.SensorsShell(self.procedures)
+        self.sensors = sensor_shell.SensorsShell(self.procedures)
         self.deploy = deploy.DeployShell()
 
+        # incremental saves append changed sections to a journal
+        self.filename = None # file last loaded or saved
+        self.journal_length = 0
+        self.journal_limit = 32 # entries before the file is rewritten
+        self.saved_deployment = None
+        self.store = None # an open store.SensorStore, else the silo is a single file
+
         self.prompt = '{}'.format(self.cyan(self.prompt))
 
         return
@@ -201,14 +85,20 @@ class Shell(shell.Shell):
         return
     
     def do_save(self, arg):
-        ''' save sensor configuration file'''
+        ''' save sensor configuration file.  save full<cr> rewrites the file rather than journal the changes'''
+        if self.store is not None:
+            print(' Saving sensor data to store {}'.format(self.store.path))
+            self.save_store(self.store.path)
+            return
+
         config = ConfigFile()
+        if self.filename is not None:
+            config.filename = self.filename
         
         filename = config.get_filename()        
         print(' Saving sensor data to {}'.format(filename))
         
-        package = self.pack()
-        config.save(package, filename)
+        self.save(filename, config, compact=arg.strip().lower() == 'full')
 
         return
 
@@ -221,29 +111,213 @@ class Shell(shell.Shell):
         
         package = config.load(filename)
 
+        # the file replaces whatever was open, a store included
+        self.close_store()
+        self.sensors.sensors = sensor.Sensors()
+        self.sensors.sensor_index = 0
+
         self.unpack(package)
+        self.mark_saved()
+
+        self.filename = filename
+        self.journal_length = config.journal_length
         
         return
+
+    def do_store(self, arg):
+        ''' store <folder|file.db> save the silo as a store folder of a file per sensor, or
+            as an sqlite database, and use it from now on'''
+        folder = arg.strip()
+        if len(folder) == 0:
+            print(' missing folder name.')
+            return
+
+        print(' Saving sensor data to store {}'.format(folder))
+        self.save_store(folder)
+
+        return
+
+    def do_open(self, arg):
+        ''' open <folder|file.db> open a store folder or database, reading sensors only as they are used'''
+        folder = arg.strip()
+        if not is_store(folder):
+            print(' {} is not a sensor store.'.format(folder))
+            return
+
+        self.load_store(folder)
+
+        return
+
+    def do_export(self, arg):
+        ''' export <file> write the whole silo to a single toml file, leaving any open store open'''
+        config = ConfigFile()
+
+        filename = config.get_filename(arg.strip() or None)
+        print(' Exporting sensor data to {}'.format(filename))
+
+        writer.write_file(filename, self.iterpack())
+
+        return
     
     def do_exit(self, arg):
         ''' Done'''
+        self.close_store()
         print(' exiting')
 
         return True
 
     def pack(self):
-        package = 'date = {}\n'.format(datetime.datetime.now())        
+        return ''.join(self.iterpack())
+
+    def iterpack(self):
+        ''' yields the package in chunks for ConfigFile.save() to write as they come'''
+        yield 'date = {}\n'.format(datetime.datetime.now())
 
         prefix = 'procedures'
-        package += self.procedures.pack(prefix)
+        yield from self.procedures.iterpack(prefix)
         
         prefix = 'sensors'
-        package += self.sensors.pack(prefix)
+        yield from self.sensors.iterpack(prefix)
 
         prefix = 'deployment'
-        package += self.deploy.pack(prefix)
+        yield self.deploy.pack(prefix)
+
+        return
+
+    def changes(self):
+        ''' returns a dict of what changed since the last load or save, or None if nothing did'''
+        changed_sensors, removed_sensors = self.sensors.sensors.changes()
+        procedures = self.procedures.changes()
+        deployment = self.deploy.deployment != self.saved_deployment
+
+        if not (changed_sensors or removed_sensors or procedures or deployment):
+            return None
+
+        return {'sensors': changed_sensors, 'removed_sensors': removed_sensors,
+                'procedures': procedures, 'deployment': deployment}
+
+    def iterjournal(self, number, changes):
+        ''' yields a journal entry holding only the changed sections'''
+        prefix = 'journal.{}'.format(number)
+        
+        yield '\n[{}]\n'.format(prefix)
+        yield 'date = {}\n'.format(datetime.datetime.now())
+        yield 'removed_sensors = [{}]\n'.format(', '.join(writer.quote(key) for key in changes['removed_sensors']))
+
+        yield from self.procedures.iterpack('{}.procedures'.format(prefix), changes['procedures'])
+        yield from self.sensors.iterpack('{}.sensors'.format(prefix), changes['sensors'])
+
+        if changes['deployment']:
+            yield self.deploy.pack('{}.deployment'.format(prefix))
+
+        return
+
+    def save(self, filename, config=None, compact=False):
+        ''' save to filename.  if it is the file last loaded or saved, only the
+            changes are appended to its journal, the file itself untouched.  the
+            file is rewritten in full, and the journal dropped, when saving to
+            another file, when the journal reaches journal_limit entries, or
+            when compact is true.'''
+        if config is None:
+            config = ConfigFile()
+
+        changes = self.changes()
+        rewrite = compact or filename != self.filename or self.journal_length >= self.journal_limit
+
+        if rewrite:
+            config.save(self.iterpack(), filename)
+            self.journal_length = 0
+            self.mark_saved()
+        elif changes is None:
+            print(' no changes to save.')
+        else:
+            self.journal_length += 1
+            config.append(self.iterjournal(self.journal_length, changes), filename)
+            self.mark_saved(changes['sensors'])
+            print(' changes journaled to {}.'.format(config.journal_name(filename)))
+
+        self.filename = filename
+
+        return
+
+    def save_store(self, folder):
+        ''' save to a store folder.  to the open store only changed sensors
+            are written, to another every sensor is.'''
+        sensors = self.sensors.sensors
+
+        if self.store is not None and self.store.path == folder:
+            store = self.store
+            changed, removed = sensors.changes()
+        else:
+            store = open_store(folder)
+            changed = list(sensors.keys())
+            removed = [key for key in store.index if key not in sensors]
+
+        with store.transaction():
+            for key in removed:
+                store.remove(key)
+
+            for key in changed:
+                store.write(key, sensors[key])
+
+            prefix = 'deployment'
+            store.save_silo(itertools.chain(['date = {}\n'.format(datetime.datetime.now())],
+                                            self.procedures.iterpack('procedures'),
+                                            [self.deploy.pack(prefix)]))
+        print(' {} sensors written, {} removed.'.format(len(changed), len(removed)))
+
+        if store is not self.store:
+            # carry on with the store, its sensors as read
+            self.close_store()
+            self.store = store
+            self.sensors.sensors = StoredSensors(store, self.sensors.prep)
+            self.sensors.sensors.data.update(sensors.data)
+            self.mark_saved()
+        else:
+            self.mark_saved(changed)
+
+        self.filename = None
+
+        return
 
-        return package
+    def load_store(self, folder):
+        store = open_store(folder)
+        package = store.load_silo()
+
+        if 'procedures' in package:
+            self.procedures.unpack(package['procedures'])
+
+        if 'deployment' in package:
+            self.deploy.unpack(package['deployment'])
+
+        self.sensors.sensors = StoredSensors(store, self.sensors.prep)
+        self.sensors.sensor_index = 0
+        self.sensors.check_addresses()
+
+        self.close_store()
+        self.store = store
+        self.filename = None
+        self.mark_saved()
+
+        print(' {} sensors in store {}'.format(len(store.index), folder))
+
+        return
+
+    def close_store(self):
+        ''' close any open store, leaving the silo a single file'''
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+        return
+
+    def mark_saved(self, sensor_keys=None):
+        ''' record the present state as saved.  sensor_keys limits the sensors to those'''
+        self.sensors.sensors.mark_saved(sensor_keys)
+        self.procedures.mark_saved()
+        self.saved_deployment = self.deploy.deployment.copy()
+
+        return
 
     def unpack(self, package):
         print(package['date'])
@@ -0,0 +1,117 @@
+#
+# simulate.py - a stream that stands in for sensor hardware.
+#               part of the python sensor silo project.
+#
+# Copyright (c) 2026 Coburn Wightman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+
+import time
+import random
+
+from . import sensor
+from . import quantity
+
+
+class SimulatedStream(sensor.Stream):
+    ''' a stream without hardware.  readings start at value, wander by drift
+        units per second and carry gaussian noise of standard deviation noise.
+        failure_rate is the chance that a conversion raises an IOError.
+
+        addresses are "device.channel" where channels of a device share a
+        converter, as in "b.3".  an address without a dot is a device of its own.
+
+        Deploy.connect() creates streams without arguments, so configure them
+        with functools.partial(SimulatedStream, conversion_time=0.017, ...)'''
+
+    def __init__(self, conversion_time=0.0, value=500.0, noise=0.0, drift=0.0, failure_rate=0.0, units='mV', seed=None):
+        super().__init__(self.__class__.__name__)
+
+        self.address = None
+
+        self._conversion_time = conversion_time
+        self.value = value
+        self.noise = noise
+        self.drift = drift
+        self.failure_rate = failure_rate
+        self.units = units
+
+        self.random = random.Random(seed)
+        self.start_time = time.monotonic()
+
+        self.conversions = 0
+        self.failures = 0
+
+        self._raw_value = 0.0
+        self.measured_quantity = quantity.Quantity('Measured', units)
+
+        return
+
+    def validate_address(self, address):
+        if len(address.strip()) == 0:
+            return 'invalid address. address is "device.channel" as in "b.3"'
+
+        return None
+
+    def connect(self, address):
+        self.address = address.strip().lower()
+
+        return
+
+    @property
+    def device(self):
+        if self.address is None or '.' not in self.address:
+            return None
+
+        return (self.port, self.address.rsplit('.', 1)[0])
+
+    @property
+    def conversion_time(self):
+        return self._conversion_time
+
+    def start(self):
+        if self.failure_rate > 0 and self.random.random() < self.failure_rate:
+            self.failures += 1
+            raise IOError('simulated conversion failure on {}'.format(self.address))
+
+        return
+
+    def collect(self):
+        elapsed = time.monotonic() - self.start_time
+
+        value = self.value + self.drift * elapsed
+        if self.noise > 0:
+            value += self.random.gauss(0.0, self.noise)
+
+        self._raw_value = value
+        self.measured_quantity.value = value
+        self.conversions += 1
+
+        return
+
+    def update(self):
+        self.start()
+
+        if self._conversion_time > 0:
+            time.sleep(self._conversion_time)
+
+        self.collect()
+
+        return
+
+    @property
+    def raw_value(self):
+        return self._raw_value
+
+    @property
+    def raw_units(self):
+        return self.units
@@ -1,4 +1,12 @@
 import math
+import array
+import bisect
+import collections
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 class RunningStats:
     # https://stackoverflow.com/a/17637351
@@ -7,7 +15,7 @@ class RunningStats:
     def __init__(self, max_n=0):
         ''' limit n to max_n where 0 is unlimited.
             a confined number of samples acts more like a filter of
-            last n samples'''
+            last n samples, SlidingStats keeps the exact window'''
         
         self.max_n = max_n
         
@@ -43,6 +51,69 @@ class RunningStats:
 
         return
     
+    def push_many(self, values):
+        ''' push a block of values, a sequence or numpy array, at once.
+            the block's mean and sum of squares are worked out in one
+            vectorized pass then merged, rather than a python call per value.'''
+        if self.max_n:
+            # a confined n doesn't combine, take them one at a time
+            for x in values:
+                self.push(x)
+
+            return
+
+        block = RunningStats()
+        block.n = len(values)
+        if block.n == 0:
+            return
+
+        if numpy is not None:
+            values = numpy.asarray(values, dtype=float)
+            mean = float(values.mean())
+            s = float(numpy.square(values - mean).sum())
+        else:
+            mean = math.fsum(values) / block.n
+            s = math.fsum((x - mean) ** 2 for x in values)
+
+        block.old_m = block.new_m = mean
+        block.old_s = block.new_s = s
+
+        self.merge(block)
+
+        return
+
+    def merge(self, other):
+        ''' combine the statistics of other, as pushed on another thread or
+            process, into ours (Chan, Golub and LeVeque).  returns self.'''
+        if self.max_n or other.max_n:
+            raise ValueError('only statistics of unlimited n (max_n=0) merge')
+
+        if other.n == 0:
+            return self
+
+        # push() of a first sample leaves new_s as it was, so read it only past one
+        s = self.new_s if self.n > 1 else 0.0
+        other_s = other.new_s if other.n > 1 else 0.0
+
+        if self.n == 0:
+            self.n = other.n
+            self.old_m = self.new_m = other.new_m
+            self.old_s = self.new_s = other_s
+
+            return self
+
+        n = self.n + other.n
+        delta = other.new_m - self.new_m
+
+        self.new_m = self.new_m + delta * other.n / n
+        self.new_s = s + other_s + delta * delta * self.n * other.n / n
+        self.n = n
+
+        self.old_m = self.new_m
+        self.old_s = self.new_s
+
+        return self
+
     def mean(self):
         return self.new_m if self.n else 0.0
 
@@ -59,7 +130,300 @@ class RunningStats:
     def synopsis(self):
         return 'n={}, mean={}, var={}, sd={}'.format(self.n, self.mean(), self.variance(), self.standard_deviation())
 
-    
+
+class SlidingStats:
+    ''' exact statistics of the last size samples, at a constant cost per push.
+        samples live in a ring allocated up front.  mean and variance are
+        updated by replacing the oldest sample, and recomputed from the ring
+        once per pass around it so rounding can't accumulate.  minimum and
+        maximum come from monotonic queues of ring positions.'''
+
+    def __init__(self, size):
+        if size < 1:
+            raise ValueError('a window holds at least one sample')
+
+        self.size = size
+        self.ring = array.array('d', [0.0]) * size
+        self.clear()
+
+        return
+
+    def __str__(self):
+        return 'n={}, mean={}, var={}, sd={}'.format(self.n, round(self.mean(),3), round(self.variance(),3), round(self.standard_deviation(),3))
+
+    def clear(self):
+        self.n = 0
+        self.count = 0 # samples ever pushed, ring position is count % size
+        self.m = 0.0
+        self.s = 0.0
+
+        self.minima = collections.deque() # counts of ascending samples
+        self.maxima = collections.deque() # counts of descending samples
+
+        return
+
+    def push(self, x):
+        ring = self.ring
+        position = self.count % self.size
+
+        if self.n < self.size:
+            self.n += 1
+            delta = x - self.m
+            self.m += delta / self.n
+            self.s += delta * (x - self.m)
+        else:
+            old = ring[position]
+            old_m = self.m
+            self.m += (x - old) / self.size
+            self.s += (x - old) * (x - self.m + old - old_m)
+
+        ring[position] = x
+        self.count += 1
+
+        if position == self.size - 1 and self.n == self.size:
+            self.resync()
+
+        # drop samples that have left the window or can no longer be the extreme
+        first = self.count - self.n
+
+        minima = self.minima
+        while minima and (minima[0] < first):
+            minima.popleft()
+        while minima and ring[minima[-1] % self.size] >= x:
+            minima.pop()
+        minima.append(self.count - 1)
+
+        maxima = self.maxima
+        while maxima and (maxima[0] < first):
+            maxima.popleft()
+        while maxima and ring[maxima[-1] % self.size] <= x:
+            maxima.pop()
+        maxima.append(self.count - 1)
+
+        return
+
+    def resync(self):
+        ''' recompute mean and sum of squares from the full ring'''
+        self.m = math.fsum(self.ring) / self.size
+        self.s = math.fsum((x - self.m) ** 2 for x in self.ring)
+
+        return
+
+    def values(self):
+        ''' the window, oldest first'''
+        position = self.count % self.size
+        if self.n < self.size:
+            return self.ring[:self.n]
+
+        return self.ring[position:] + self.ring[:position]
+
+    def mean(self):
+        return self.m if self.n else 0.0
+
+    def variance(self):
+        return max(self.s, 0.0) / (self.n - 1) if self.n > 1 else 0.0
+
+    def standard_deviation(self):
+        return math.sqrt(self.variance())
+
+    def slope(self):
+        ''' least squares slope of the window per sample.  walks the window, so
+            costs size rather than a constant'''
+        if self.n < 2:
+            return 0.0
+
+        # sample k of n is at k - (n-1)/2 from the middle of the window
+        middle = (self.n - 1) / 2
+        covariance = math.fsum((k - middle) * (x - self.m) for k, x in enumerate(self.values()))
+        spread = self.n * (self.n * self.n - 1) / 12
+
+        return covariance / spread
+
+    def minimum(self):
+        return self.ring[self.minima[0] % self.size] if self.n else 0.0
+
+    def maximum(self):
+        return self.ring[self.maxima[0] % self.size] if self.n else 0.0
+
+    def z_score(self, x):
+        return (x - self.mean()) / self.standard_deviation() if self.n > 1 else 5
+
+    @property
+    def synopsis(self):
+        return 'n={}, mean={}, var={}, sd={}, min={}, max={}'.format(
+            self.n, self.mean(), self.variance(), self.standard_deviation(), self.minimum(), self.maximum())
+
+
+class ExponentialStats:
+    ''' exponentially weighted mean and variance.  each sample is weighted
+        alpha, and older ones decay by (1 - alpha) per sample, so the time
+        constant is about 1/alpha samples.'''
+
+    def __init__(self, alpha=None, time_constant=None):
+        if alpha is None:
+            if not time_constant or time_constant < 1:
+                raise ValueError('give alpha, or a time_constant of at least one sample')
+
+            alpha = 1.0 / time_constant
+
+        self.alpha = alpha
+        self.clear()
+
+        return
+
+    def __str__(self):
+        return 'n={}, mean={}, var={}, sd={}'.format(self.n, round(self.mean(),3), round(self.variance(),3), round(self.standard_deviation(),3))
+
+    def clear(self):
+        self.n = 0
+        self.m = 0.0
+        self.v = 0.0
+
+        return
+
+    def push(self, x):
+        self.n += 1
+
+        if self.n == 1:
+            self.m = x
+            self.v = 0.0
+        else:
+            # West, updating mean and variance estimates (1979)
+            delta = x - self.m
+            increment = self.alpha * delta
+            self.m += increment
+            self.v = (1.0 - self.alpha) * (self.v + delta * increment)
+
+        return
+
+    def mean(self):
+        return self.m if self.n else 0.0
+
+    def variance(self):
+        return self.v
+
+    def standard_deviation(self):
+        return math.sqrt(self.variance())
+
+    def z_score(self, x):
+        return (x - self.mean()) / self.standard_deviation() if self.n > 1 and self.v > 0 else 5
+
+    @property
+    def synopsis(self):
+        return 'n={}, alpha={}, mean={}, var={}, sd={}'.format(self.n, self.alpha, self.mean(), self.variance(), self.standard_deviation())
+
+
+
+class GatedStats:
+    ''' statistics that refuse outliers before they are pushed.
+
+        with method 'mad' a sample is an outlier when it lies more than
+        threshold robust standard deviations (1.4826 median absolute
+        deviations) from the median of the last window samples.  the window
+        keeps rejected samples too, so a real step in level is followed within
+        half a window rather than refused forever.  with method 'z' a sample
+        is an outlier when the z_score of stats is beyond threshold.  rejected
+        samples never reach stats, so after a step in level every sample
+        would be refused; instead a window of consecutive rejections re-seeds
+        stats from them.
+
+        samples aren't gated until warmup have been seen, nor while the
+        window has no spread, as a quiet adc reading the same count.'''
+
+    methods = ('mad', 'z')
+
+    def __init__(self, stats, threshold=4.0, method='mad', window=25, warmup=5):
+        if method not in self.methods:
+            raise ValueError('method is one of {}'.format(', '.join(self.methods)))
+
+        self.stats = stats
+        self.threshold = threshold
+        self.method = method
+        self.window = window
+        self.warmup = warmup
+
+        self.clear()
+
+        return
+
+    def __getattr__(self, name):
+        # mean(), variance(), slope() and the rest come from stats.  copy and
+        # unpickle look attributes up before __init__ has set stats
+        if name == 'stats':
+            raise AttributeError(name)
+
+        return getattr(self.stats, name)
+
+    def __str__(self):
+        return '{}, rejected={}'.format(self.stats, self.rejected)
+
+    def clear(self):
+        self.stats.clear()
+
+        self.recent = collections.deque() # last window samples, in order
+        self.ordered = []                 # the same samples, sorted
+        self.seen = 0
+        self.rejected = 0
+        self.consecutive = 0              # rejections since the last push
+
+        return
+
+    def is_outlier(self, x):
+        if self.seen < self.warmup:
+            return False
+
+        if self.method == 'z':
+            return self.stats.n > 1 and self.stats.standard_deviation() > 0 and abs(self.stats.z_score(x)) > self.threshold
+
+        median = self.median(self.ordered)
+        spread = 1.4826 * self.median(sorted(abs(y - median) for y in self.ordered))
+        if spread == 0:
+            return False
+
+        return abs(x - median) > self.threshold * spread
+
+    @staticmethod
+    def median(ordered):
+        middle = len(ordered) // 2
+        if len(ordered) % 2:
+            return ordered[middle]
+
+        return (ordered[middle - 1] + ordered[middle]) / 2
+
+    def push(self, x):
+        ''' push x unless it is an outlier.  returns true if pushed'''
+        outlier = self.is_outlier(x)
+
+        self.seen += 1
+        self.recent.append(x)
+        bisect.insort(self.ordered, x)
+        if len(self.recent) > self.window:
+            del self.ordered[bisect.bisect_left(self.ordered, self.recent.popleft())]
+
+        if outlier and self.method == 'z' and self.consecutive + 1 >= self.window:
+            # a window of outliers in a row is a new level, all of it in recent
+            self.stats.clear()
+            for y in self.recent:
+                self.stats.push(y)
+
+            self.consecutive = 0
+            return True
+
+        if outlier:
+            self.rejected += 1
+            self.consecutive += 1
+            return False
+
+        self.stats.push(x)
+        self.consecutive = 0
+
+        return True
+
+    @property
+    def synopsis(self):
+        return '{}, rejected={}'.format(self.stats.synopsis, self.rejected)
+
+
 if __name__ == '__main__':
     rs = RunningStats()
     rs.push(17.0)
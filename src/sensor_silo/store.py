@@ -0,0 +1,332 @@
+#
+# store.py - a silo kept in a folder, a file per sensor.
+#            part of the python sensor silo project.
+#
+# Copyright (c) 2026 Coburn Wightman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+
+import os
+import datetime
+import contextlib
+import urllib.parse
+import tomllib as tomli
+
+from . import sensor
+from . import writer
+
+
+class SensorStore():
+    ''' a silo kept in a folder:
+            silo.toml            procedures and deployment
+            index.toml           a row per sensor of id, kind, address, port, due date and deployment
+            sensors/<key>.toml   a file per sensor
+            deployed/<key>.toml  keys of the sensors deployed on each deployment named in the index
+        so a node reads its own list and only the sensors deployed on it.'''
+
+    def __init__(self, folder, index=True):
+        self.path = folder
+        self.folder = folder
+        self.index = dict() # key: row
+
+        if index and os.path.exists(self.index_name):
+            self.load_index()
+
+        return
+
+    @property
+    def index_name(self):
+        return os.path.join(self.folder, 'index.toml')
+
+    @property
+    def silo_name(self):
+        return os.path.join(self.folder, 'silo.toml')
+
+    def sensor_name(self, key):
+        return os.path.join(self.folder, 'sensors', '{}.toml'.format(urllib.parse.quote(key, safe='')))
+
+    def deployed_name(self, key_name):
+        return os.path.join(self.folder, 'deployed', '{}.toml'.format(urllib.parse.quote(key_name, safe='')))
+
+    @staticmethod
+    def is_store(folder):
+        return os.path.isdir(folder) and os.path.exists(os.path.join(folder, 'index.toml'))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+        return False
+
+    def close(self):
+        ''' nothing is held open between calls, here for the SensorDatabase interface'''
+        return
+
+    @contextlib.contextmanager
+    def transaction(self):
+        ''' write the index once the changes within are made'''
+        yield self
+        self.save_index()
+
+        return
+
+    @staticmethod
+    def row(sensor):
+        ''' the index entry of a sensor'''
+        due_date = ''
+        if sensor.calibration is not None and isinstance(sensor.calibration.due_date, datetime.date):
+            due_date = sensor.calibration.due_date.isoformat()
+
+        return {'id': sensor.id, 'kind': sensor.kind, 'address': sensor.address,
+                'port': sensor.port, 'due_date': due_date, 'deployment': sensor.deployment}
+
+    def load_index(self):
+        with open(self.index_name, 'rb') as fp:
+            self.index = tomli.load(fp).get('sensors', dict())
+
+        return
+
+    def load_deployed(self, key_name):
+        ''' keys of the sensors deployed on key_name or on any, reading only
+            the list of key_name if there is one rather than the whole index'''
+        filename = self.deployed_name(key_name)
+        if key_name and os.path.exists(filename):
+            with open(filename, 'rb') as fp:
+                return tomli.load(fp)['keys']
+
+        if not self.index:
+            self.load_index()
+
+        return self.deployed(key_name)
+
+    def save_index(self):
+        self.write_file(self.index_name, self.iterindex())
+
+        # and the list of each deployment, dropping those no longer named
+        key_names = set(row['deployment'] for row in self.index.values()) - {''}
+        for key_name in key_names:
+            keys = ', '.join(writer.quote(key) for key in self.deployed(key_name))
+            self.write_file(self.deployed_name(key_name), 'keys = [{}]\n'.format(keys))
+
+        folder = os.path.dirname(self.deployed_name('x'))
+        if os.path.isdir(folder):
+            names = set(os.path.basename(self.deployed_name(key_name)) for key_name in key_names)
+            for name in os.listdir(folder):
+                if name not in names:
+                    os.remove(os.path.join(folder, name))
+
+        return
+
+    def iterindex(self):
+        yield 'date = {}\n\n[sensors]\n'.format(datetime.datetime.now())
+
+        for key, row in self.index.items():
+            fields = ', '.join('{} = {}'.format(name, writer.quote(value)) for name, value in row.items())
+            yield '{} = {{{}}}\n'.format(writer.key(key), fields)
+
+        return
+
+    def deployed(self, key_name):
+        ''' keys of the sensors deployed on the deployment of key_name, or on any'''
+        keys = []
+        for key, row in self.index.items():
+            if row['address'].lower() != 'nd' and row['deployment'] in ('', key_name):
+                keys.append(key)
+
+        return keys
+
+    def find(self, kind=None, address=None, due_before=None):
+        ''' keys of sensors of a kind, at an address, and due for calibration
+            before a date, from the index rather than the sensor files'''
+        due_date = None if due_before is None else due_before.isoformat()
+        if address is not None:
+            address = address.lower()
+
+        keys = []
+        for key, row in self.index.items():
+            if kind is not None and row['kind'] != kind:
+                continue
+
+            if address is not None and row['address'].lower() != address:
+                continue
+
+            if due_date is not None and not (row['due_date'] and row['due_date'] < due_date):
+                continue
+
+            keys.append(key)
+
+        return keys
+
+    def read(self, key):
+        with open(self.sensor_name(key), 'rb') as fp:
+            package = tomli.load(fp)
+
+        item = sensor.Sensor(package['sensor']['id'])
+        item.unpack(package['sensor'])
+
+        return item
+
+    def write(self, key, item):
+        ''' write the file of a sensor and update its index row.  the index
+            itself is written by save_index()'''
+        prefix = 'sensor'
+        self.write_file(self.sensor_name(key), ['[{}]\n'.format(prefix), item.pack(prefix)])
+        self.index[key] = self.row(item)
+
+        return
+
+    def remove(self, key):
+        self.index.pop(key, None)
+
+        filename = self.sensor_name(key)
+        if os.path.exists(filename):
+            os.remove(filename)
+
+        return
+
+    def load_silo(self):
+        ''' the package of silo.toml, without sensors'''
+        if not os.path.exists(self.silo_name):
+            return dict()
+
+        with open(self.silo_name, 'rb') as fp:
+            return tomli.load(fp)
+
+    def save_silo(self, package):
+        self.write_file(self.silo_name, package)
+
+        return
+
+    def write_file(self, filename, package):
+        ''' write package, a string or iterable of strings, by way of a
+            temporary file so a reader never sees half a file'''
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        writer.write_file(filename, package)
+
+        return
+
+
+database_suffixes = ('.db', '.sqlite', '.sqlite3')
+database_header = b'SQLite format 3\x00'
+
+
+def open_store(path, index=True):
+    ''' a SensorStore of a folder, or a database.SensorDatabase of an sqlite file'''
+    if path.endswith(database_suffixes):
+        from . import database # only database users pay for sqlite3
+        return database.SensorDatabase(path, index)
+
+    return SensorStore(path, index)
+
+
+def is_store(path):
+    ''' a store folder, or an sqlite file known by its header, checked
+        without importing sqlite3'''
+    if SensorStore.is_store(path):
+        return True
+
+    if not path.endswith(database_suffixes) or not os.path.isfile(path):
+        return False
+
+    with open(path, 'rb') as fp:
+        header = fp.read(len(database_header))
+
+    # sqlite writes nothing to a new database until its first table
+    return header in [b'', database_header]
+
+
+class StoredSensors(sensor.Sensors):
+    ''' the Sensors of a SensorStore or SensorDatabase.  a sensor is read from its file the
+        first time it is used and handed to prep, if given.'''
+
+    def __init__(self, store, prep=None):
+        super().__init__()
+
+        self.store = store
+        self.prep = prep
+
+        return
+
+    def __len__(self):
+        return len(self.store.index)
+
+    def __iter__(self):
+        return iter(list(self.store.index))
+
+    def __contains__(self, key):
+        return key in self.store.index
+
+    def __getitem__(self, key):
+        if key in self.data:
+            return self.data[key]
+
+        if key not in self.store.index:
+            raise KeyError(key)
+
+        item = self.store.read(key)
+        self.data[key] = item
+        if self.prep is not None:
+            self.prep(item)
+
+        self.saved[key] = item.stamp # as read, so unchanged
+
+        return item
+
+    def __setitem__(self, key, item):
+        super().__setitem__(key, item)
+        self.store.index[key] = self.store.row(item)
+
+        return
+
+    def __delitem__(self, key):
+        if key not in self.store.index:
+            raise KeyError(key)
+
+        self.data.pop(key, None)
+        self.saved.pop(key, None)
+        self.store.index.pop(key)
+
+        self.removed.add(key)
+        self.revision += 1
+        self.unindex(key)
+
+        return
+
+    def index_rows(self):
+        ''' rows of the store index, or of the sensor itself once read'''
+        for key, row in self.store.index.items():
+            if key in self.data:
+                yield self.index_row(key, self.data[key])
+            else:
+                due_date = None
+                if row['due_date']:
+                    due_date = datetime.date.fromisoformat(row['due_date'])
+
+                yield (key, row['kind'], row['address'], row['port'], row['deployment'], due_date)
+
+        return
+
+    def find(self, kind=None, address=None, due_before=None):
+        ''' keys of sensors of a kind, at an address, and due for calibration
+            before a date, by way of the store index.  sensors already read
+            may have changed since, so they are matched as they are now.'''
+        found = set(key for key in self.store.find(kind, address, due_before) if key not in self.data)
+        found.update(key for key, item in self.data.items() if item.matches(kind, address, due_before))
+
+        return sorted(found, key=self.index.position)
+
+    @property
+    def opened(self):
+        ''' keys of the sensors read so far'''
+        return list(self.data.keys())
@@ -0,0 +1,251 @@
+#
+# table.py - a columnar table of a fleets calibration equations.
+#            part of the python sensor silo project.
+#
+# Copyright (c) 2026 Coburn Wightman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+
+import math
+import array
+
+from .equation import numpy
+
+
+class CalibrationTable():
+    ''' the equations of a group of sensors gathered into columns by equation
+        type, so raw readings of the whole group scale in a few array operations.
+
+        rows are in the order of keys.  sensors without an equation scale to nan,
+        equation types without a column are evaluated one at a time.
+
+        each row remembers the equation and revision it was built from, so
+        refresh() rewrites only the rows whose equation has since changed.'''
+
+    def __init__(self, sensors):
+        self.keys = list(sensors.keys())
+
+        # polynomial: x = (y - offset) / slope
+        self.linear_rows = array.array('l')
+        self.linear_offsets = array.array('d')
+        self.linear_slopes = array.array('d')
+
+        # beta thermistors, either in ohms or through a phorp bias divider
+        self.ntc_rows = array.array('l')
+        self.ntc_betas = array.array('d')
+        self.ntc_r25s = array.array('d')
+        self.ntc_t0s = array.array('d')
+        self.ntc_dividers = array.array('b') # 1 if raw value is divider millivolts
+        self.ntc_bias_volts = array.array('d')
+        self.ntc_bias_ohms = array.array('d')
+
+        self.identity_rows = array.array('l')
+        self.other_rows = [] # (row, equation)
+
+        self.stamps = [None] * len(self.keys) # row: (column, equation, revision)
+        self.slots = dict() # row: position in the columns of its kind
+
+        for row, sensor in enumerate(sensors.values()):
+            equ = self.equation_of(sensor)
+            if equ is None:
+                continue
+
+            self.add(row, equ)
+
+        if numpy is not None:
+            self.to_numpy()
+
+        return
+
+    def __len__(self):
+        return len(self.keys)
+
+    @staticmethod
+    def equation_of(sensor):
+        if sensor.calibration is None:
+            return None
+
+        return sensor.calibration.equation
+
+    @staticmethod
+    def column(equ):
+        ''' the kind of column a row of equ belongs in, None for no equation'''
+        if equ is None:
+            return None
+
+        if equ.type == 'IdentityEquation':
+            return 'identity'
+
+        if equ.type == 'PolynomialEquation' and equ.is_linear:
+            return 'linear'
+
+        if equ.type in ['NtcBetaEquation', 'PhorpNtcBetaEquation']:
+            return 'ntc'
+
+        return 'other'
+
+    def add(self, row, equ):
+        column = self.column(equ)
+
+        if column == 'identity':
+            self.slots[row] = len(self.identity_rows)
+            self.identity_rows.append(row)
+
+        elif column == 'linear':
+            self.slots[row] = len(self.linear_rows)
+            self.linear_rows.append(row)
+            self.linear_offsets.append(0.0)
+            self.linear_slopes.append(1.0)
+
+        elif column == 'ntc':
+            self.slots[row] = len(self.ntc_rows)
+            self.ntc_rows.append(row)
+            for name in ['ntc_betas', 'ntc_r25s', 'ntc_t0s', 'ntc_dividers', 'ntc_bias_volts', 'ntc_bias_ohms']:
+                getattr(self, name).append(0)
+
+        else:
+            self.slots[row] = len(self.other_rows)
+            self.other_rows.append((row, equ))
+
+        self.set(row, equ)
+
+        return
+
+    def set(self, row, equ):
+        ''' write the constants of equ into the columns of row, which holds
+            an equation of the same column'''
+        column = self.column(equ)
+        slot = self.slots[row]
+
+        if column == 'linear':
+            slope = equ.coefficients[1]
+            if slope == 0:
+                slope = 0.00001
+
+            self.linear_offsets[slot] = equ.coefficients[0]
+            self.linear_slopes[slot] = slope
+
+        elif column == 'ntc':
+            divider = equ.type == 'PhorpNtcBetaEquation'
+
+            self.ntc_betas[slot] = equ.beta
+            self.ntc_r25s[slot] = equ.r25
+            self.ntc_t0s[slot] = equ.t0
+            self.ntc_dividers[slot] = divider
+            self.ntc_bias_volts[slot] = equ.bias_volts if divider else 0.0
+            self.ntc_bias_ohms[slot] = equ.bias_ohms if divider else 1.0
+
+        elif column == 'other':
+            self.other_rows[slot] = (row, equ)
+
+        self.stamps[row] = (column, equ, equ.revision)
+
+        return
+
+    def refresh(self, sensors):
+        ''' rewrite the rows of sensors, the same keys the table was built
+            from, whose equation is another or has changed since.  returns
+            False, leaving the table to be rebuilt, if a row changes column.'''
+        for row, sensor in enumerate(sensors.values()):
+            equ = self.equation_of(sensor)
+            stamp = self.stamps[row]
+
+            if stamp is None:
+                if equ is None:
+                    continue
+
+                return False
+
+            column, built_from, revision = stamp
+            if equ is built_from and equ.revision == revision:
+                continue
+
+            if self.column(equ) != column:
+                return False
+
+            self.set(row, equ)
+
+        return True
+
+    def to_numpy(self):
+        ''' swap the columns for numpy arrays'''
+        for name, column in list(vars(self).items()):
+            if isinstance(column, array.array):
+                dtype = bool if column.typecode == 'b' else column.typecode
+                setattr(self, name, numpy.asarray(column, dtype=dtype))
+
+        return
+
+    def scale(self, raw_values):
+        ''' scale raw_values, one per row, into a numpy array or array('d')'''
+        if numpy is None:
+            return self.scale_python(raw_values)
+
+        raw = numpy.asarray(raw_values, dtype=float)
+        scaled = numpy.full(len(self.keys), numpy.nan)
+
+        rows = self.identity_rows
+        scaled[rows] = raw[rows]
+
+        rows = self.linear_rows
+        scaled[rows] = (raw[rows] - self.linear_offsets) / self.linear_slopes
+
+        rows = self.ntc_rows
+        if len(rows):
+            with numpy.errstate(divide='ignore', invalid='ignore'):
+                volts = raw[rows] / 1000
+                amps = (self.ntc_bias_volts - volts) / self.ntc_bias_ohms
+                ohms = numpy.where(self.ntc_dividers, volts / amps, raw[rows])
+
+                ratio = ohms / self.ntc_r25s
+                valid = numpy.isfinite(ratio) & (ratio > 0)
+                ratio = numpy.where(valid, ratio, 1.0)
+
+                t25 = self.ntc_t0s + 25.0
+                kelvin = 1.0 / (1.0/t25 + numpy.log(ratio) / self.ntc_betas)
+
+            scaled[rows] = numpy.where(valid, kelvin, 0.0) - self.ntc_t0s
+
+        for row, equ in self.other_rows:
+            scaled[row] = equ.evaluate_y(raw[row])
+
+        return scaled
+
+    def scale_python(self, raw_values):
+        raw = raw_values
+        scaled = array.array('d', [math.nan]) * len(self.keys)
+
+        for row in self.identity_rows:
+            scaled[row] = raw[row]
+
+        for row, offset, slope in zip(self.linear_rows, self.linear_offsets, self.linear_slopes):
+            scaled[row] = (raw[row] - offset) / slope
+
+        columns = zip(self.ntc_rows, self.ntc_betas, self.ntc_r25s, self.ntc_t0s,
+                      self.ntc_dividers, self.ntc_bias_volts, self.ntc_bias_ohms)
+        for row, beta, r25, t0, divider, bias_volts, bias_ohms in columns:
+            ohms = raw[row]
+            if divider:
+                volts = ohms / 1000
+                ohms = volts / ((bias_volts - volts) / bias_ohms)
+
+            try:
+                kelvin = 1.0 / (1.0/(t0 + 25.0) + (1.0/beta) * math.log(ohms/r25))
+            except ValueError:
+                kelvin = 0
+
+            scaled[row] = kelvin - t0
+
+        for row, equ in self.other_rows:
+            scaled[row] = equ.evaluate_y(raw[row])
+
+        return scaled
@@ -1,5 +1,5 @@
 #
-# thermistor.py - thermistor linearization procedure and routines.
+# thermistor.py - thermistor calibration procedures.
 #                 part of the python sensor silo project.
 #
 # Copyright (c) 2026 Coburn Wightman
@@ -15,12 +15,13 @@
 # GNU Affero General Public License for more details.
 #
 
-import math
 import datetime
 
 from . import procedure
 from . import quantity
 from . import equation
+from .thermistor_equation import NtcBetaEquation
+from .thermistor_equation import PhorpNtcBetaEquation
 
 
 class NtcBetaProcedure(procedure.ProcedureShell):
@@ -128,93 +129,3 @@ class PhorpNtcBetaProcedure(NtcBetaProcedure):
             sensor.calibration.equation = PhorpNtcBetaEquation() 
             
         return
-        
-    
-class NtcBetaEquation(equation.Equation):
-    def __init__(self, package=None):
-        super().__init__()
-
-        self.beta = 3499
-        self.r25 = 9999
-        self.t0 = 273.15 # freezing point of water in degrees Kelvin
-        
-        if package:
-            self.unpack(package)
-
-        return
-
-    def to_kelvin(self, ntc_ohms):
-        t25 = self.t0 + 25.0
-        try:
-            kelvin = 1.0 / ( 1.0/t25 + (1.0/self.beta) * math.log(ntc_ohms/self.r25) )
-        except ValueError:
-            kelvin = 0
-
-        return kelvin
-    def to_celcius(self, ntc_ohms):
-        kelvin = self.to_kelvin(ntc_ohms)
-        celcius = kelvin - self.t0
-
-        return celcius
-
-    def to_fahrenheit(self, ntc_ohms):
-        celcius = self.to_celcius(ntc_ohms)
-        fahrenheit = 9.0/5.0 * celcius + 32
-
-        return fahrenheit
-
-    def pack(self, prefix):
-        package = super().pack(prefix)
-        
-        package += 'beta = {}\n'.format(self.beta)
-        package += 'r25 = {}\n'.format(self.r25)
-
-        return package
-
-    def unpack(self, package):
-        super().unpack(package)
-        
-        self.beta = package['beta']
-        self.r25 = package['r25']
-        
-        return
-    
-class PhorpNtcBetaEquation(NtcBetaEquation):
-    # perhaps integrate with ntcbeta and evaluate a quantity with source units.
-    def __init__(self, package=None):
-        super().__init__()
-
-        self.bias_volts = 1.5
-        self.bias_ohms = 10000
-
-        if package:
-            self.unpack(package)
-        
-        return
-
-    def evaluate_y(self, ntc_millivolts):  # target_units
-        ntc_volts = ntc_millivolts / 1000  # xx convert back to volts...
-        
-        ntc_amps = (self.bias_volts - ntc_volts) / self.bias_ohms
-        ntc_ohms = ntc_volts / ntc_amps
-
-        #if 'c' in self.scaled_units.lower(): # xx
-        return self.to_celcius(ntc_ohms)
-
-        #return self.to_fahrenheit(ntc_ohms)
-
-    def pack(self, prefix):
-        package = super().pack(prefix)
-        
-        package += 'bias_volts = {}\n'.format(self.bias_volts)
-        package += 'bias_ohms = {}\n'.format(self.bias_ohms)
-
-        return package
-
-    def unpack(self, package):
-        super().unpack(package)
-        
-        self.bias_volts = package.get('bias_volts', 1.5)
-        self.bias_ohms = package.get('bias_ohms', 10000)
-        
-        return
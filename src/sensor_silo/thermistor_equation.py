@@ -0,0 +1,233 @@
+#
+# thermistor_equation.py - beta equations to scale a thermistors raw value.
+#                          part of the python sensor silo project.
+#
+# Copyright (c) 2026 Coburn Wightman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+
+import math
+
+from . import equation
+from . import lookup
+from .equation import numpy
+
+
+class NtcBetaEquation(equation.Equation):
+    def __init__(self, package=None):
+        super().__init__()
+
+        self.beta = 3499
+        self.r25 = 9999
+        self.t0 = 273.15 # freezing point of water in degrees Kelvin
+        
+        if package:
+            self.unpack(package)
+
+        return
+
+    def to_kelvin(self, ntc_ohms):
+        t25 = self.t0 + 25.0
+        try:
+            kelvin = 1.0 / ( 1.0/t25 + (1.0/self.beta) * math.log(ntc_ohms/self.r25) )
+        except ValueError:
+            kelvin = 0
+
+        return kelvin
+
+    def to_kelvin_numpy(self, ntc_ohms):
+        ''' to_kelvin() over a numpy array.  invalid resistances give 0 kelvin'''
+        t25 = self.t0 + 25.0
+        ratio = ntc_ohms / self.r25
+
+        valid = numpy.isfinite(ratio) & (ratio > 0)
+        ratio = numpy.where(valid, ratio, 1.0)
+
+        kelvin = 1.0 / ( 1.0/t25 + (1.0/self.beta) * numpy.log(ratio) )
+
+        return numpy.where(valid, kelvin, 0.0)
+
+    def to_celcius(self, ntc_ohms):
+        kelvin = self.to_kelvin(ntc_ohms)
+        celcius = kelvin - self.t0
+
+        return celcius
+
+    def to_fahrenheit(self, ntc_ohms):
+        celcius = self.to_celcius(ntc_ohms)
+        fahrenheit = 9.0/5.0 * celcius + 32
+
+        return fahrenheit
+
+    def evaluate_y(self, ntc_ohms):
+        return self.to_celcius(ntc_ohms)
+
+    def evaluate_y_numpy(self, ntc_ohms):
+        return self.to_kelvin_numpy(ntc_ohms) - self.t0
+
+    def compile(self):
+        log = math.log
+
+        t0 = self.t0
+        reciprocal_t25 = 1.0 / (t0 + 25.0)
+        reciprocal_beta = 1.0 / self.beta
+        log_r25 = log(self.r25)
+
+        def evaluate_y(ntc_ohms):
+            try:
+                return 1.0 / (reciprocal_t25 + reciprocal_beta * (log(ntc_ohms) - log_r25)) - t0
+            except ValueError:
+                return -t0
+
+        return evaluate_y
+
+    def pack(self, prefix):
+        package = super().pack(prefix)
+        
+        package += 'beta = {}\n'.format(self.beta)
+        package += 'r25 = {}\n'.format(self.r25)
+
+        return package
+
+    def unpack(self, package):
+        super().unpack(package)
+        
+        self.beta = package['beta']
+        self.r25 = package['r25']
+        
+        return
+    
+class PhorpNtcBetaEquation(NtcBetaEquation):
+    # perhaps integrate with ntcbeta and evaluate a quantity with source units.
+    def __init__(self, package=None):
+        super().__init__()
+
+        self.bias_volts = 1.5
+        self.bias_ohms = 10000
+
+        # 0 evaluates the beta formula, otherwise the size of a lookup table
+        # tabulated evenly in millivolts, as the adc reports them
+        self.lookup_points = 0
+
+        if package:
+            self.unpack(package)
+        
+        return
+
+    @property
+    def lookup(self):
+        ''' the lookup table, rebuilt after any change.  None if lookup_points is 0'''
+        if self.lookup_points < 2:
+            return None
+
+        if self.__dict__.get('_lookup_revision') != self.revision:
+            # stash in __dict__ so building the table isn't itself a change
+            y_min, y_max = self.lookup_range()
+            self.__dict__['_lookup'] = lookup.LookupTable(self.evaluate_exact, y_min, y_max, self.lookup_points)
+            self.__dict__['_lookup_revision'] = self.revision
+
+        return self._lookup
+
+    def lookup_range(self):
+        ''' raw millivolts covered by the lookup table, roughly -50 to 170 Celsius'''
+        bias_millivolts = self.bias_volts * 1000
+
+        return (0.02 * bias_millivolts, 0.98 * bias_millivolts)
+
+    def lookup_error(self):
+        ''' returns (max_error, y_value) of the lookup table against the formula'''
+        return self.lookup.error()
+
+    def evaluate_y(self, y_value):
+        table = self.lookup
+        if table is None:
+            return self.evaluate_exact(y_value)
+
+        return table(y_value)
+
+    def evaluate_y_numpy(self, y_values):
+        table = self.lookup
+        if table is None:
+            return self.evaluate_exact_numpy(y_values)
+
+        return table.evaluate_numpy(y_values, self.evaluate_exact_numpy)
+
+    def compile(self):
+        exact = self.compile_exact()
+
+        table = self.lookup
+        if table is None:
+            return exact
+
+        return table.compile(exact)
+
+    def evaluate_exact(self, ntc_millivolts):  # target_units
+        ntc_volts = ntc_millivolts / 1000  # xx convert back to volts...
+        
+        ntc_amps = (self.bias_volts - ntc_volts) / self.bias_ohms
+        ntc_ohms = ntc_volts / ntc_amps
+
+        #if 'c' in self.scaled_units.lower(): # xx
+        return self.to_celcius(ntc_ohms)
+
+        #return self.to_fahrenheit(ntc_ohms)
+
+    def evaluate_exact_numpy(self, ntc_millivolts):
+        ntc_volts = ntc_millivolts / 1000
+
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            ntc_amps = (self.bias_volts - ntc_volts) / self.bias_ohms
+            ntc_ohms = ntc_volts / ntc_amps
+
+        return self.to_kelvin_numpy(ntc_ohms) - self.t0
+
+    def compile_exact(self):
+        log = math.log
+
+        t0 = self.t0
+        reciprocal_t25 = 1.0 / (t0 + 25.0)
+        reciprocal_beta = 1.0 / self.beta
+        log_r25 = log(self.r25)
+
+        # ohms = volts / ((bias_volts - volts) / bias_ohms), in millivolts
+        bias_millivolts = self.bias_volts * 1000
+        bias_ohms = self.bias_ohms
+
+        def evaluate_y(ntc_millivolts):
+            ntc_ohms = ntc_millivolts * bias_ohms / (bias_millivolts - ntc_millivolts)
+            try:
+                return 1.0 / (reciprocal_t25 + reciprocal_beta * (log(ntc_ohms) - log_r25)) - t0
+            except ValueError:
+                return -t0
+
+        return evaluate_y
+
+    def pack(self, prefix):
+        package = super().pack(prefix)
+        
+        package += 'bias_volts = {}\n'.format(self.bias_volts)
+        package += 'bias_ohms = {}\n'.format(self.bias_ohms)
+        package += 'lookup_points = {}\n'.format(self.lookup_points)
+
+        return package
+
+    def unpack(self, package):
+        self.bias_volts = package.get('bias_volts', 1.5)
+        self.bias_ohms = package.get('bias_ohms', 10000)
+        self.lookup_points = package.get('lookup_points', 0)
+
+        super().unpack(package)
+
+        # build any lookup table now rather than on the first reading
+        self.lookup
+        
+        return
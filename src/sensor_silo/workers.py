@@ -0,0 +1,180 @@
+#
+# workers.py - a worker thread per i2c bus, joined into one scan.
+#              part of the python sensor silo project.
+#
+# Copyright (c) 2026 Coburn Wightman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+
+import math
+import time
+import threading
+
+from . import scheduler
+
+
+class Scan():
+    ''' the readings of every bus from one scan'''
+    def __init__(self):
+        self.timestamp = time.time()
+
+        self.raw_values = dict()    # sensor id: raw value
+        self.scaled_values = dict() # sensor id: scaled value, None if uncalibrated
+        self.timing = dict()        # bus: seconds spent scanning
+
+        return
+
+    def __len__(self):
+        return len(self.raw_values)
+
+    @property
+    def elapsed(self):
+        ''' the slowest bus sets the scan time'''
+        return max(self.timing.values(), default=0.0)
+
+    @property
+    def synopsis(self):
+        timing = ', '.join('bus {}={}s'.format(bus, round(elapsed, 3)) for bus, elapsed in self.timing.items())
+        return 'n={}, elapsed={}s, {}'.format(len(self), round(self.elapsed, 3), timing)
+
+
+class BusWorker(threading.Thread):
+    ''' scans the sensors of one bus each time it is asked to'''
+    def __init__(self, bus, sensors):
+        super().__init__(name='bus-{}'.format(bus), daemon=True)
+
+        self.bus = bus
+        self.sensors = list(sensors)
+        self.scheduler = scheduler.ConversionScheduler(self.sensors)
+
+        self.request = threading.Event()
+        self.done = threading.Event()
+        self.running = True
+
+        self.raw_values = dict()
+        self.scaled_values = dict()
+        self.elapsed = 0.0
+        self.error = None
+
+        return
+
+    def run(self):
+        while True:
+            self.request.wait()
+            self.request.clear()
+
+            if not self.running:
+                break
+
+            try:
+                self.scan()
+            except Exception as e:
+                self.error = e
+
+            self.done.set()
+
+        return
+
+    def scan(self):
+        start_time = time.monotonic()
+        self.scheduler.scan()
+        timestamp = time.time()
+
+        self.raw_values = dict()
+        self.scaled_values = dict()
+        for sensor in self.sensors:
+            raw_value = sensor.raw_value
+            self.raw_values[sensor.id] = raw_value
+
+            scaled_value = None
+            if sensor.calibration is not None and sensor.calibration.equation is not None:
+                scaled_value = sensor.evaluate(raw_value)
+            self.scaled_values[sensor.id] = scaled_value
+
+            if sensor.history is not None:
+                sensor.history.push(timestamp, raw_value, math.nan if scaled_value is None else scaled_value)
+
+        self.elapsed = time.monotonic() - start_time
+
+        return
+
+    def stop(self):
+        self.running = False
+        self.request.set()
+
+        return
+
+
+class BusWorkers():
+    ''' one worker thread per bus.  scan() releases every worker at once and
+        returns when all have finished.  Deploy.connect() sets each streams
+        port to its bus number, so a stream opens only the bus of its worker.'''
+    def __init__(self, sensors_by_bus):
+        self.workers = [BusWorker(bus, sensors) for bus, sensors in sensors_by_bus.items()]
+        self.started = False
+
+        return
+
+    def __len__(self):
+        return len(self.workers)
+
+    @property
+    def synopsis(self):
+        lines = []
+        for worker in self.workers:
+            lines.append('bus {}:'.format(worker.bus))
+            lines.append(worker.scheduler.synopsis)
+
+        return '\n'.join(lines)
+
+    def start(self):
+        for worker in self.workers:
+            worker.start()
+
+        self.started = True
+
+        return
+
+    def stop(self):
+        for worker in self.workers:
+            worker.stop()
+
+        for worker in self.workers:
+            worker.join()
+
+        self.started = False
+
+        return
+
+    def scan(self):
+        if not self.started:
+            self.start()
+
+        for worker in self.workers:
+            worker.done.clear()
+            worker.request.set()
+
+        for worker in self.workers:
+            worker.done.wait()
+
+        scan = Scan()
+        for worker in self.workers:
+            if worker.error is not None:
+                error = worker.error
+                worker.error = None
+                raise error
+
+            scan.raw_values.update(worker.raw_values)
+            scan.scaled_values.update(worker.scaled_values)
+            scan.timing[worker.bus] = worker.elapsed
+
+        return scan
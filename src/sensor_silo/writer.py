@@ -0,0 +1,75 @@
+#
+# writer.py - toml strings and keys for the pack() methods.
+#             part of the python sensor silo project.
+#
+# Copyright (c) 2026 Coburn Wightman
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+
+import contextlib
+import os
+import re
+
+# https://toml.io/en/v1.0.0#string
+_escapes = {'"': '\\"', '\\': '\\\\', '\b': '\\b', '\t': '\\t', '\n': '\\n', '\f': '\\f', '\r': '\\r'}
+for code in list(range(0x20)) + [0x7f]:
+    _escapes.setdefault(chr(code), '\\u{:04x}'.format(code))
+
+_translation = str.maketrans(_escapes)
+_needs_escape = re.compile(r'["\\\x00-\x1f\x7f]')
+_bare_key = re.compile(r'[A-Za-z0-9_-]+')
+
+
+def quote(value):
+    ''' value as a toml basic string, quotes included'''
+    text = str(value)
+    if _needs_escape.search(text):
+        text = text.translate(_translation)
+
+    return '"{}"'.format(text)
+
+
+def key(name):
+    ''' name as a toml key, quoted only if it is not a bare key'''
+    name = str(name)
+    if _bare_key.fullmatch(name):
+        return name
+
+    return quote(name)
+
+
+def write(fp, chunks):
+    ''' write a package, either a string or an iterable of string chunks, to a file object'''
+    if isinstance(chunks, str):
+        fp.write(chunks)
+    else:
+        fp.writelines(chunks)
+
+    return
+
+
+def write_file(filename, chunks):
+    ''' write a package to filename by way of a temporary file, so neither
+        a reader nor an error while packing ever leaves half a file'''
+    temporary = '{}.tmp'.format(filename)
+    try:
+        with open(temporary, 'w') as fp:
+            write(fp, chunks)
+    except BaseException:
+        # open() itself may have failed, leaving nothing to remove
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(temporary)
+        raise
+
+    os.replace(temporary, filename)
+
+    return
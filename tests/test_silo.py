@@ -0,0 +1,129 @@
+import datetime
+import os
+import tomllib
+
+import pytest
+
+import sensor_silo as silo
+from sensor_silo import sensor
+from sensor_silo import calibration
+from sensor_silo import polynomial
+from sensor_silo import runtime
+from sensor_silo import deployment
+
+
+def new_sensor(index):
+    item = sensor.Sensor('s{:03}'.format(index))
+    item.kind = 'ph'
+    item.name = 'sensor {}'.format(index)
+    item.property = 'pH'
+    item.stream_type = 'SimulatedStream'
+    item.address = 'd{}.{}'.format(index // 4, index % 4 + 1)
+
+    cal = calibration.Calibration()
+    cal.timestamp = datetime.date.today()
+    cal.interval = datetime.timedelta(days=180)
+    cal.procedure_type = 'PolynomialProcedure'
+    cal.equation = polynomial.PolynomialEquation()
+    cal.equation.fit([4.0, 7.0, 10.0], [177.0 + index, 0.0, -177.0])
+    item.calibration = cal
+
+    return item
+
+
+def new_shell(indexes):
+    ph = silo.PolynomialProcedure({'SimulatedStream': silo.SimulatedStream})
+    ph.kind = 'ph'
+    ph.scaled_units = 'pH'
+    ph.stream_type = 'SimulatedStream'
+    ph.stream_address = 'deployed'
+    for name, value in [('sp1', 4.0), ('sp2', 7.0)]:
+        ph.parameters[name] = silo.StreamSetpoint(silo.Quantity(name.upper(), 'pH', value))
+
+    shell = silo.Shell({'ph': ph})
+    for index in indexes:
+        item = new_sensor(index)
+        shell.sensors.sensors[item.id] = item
+
+    return shell
+
+
+def answer(monkeypatch, *replies):
+    ''' reply to the filename prompts in turn'''
+    replies = iter(replies)
+    monkeypatch.setattr('builtins.input', lambda prompt='': next(replies))
+
+
+def saved_sensors(filename):
+    with open(filename, 'rb') as fp:
+        return tomllib.load(fp)['sensors']
+
+
+@pytest.fixture(autouse=True)
+def folder(tmp_path, monkeypatch):
+    # filenames are taken without a path
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_load_replaces_an_open_store(monkeypatch):
+    new_shell(range(8)).save_store('fleet.db')
+    new_shell(range(20, 23)).save('other.toml')
+
+    shell = new_shell([])
+    shell.do_open('fleet.db')
+    assert len(shell.sensors.sensors) == 8
+
+    answer(monkeypatch, 'other', 'out')
+    shell.do_load('')
+    assert shell.store is None
+    assert sorted(shell.sensors.sensors.keys()) == ['s020', 's021', 's022']
+
+    shell.do_save('')
+    assert sorted(saved_sensors('out.toml')) == ['s020', 's021', 's022']
+
+
+def test_journal_replays_to_a_full_save():
+    shell = new_shell(range(6))
+    shell.save('fleet.toml')
+    with open('fleet.toml') as fp:
+        written = fp.read()
+
+    shell.sensors.sensors['s001'].location = 'tank 2'
+    shell.save('fleet.toml')
+    del shell.sensors.sensors['s002']
+    item = new_sensor(9)
+    shell.sensors.sensors[item.id] = item
+    shell.sensors.sensors['s004'].calibration.equation.fit([4.0, 7.0, 10.0], [170.0, 1.0, -180.0])
+    shell.save('fleet.toml')
+
+    # incremental saves leave the file as it was and journal the rest
+    with open('fleet.toml') as fp:
+        assert fp.read() == written
+    config = runtime.ConfigFile()
+    journaled = config.load('fleet.toml')
+    assert config.journal_length == 2
+
+    shell.save('full.toml')
+    assert journaled['sensors'] == saved_sensors('full.toml')
+
+
+def test_journal_compacts_at_its_limit():
+    shell = new_shell(range(3))
+    shell.journal_limit = 2
+    shell.save('fleet.toml')
+
+    for location in ['a', 'b', 'c']:
+        shell.sensors.sensors['s000'].location = location
+        shell.save('fleet.toml')
+
+    assert shell.journal_length == 0
+    assert saved_sensors('fleet.toml')['s000']['location'] == 'c'
+    assert not os.path.exists('fleet.journal.toml')
+
+
+def test_unknown_filter_type_falls_back_to_ema(capsys):
+    settings = deployment.Deployment({'filter_type': 'lowpass'})
+
+    assert settings.filter_type == 'ema'
+    assert 'unknown filter_type lowpass' in capsys.readouterr().out
@@ -0,0 +1,187 @@
+import math
+import random
+
+import pytest
+
+from sensor_silo import statistics
+
+
+def sequential(values):
+    stats = statistics.RunningStats()
+    for x in values:
+        stats.push(x)
+
+    return stats
+
+
+def assert_matches(stats, expected):
+    assert stats.n == expected.n
+    assert math.isclose(stats.mean(), expected.mean(), rel_tol=1e-12)
+    assert math.isclose(stats.variance(), expected.variance(), rel_tol=1e-9, abs_tol=1e-12)
+
+
+@pytest.fixture
+def values():
+    generator = random.Random(7)
+    return [generator.gauss(1000.0, 3.0) for _ in range(5000)]
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def backend(request, monkeypatch):
+    if request.param == 'python':
+        monkeypatch.setattr(statistics, 'numpy', None)
+    elif statistics.numpy is None:
+        pytest.skip('numpy not installed')
+
+    return request.param
+
+
+@pytest.mark.parametrize('block_size', [1, 2, 7, 1000])
+def test_push_many_matches_sequential(values, backend, block_size):
+    stats = statistics.RunningStats()
+    for i in range(0, len(values), block_size):
+        stats.push_many(values[i:i + block_size])
+
+    assert_matches(stats, sequential(values))
+
+
+def test_push_many_empty_block():
+    stats = sequential([1.0, 2.0, 3.0])
+    stats.push_many([])
+
+    assert_matches(stats, sequential([1.0, 2.0, 3.0]))
+
+
+def test_push_many_with_max_n_pushes_one_at_a_time():
+    stats = statistics.RunningStats(max_n=4)
+    expected = statistics.RunningStats(max_n=4)
+    for x in [1.0, 2.0, 5.0, 9.0, 4.0, 3.0]:
+        expected.push(x)
+
+    stats.push_many([1.0, 2.0, 5.0, 9.0, 4.0, 3.0])
+
+    assert_matches(stats, expected)
+
+
+@pytest.mark.parametrize('parts', [2, 3, 8])
+def test_merge_matches_sequential(values, parts):
+    size = len(values) // parts + 1
+    merged = statistics.RunningStats()
+    for i in range(0, len(values), size):
+        merged.merge(sequential(values[i:i + size]))
+
+    assert_matches(merged, sequential(values))
+
+
+@pytest.mark.parametrize('left, right', [([], [4.0]), ([4.0], []), ([4.0], [6.0]), ([4.0], [6.0, 9.0]), ([6.0, 9.0], [4.0])])
+def test_merge_small(left, right):
+    merged = sequential(left).merge(sequential(right))
+
+    assert_matches(merged, sequential(left + right))
+
+
+def test_merge_after_clear_and_single_push():
+    reused = sequential([1.0, 5.0, 9.0, 20.0])
+    reused.clear()
+    reused.push(3.0)
+
+    merged = sequential([10.0, 11.0, 12.0]).merge(reused)
+    assert_matches(merged, sequential([10.0, 11.0, 12.0, 3.0]))
+    assert math.isclose(merged.variance(), 50.0 / 3)
+
+    merged = reused.merge(sequential([10.0, 11.0, 12.0]))
+    assert_matches(merged, sequential([3.0, 10.0, 11.0, 12.0]))
+
+
+def test_push_after_merge_continues(values):
+    stats = sequential(values[:100]).merge(sequential(values[100:200]))
+    for x in values[200:300]:
+        stats.push(x)
+
+    assert_matches(stats, sequential(values[:300]))
+
+
+def test_merge_refuses_max_n():
+    with pytest.raises(ValueError):
+        statistics.RunningStats(max_n=10).merge(sequential([1.0, 2.0]))
+
+
+def test_sliding_matches_each_window(values):
+    import statistics as reference
+
+    window = statistics.SlidingStats(64)
+    for i, x in enumerate(values[:1000]):
+        window.push(x)
+
+        last = values[max(0, i - 63):i + 1]
+        assert window.n == len(last)
+        assert list(window.values()) == last
+        assert math.isclose(window.mean(), reference.fmean(last), rel_tol=1e-12)
+        assert window.minimum() == min(last) and window.maximum() == max(last)
+        if len(last) > 1:
+            assert math.isclose(window.variance(), reference.variance(last), rel_tol=1e-6)
+            line = reference.linear_regression(range(len(last)), last)
+            assert math.isclose(window.slope(), line.slope, rel_tol=1e-6, abs_tol=1e-9)
+
+
+def test_exponential_mean_weights_samples(values):
+    ewma = statistics.ExponentialStats(time_constant=64)
+    for x in values[:500]:
+        ewma.push(x)
+
+    # the first sample seeds the mean, each later one is weighted alpha
+    alpha = 1.0 / 64
+    weights = [(1.0 - alpha) ** 499] + [alpha * (1.0 - alpha) ** (499 - k) for k in range(1, 500)]
+    expected = math.fsum(w * x for w, x in zip(weights, values[:500]))
+
+    assert ewma.n == 500
+    assert math.isclose(ewma.mean(), expected, rel_tol=1e-12)
+    assert 4.0 < ewma.variance() < 16.0
+
+
+def test_exponential_needs_a_time_constant():
+    with pytest.raises(ValueError):
+        statistics.ExponentialStats()
+
+
+def test_gated_refuses_spikes_and_follows_a_step(values):
+    import statistics as reference
+
+    gated = statistics.GatedStats(statistics.SlidingStats(64), threshold=4.0)
+    spiked = list(values[:1000])
+    for i in range(50, 1000, 97):
+        spiked[i] += 200.0
+    spiked[500:] = [x + 20.0 for x in spiked[500:]]
+
+    for x in spiked:
+        gated.push(x)
+
+    assert gated.rejected >= 10 and max(gated.values()) < 1100
+    assert math.isclose(gated.mean(), reference.fmean(values[936:1000]) + 20.0, abs_tol=0.5)
+
+
+def test_gated_z_reseeds_after_a_step(values):
+    import statistics as reference
+
+    gated = statistics.GatedStats(statistics.SlidingStats(64), threshold=4.0, method='z', window=25)
+    stepped = values[:200] + [x + 50.0 for x in values[200:400]]
+
+    pushed = [gated.push(x) for x in stepped]
+
+    # refused for a window, then following the new level
+    assert not any(pushed[200:224]) and pushed[224]
+    assert gated.rejected == 24
+    assert all(pushed[225:])
+    assert math.isclose(gated.mean(), reference.fmean(values[336:400]) + 50.0, rel_tol=1e-12)
+
+
+def test_gated_z_spikes_do_not_reseed(values):
+    gated = statistics.GatedStats(statistics.SlidingStats(64), threshold=4.0, method='z', window=5)
+    spiked = list(values[:300])
+    for i in range(50, 300, 10):
+        spiked[i] += 200.0
+
+    for x in spiked:
+        gated.push(x)
+
+    assert gated.rejected == 25 and gated.maximum() < 1100
@@ -0,0 +1,191 @@
+import math
+import random
+
+import pytest
+
+from sensor_silo import sensor
+from sensor_silo import calibration
+from sensor_silo import equation
+from sensor_silo import polynomial_equation as polynomial
+from sensor_silo import thermistor_equation as thermistor
+
+
+def linear(index):
+    equ = polynomial.PolynomialEquation()
+    equ.fit([4.0, 7.0, 10.0], [177.0 + index, 0.0, -177.0])
+
+    return equ
+
+
+def quadratic(index):
+    equ = polynomial.PolynomialEquation()
+    equ.degree = 2
+    equ.fit([4.0, 7.0, 10.0], [170.0 + index, 0.0, -190.0])
+
+    return equ
+
+
+def cubic(index):
+    equ = polynomial.PolynomialEquation()
+    equ.degree = 3
+    x_values = [4.0, 5.5, 7.0, 8.5, 10.0]
+    equ.fit(x_values, [polynomial.horner([400.0 + index, -60.0, 0.8, 0.05], x) for x in x_values])
+
+    return equ
+
+
+def ntc(index):
+    equ = thermistor.NtcBetaEquation()
+    equ.beta = 3400 + index
+
+    return equ
+
+
+def phorp(index):
+    return thermistor.PhorpNtcBetaEquation()
+
+
+def identity(index):
+    return equation.IdentityEquation()
+
+
+def raw_value(equ, generator):
+    ''' a plausible raw reading for equ'''
+    if equ is None or equ.type == 'IdentityEquation':
+        return generator.uniform(-10.0, 10.0)
+
+    if equ.type == 'NtcBetaEquation':
+        return generator.uniform(5000.0, 20000.0)
+
+    if equ.type == 'PhorpNtcBetaEquation':
+        return generator.uniform(600.0, 900.0)
+
+    return generator.uniform(-150.0, 150.0)
+
+
+def new_sensors(count):
+    sensors = sensor.Sensors()
+    kinds = [linear, quadratic, ntc, phorp, identity, None]
+    for index in range(count):
+        item = sensor.Sensor('s{:03}'.format(index))
+        kind = kinds[index % len(kinds)]
+        if kind is not None:
+            item.calibration = calibration.Calibration()
+            item.calibration.equation = kind(index)
+        sensors[item.id] = item
+
+    return sensors
+
+
+def assert_scales(sensors):
+    ''' the table scales as each sensor's own equation does, in numpy and in python'''
+    generator = random.Random(len(sensors))
+    table = sensors.calibration_table
+    equations = [table.equation_of(item) for item in sensors.values()]
+    raw = [raw_value(equ, generator) for equ in equations]
+
+    expected = [math.nan if equ is None else equ.evaluate_y(y) for equ, y in zip(equations, raw)]
+    for scaled in [sensors.scale(raw), table.scale_python(raw)]:
+        assert len(scaled) == len(expected)
+        for value, wanted in zip(scaled, expected):
+            if math.isnan(wanted):
+                assert math.isnan(value)
+            else:
+                assert math.isclose(value, wanted, rel_tol=1e-9, abs_tol=1e-9)
+
+    return table
+
+
+def test_table_scales_each_column():
+    assert_scales(new_sensors(24))
+
+
+def test_refresh_rewrites_an_edited_equation():
+    sensors = new_sensors(24)
+    table = assert_scales(sensors)
+
+    sensors['s000'].calibration.equation.fit([4.0, 7.0, 10.0], [160.0, 10.0, -140.0])
+    sensors['s002'].calibration.equation.beta = 3950
+    sensors['s007'].calibration.equation.changed()
+
+    assert assert_scales(sensors) is table
+
+
+def test_refresh_takes_a_swapped_equation():
+    sensors = new_sensors(24)
+    table = assert_scales(sensors)
+
+    # the same column is patched in place
+    sensors['s006'].calibration.equation = linear(40)
+    sensors['s003'].calibration.equation = ntc(41)
+    assert assert_scales(sensors) is table
+
+    # another column rebuilds the table
+    sensors['s012'].calibration.equation = ntc(42)
+    assert assert_scales(sensors) is not table
+
+
+def test_refresh_after_a_calibration_is_dropped():
+    sensors = new_sensors(24)
+    table = assert_scales(sensors)
+
+    sensors['s001'].calibration = None
+    assert assert_scales(sensors) is not table
+
+
+def test_delete_rebuilds_the_rows():
+    sensors = new_sensors(24)
+    table = assert_scales(sensors)
+
+    del sensors['s004']
+    del sensors['s013']
+    table = assert_scales(sensors)
+    assert table.keys == list(sensors.keys())
+
+
+@pytest.mark.parametrize('degree', [1, 2, 3])
+def test_fit_recovers_a_polynomial(degree):
+    terms = [414.0, -59.0, 1.5, -0.05][:degree + 1]
+    x_values = [float(x) for x in range(2, 13)]
+    y_values = [polynomial.horner(terms, x) for x in x_values]
+
+    equ = polynomial.PolynomialEquation()
+    equ.degree = degree
+    assert equ.fit(x_values, y_values)
+
+    for i, term in enumerate(terms):
+        assert math.isclose(equ.coefficients[i], term, rel_tol=1e-6, abs_tol=1e-9)
+    assert (equ.x_min, equ.x_max) == (2.0, 12.0)
+
+
+def test_fit_with_fewer_points_than_degree():
+    equ = polynomial.PolynomialEquation()
+    equ.degree = 3
+    assert equ.fit([4.0, 7.0], [177.0, 0.0])
+
+    assert equ.is_linear
+    assert math.isclose(equ.evaluate_y(177.0), 4.0)
+
+
+@pytest.mark.parametrize('x_values', [[7.0], [7.0, 7.0, 7.0]])
+def test_fit_failed_drops_the_old_fit(x_values):
+    equ = linear(0)
+
+    assert not equ.fit(x_values, [0.0] * len(x_values))
+    assert equ.coefficients == {0: 0.0, 1: 0.00001}
+
+
+def test_least_squares_refuses_a_singular_fit():
+    assert polynomial.least_squares([1.0, 1.0, 2.0, 2.0], [1.0, 2.0, 3.0, 4.0], 2) is None
+
+
+@pytest.mark.parametrize('make', [quadratic, cubic])
+def test_newton_inverts_the_polynomial(make):
+    equ = make(0)
+
+    for i in range(41):
+        x = 4.0 + i * 6.0 / 40
+        y = equ.evaluate_x(x)
+
+        assert math.isclose(equ.evaluate_y(y), x, rel_tol=1e-9)
+        assert math.isclose(equ.evaluator(y), x, rel_tol=1e-9)
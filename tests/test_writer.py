@@ -0,0 +1,61 @@
+import os
+import tomllib
+
+import pytest
+
+from sensor_silo import writer
+
+
+@pytest.mark.parametrize('text', ['plain', 'say "hi"', 'c:\\silo\\new', 'two\nlines', 'tab\there', 'bell\x07', 'del\x7f', 'pH 4 \u00b0C', ''])
+def test_quote_round_trips(text):
+    package = 'value = {}\n'.format(writer.quote(text))
+
+    assert tomllib.loads(package)['value'] == text
+
+
+@pytest.mark.parametrize('name, expected', [('s001', 's001'), ('d0-1_a', 'd0-1_a'), ('d0.1', '"d0.1"'), ('a b', '"a b"'), ('', '""')])
+def test_key_quotes_only_when_needed(name, expected):
+    assert writer.key(name) == expected
+
+
+@pytest.mark.parametrize('name', ['d0.1', 'say "hi"', 'back\\slash', 'new\nline'])
+def test_key_round_trips(name):
+    package = '[sensors.{}]\nkind = "ph"\n'.format(writer.key(name))
+
+    assert list(tomllib.loads(package)['sensors']) == [name]
+
+
+def test_write_file_replaces_whole(tmp_path):
+    filename = str(tmp_path / 'deployment.toml')
+    writer.write_file(filename, 'old = 1\n')
+    writer.write_file(filename, iter(['new = ', '2\n']))
+
+    with open(filename) as fp:
+        assert fp.read() == 'new = 2\n'
+    assert os.listdir(tmp_path) == ['deployment.toml']
+
+
+def test_write_file_keeps_the_old_file_on_error(tmp_path):
+    filename = str(tmp_path / 'deployment.toml')
+    writer.write_file(filename, 'old = 1\n')
+
+    def chunks():
+        yield 'new = '
+        raise RuntimeError('packing failed')
+
+    with pytest.raises(RuntimeError, match='packing failed'):
+        writer.write_file(filename, chunks())
+
+    with open(filename) as fp:
+        assert fp.read() == 'old = 1\n'
+    assert os.listdir(tmp_path) == ['deployment.toml']
+
+
+def test_write_file_reraises_when_it_cannot_open(tmp_path):
+    filename = str(tmp_path / 'missing' / 'deployment.toml')
+
+    with pytest.raises(FileNotFoundError) as raised:
+        writer.write_file(filename, 'new = 2\n')
+
+    # the error from open(), not one from cleaning up after it
+    assert raised.value.__context__ is None